@@ -0,0 +1,267 @@
+"""
+Materialized Aggregates for stored results
+A small per-result summary is computed whenever StorageManager.save() stores a result:
+one row per college with counts, a CGPA histogram (exact medians survive merging),
+per-subject pass counts and how many subjects the college tops. Cross-exam queries
+(trends, the college leaderboard) read only these summaries, never the full result
+documents.
+
+Summaries live next to the results: cache/aggregates/<hash>.json in file mode, the
+result_summaries table in db mode; both are removed with the result.
+
+Usage:
+    python aggregates.py --rebuild       # backfill summaries for every stored result
+"""
+
+import re
+import sys
+
+SUMMARY_VERSION = 2
+
+MONTHS = {m: i for i, m in enumerate(
+    ['JANUARY', 'FEBRUARY', 'MARCH', 'APRIL', 'MAY', 'JUNE', 'JULY', 'AUGUST',
+     'SEPTEMBER', 'OCTOBER', 'NOVEMBER', 'DECEMBER'], start=1)}
+
+def summarize(result, file_hash):
+    """Per-college aggregate rows for one result (one pass over its students)"""
+    meta = result.get('meta', {})
+    exam_info = result.get('exam_info', {})
+    field = lambda key: meta.get(key) or exam_info.get(key) or ''
+    subject_names = {code: info.get('name', code) for code, info in result.get('course_metadata', {}).items()}
+
+    colleges = {}
+    best = {}  # subject code -> (top total, colleges holding it)
+    for s in result.get('students', []):
+        row = colleges.get(s['college'])
+        if row is None:
+            row = colleges[s['college']] = {'total': 0, 'passed': 0, 'toppers': 0, 'cgpa_counts': {}, 'subjects': {}}
+        row['total'] += 1
+        if s['result'] == 'PASS':
+            row['passed'] += 1
+        if s['cgpa'] and s['cgpa'] > 0:
+            key = f"{s['cgpa']:.2f}"
+            row['cgpa_counts'][key] = row['cgpa_counts'].get(key, 0) + 1
+        for subj in s['subjects']:
+            counts = row['subjects'].get(subj['code'])
+            if counts is None:
+                counts = row['subjects'][subj['code']] = {'total': 0, 'passed': 0}
+            counts['total'] += 1
+            if subj['passed']:
+                counts['passed'] += 1
+            if subj['total']:
+                top = best.get(subj['code'])
+                if top is None or subj['total'] > top[0]:
+                    best[subj['code']] = (subj['total'], {s['college']})
+                elif subj['total'] == top[0]:
+                    top[1].add(s['college'])
+
+    # Subject toppers, ties kept: each college holding a subject's top total counts it once
+    for _total, holders in best.values():
+        for college in holders:
+            colleges[college]['toppers'] += 1
+
+    return {
+        'version': SUMMARY_VERSION,
+        'hash': file_hash,
+        'timestamp': meta.get('timestamp', 0),
+        'program': field('program') or 'Unknown Program',
+        'semester': field('semester'),
+        'scheme': field('scheme'),
+        'examination': field('examination'),
+        'subject_names': subject_names,
+        'colleges': colleges,
+    }
+
+def exam_sort_key(summary):
+    """'DECEMBER 2024' -> (2024, 12); unparseable sittings sort by upload time"""
+    match = re.search(r'([A-Z]+)\W*(\d{4})', (summary.get('examination') or '').upper())
+    if match and match.group(1) in MONTHS:
+        return (int(match.group(2)), MONTHS[match.group(1)], summary.get('timestamp', 0))
+    return (0, 0, summary.get('timestamp', 0))
+
+# "1331: MAEER's ..." or "MU-1331: MAEER's ..."
+COLLEGE_CODE = re.compile(r'\s*(?:[A-Za-z]+-)?(\d+)\b')
+
+def college_code(college):
+    """The numeric college code ('1331'), without a university prefix; None if there is none"""
+    match = COLLEGE_CODE.match(college or '')
+    return match.group(1) if match else None
+
+def college_matches(college, wanted):
+    """Digits match the college code exactly, anything else is a case-insensitive substring.
+    The one college matcher: parse filters, exports, trends, leaderboard and queries use it."""
+    wanted = wanted.strip()
+    if wanted.isdigit():
+        return college_code(college) == wanted
+    return wanted.lower() in college.lower()
+
+def median_from_counts(cgpa_counts):
+    """Median as compute_statistics takes it (element len//2 of the sorted CGPAs)"""
+    n = sum(cgpa_counts.values())
+    if not n:
+        return 0
+    seen = 0
+    for value in sorted(cgpa_counts, key=float):
+        seen += cgpa_counts[value]
+        if seen > n // 2:
+            return float(value)
+
+def merge_rows(rows):
+    """Combine college rows (from one or several results) into one"""
+    merged = {'total': 0, 'passed': 0, 'toppers': 0, 'cgpa_counts': {}, 'subjects': {}}
+    for row in rows:
+        merged['total'] += row['total']
+        merged['passed'] += row['passed']
+        merged['toppers'] += row.get('toppers', 0)
+        for value, count in row['cgpa_counts'].items():
+            merged['cgpa_counts'][value] = merged['cgpa_counts'].get(value, 0) + count
+        for code, counts in row['subjects'].items():
+            target = merged['subjects'].setdefault(code, {'total': 0, 'passed': 0})
+            target['total'] += counts['total']
+            target['passed'] += counts['passed']
+    return merged
+
+def _pct(part, whole):
+    return round(part / whole * 100, 2) if whole else 0
+
+def trends(summaries, program=None, semester=None, college=None, subject=None):
+    """Pass %, median CGPA and subject failure rates per (program, semester, examination),
+    oldest sitting first. Results sharing a sitting (e.g. one ledger per branch) are combined,
+    re-issues of a college's ledger are not; `college` narrows every point to the matching colleges."""
+    points = {}
+    latest = sorted(_latest(_selected(summaries, program, semester)), key=lambda item: exam_sort_key(item[0]))
+    for summary, rows in latest:
+        rows = [row for name, row in rows.items() if not college or college_matches(name, college)]
+        if not rows:
+            continue
+        key = (summary['program'], summary['semester'], summary['examination'])
+        point = points.setdefault(key, {'hashes': [], 'rows': [], 'subject_names': {}})
+        point['hashes'].append(summary['hash'])
+        point['rows'].extend(rows)
+        point['subject_names'].update(summary.get('subject_names', {}))
+
+    series = []
+    for (prog, sem, exam), point in points.items():
+        row = merge_rows(point['rows'])
+        subjects = {}
+        for code, counts in row['subjects'].items():
+            if subject and code != subject:
+                continue
+            subjects[code] = {
+                'name': point['subject_names'].get(code, code),
+                'total': counts['total'],
+                'passed': counts['passed'],
+                'failure_rate': _pct(counts['total'] - counts['passed'], counts['total']),
+            }
+        series.append({
+            'program': prog,
+            'semester': sem,
+            'examination': exam,
+            'hashes': point['hashes'],
+            'total_students': row['total'],
+            'passed_students': row['passed'],
+            'pass_percentage': _pct(row['passed'], row['total']),
+            'median_cgpa': median_from_counts(row['cgpa_counts']),
+            'subjects': subjects,
+        })
+    return series
+
+def _latest(summaries):
+    """[(summary, {college: row})] keeping only the most recently stored result's row per
+    (program, semester, scheme, examination, college): a re-issued ledger or a duplicate upload
+    replaces the earlier one instead of being counted twice. The timestamp is meta.timestamp,
+    set when a result is first stored; re-uploading an original never moves it past its re-issue."""
+    newest = {}
+    for summary in summaries:
+        for name, row in summary['colleges'].items():
+            key = (summary['program'], summary['semester'], summary['scheme'], summary['examination'], name)
+            if key not in newest or summary.get('timestamp', 0) > newest[key][0].get('timestamp', 0):
+                newest[key] = (summary, name, row)
+
+    kept = {}
+    for summary, name, row in newest.values():
+        kept.setdefault(summary['hash'], (summary, {}))[1][name] = row
+    return list(kept.values())
+
+def _selected(summaries, program=None, semester=None, examination=None):
+    for summary in summaries:
+        if program and summary['program'] != program:
+            continue
+        if semester and summary['semester'] != semester:
+            continue
+        if examination and summary['examination'] != examination:
+            continue
+        yield summary
+
+LEADERBOARD_SORTS = ('pass_percentage', 'median_cgpa', 'toppers')
+
+def leaderboard(summaries, program=None, semester=None, examination=None, sort='pass_percentage', min_students=1):
+    """Colleges ranked across every selected result, re-issued ledgers counted once (see _latest).
+    Ties share a rank (1, 2, 2, 4) and are broken for display by the other two measures,
+    then by cohort size."""
+    per_college = {}
+    for _summary, rows in _latest(_selected(summaries, program, semester, examination)):
+        for name, row in rows.items():
+            per_college.setdefault(name, []).append(row)
+
+    board = []
+    for name, rows in per_college.items():
+        row = merge_rows(rows)
+        if row['total'] < min_students:
+            continue
+        board.append({
+            'college': name,
+            'results': len(rows),
+            'total_students': row['total'],
+            'passed_students': row['passed'],
+            'pass_percentage': _pct(row['passed'], row['total']),
+            'median_cgpa': median_from_counts(row['cgpa_counts']),
+            'toppers': row['toppers'],
+        })
+
+    order = [sort] + [key for key in LEADERBOARD_SORTS if key != sort] + ['total_students']
+    board.sort(key=lambda entry: tuple(-entry[key] for key in order))
+    for i, entry in enumerate(board):
+        tied = i > 0 and board[i - 1][sort] == entry[sort]
+        entry['rank'] = board[i - 1]['rank'] if tied else i + 1
+    return board
+
+def load(storage):
+    """Stored summaries, recomputing any written by an older SUMMARY_VERSION"""
+    summaries = []
+    for summary in storage.summaries():
+        if summary.get('version') != SUMMARY_VERSION:
+            result = storage.get(summary['hash'])
+            if not result:
+                continue
+            summary = summarize(result, summary['hash'])
+            storage.save_summary(summary['hash'], summary)
+        summaries.append(summary)
+    return summaries
+
+def rebuild(storage):
+    """Recompute the summary of every stored result (backfill / after a version bump)"""
+    count = 0
+    for item in storage.list():
+        result = storage.get(item['hash'])
+        if result:
+            storage.save_summary(item['hash'], summarize(result, item['hash']))
+            count += 1
+    return count
+
+def main(argv=None):
+    import argparse
+    from storage import StorageManager
+
+    parser = argparse.ArgumentParser(description="Maintain per-result aggregate summaries")
+    parser.add_argument('--rebuild', action='store_true', help="Recompute summaries for every stored result")
+    args = parser.parse_args(argv)
+
+    storage = StorageManager()
+    if args.rebuild:
+        print(f"✅ Rebuilt {rebuild(storage)} summaries")
+    else:
+        print(f"📊 {len(storage.summaries())} summaries stored")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,148 @@
+"""
+Batch Parsing
+Parses several result PDFs (e.g. one per branch) concurrently and merges them into one
+cohort result: every student is tagged with its source, and statistics are computed
+once over the merged list with parse_results.compute_statistics.
+
+Files already in the cache (keyed by the SHA-256 of their bytes, as /api/parse does)
+are reused; only new files are parsed. A StudentFilter (e.g. one college) is pushed
+down into the parser for new files and applied to cached ones.
+
+Usage:
+    python batch_parse.py CSE=cse.pdf EE=ee.pdf -o merged.json
+    python batch_parse.py CSE=cse.pdf EE=ee.pdf --college 1331
+"""
+
+import os
+import sys
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _parse_in_process(path, student_filter=None):
+    from parse_results import parse_pdf  # lazy, as in parse_pool
+    return parse_pdf(path, student_filter)
+
+def apply_filter(result, student_filter):
+    """A full result narrowed to the students passing student_filter"""
+    from parse_results import compute_statistics
+    students = [s for s in result.get('students', []) if student_filter.matches(s)]
+    return {**result, 'students': students,
+            'statistics': compute_statistics(students, result.get('course_metadata', {}))}
+
+def parse_many(items, parse=None, cache=None, max_workers=None, executor='process', student_filter=None):
+    """Parse [(source, path), ...] concurrently. Returns [(source, hash, result, cached)]
+    in input order.
+
+    parse:    function(path) -> result (default: parse_results.parse_pdf)
+    cache:    object with get(hash) / save(hash, result), e.g. StorageManager
+    executor: 'process' for in-process parsing (CPU-bound), 'thread' when `parse` hands
+              work to another process (parse_pool.parse)
+    student_filter: parse_results.StudentFilter. Filtered parses are not cached.
+    """
+    hashes = [file_hash(path) for _source, path in items]
+    results = [None] * len(items)
+    todo = []
+
+    for i, h in enumerate(hashes):
+        cached = cache.get(h) if cache is not None else None
+        if cached:
+            if student_filter:
+                cached = apply_filter(cached, student_filter)
+            results[i] = (items[i][0], h, cached, True)
+        else:
+            todo.append(i)
+
+    if todo:
+        pool_cls = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+        with pool_cls(max_workers=max_workers or min(len(todo), os.cpu_count() or 1)) as pool:
+            if parse is None:
+                futures = {i: pool.submit(_parse_in_process, items[i][1], student_filter) for i in todo}
+            else:
+                futures = {i: pool.submit(parse, items[i][1]) for i in todo}
+            for i, future in futures.items():
+                result = future.result()
+                full = parse is not None or not student_filter
+                if full and cache is not None:
+                    cache.save(hashes[i], result)
+                if full and student_filter:
+                    result = apply_filter(result, student_filter)
+                results[i] = (items[i][0], hashes[i], result, False)
+
+    return results
+
+def merge_results(parsed, tag='source'):
+    """Merge [(source, hash, result, cached), ...] into one result with combined statistics"""
+    from parse_results import compute_statistics
+
+    course_metadata = {}
+    students = []
+    sources = []
+    for source, h, result, cached in parsed:
+        course_metadata.update(result.get('course_metadata', {}))
+        for student in result.get('students', []):
+            students.append({**student, tag: source})
+        sources.append({
+            'source': source,
+            'hash': h,
+            'filename': result.get('meta', {}).get('filename'),
+            'cached': cached,
+            'exam_info': result.get('exam_info', {}),
+            'page_count': result.get('page_count', 0),
+            'student_count': len(result.get('students', [])),
+            'statistics': result.get('statistics', {}),
+        })
+
+    return {
+        'exam_info': parsed[0][2].get('exam_info', {}) if parsed else {},
+        'page_count': sum(s['page_count'] for s in sources),
+        'course_metadata': course_metadata,
+        'students': students,
+        'statistics': compute_statistics(students, course_metadata),
+        'sources': sources,
+    }
+
+def parse_batch(items, tag='source', **kwargs):
+    """Parse [(source, path), ...] concurrently and return one merged result"""
+    return merge_results(parse_many(items, **kwargs), tag=tag)
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Parse several result PDFs into one merged result")
+    parser.add_argument('files', nargs='+', metavar='[SOURCE=]PDF')
+    parser.add_argument('-o', '--output', help="Write the merged result as JSON")
+    parser.add_argument('--tag', default='source', help="Student key holding the source (default: source)")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--college', action='append', help="Only students of this college code or name (repeatable)")
+    args = parser.parse_args(argv)
+
+    items = []
+    for spec in args.files:
+        source, _, path = spec.rpartition('=')
+        items.append((source or os.path.splitext(os.path.basename(path))[0], path))
+
+    student_filter = None
+    if args.college:
+        from parse_results import StudentFilter
+        student_filter = StudentFilter(college=args.college)
+
+    merged = parse_batch(items, tag=args.tag, max_workers=args.workers, student_filter=student_filter)
+    for s in merged['sources']:
+        print(f"📄 {s['source']}: {s['student_count']} students, {s['page_count']} pages")
+    stats = merged['statistics']
+    print(f"✅ Merged {stats['total_students']} students, {stats['pass_percentage']}% passed")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False)
+        print(f"💾 Saved to {args.output}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
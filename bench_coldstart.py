@@ -0,0 +1,151 @@
+"""
+Cold Start Benchmark for server.py
+Measures, in fresh processes:
+  - import time of server.py, and whether the PDF stack (pdfplumber/pdfminer) was loaded
+  - time to first response of the read-only endpoints under gunicorn (or the Flask dev server)
+
+Usage:
+    python bench_coldstart.py
+    python bench_coldstart.py --runs 5 --server flask
+    python bench_coldstart.py --max-import-ms 400 --max-ttfr-ms 2000   # exit 1 on regression
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import urllib.request
+import urllib.error
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ['pdfplumber', 'pdfminer', 'parse_results']
+
+IMPORT_PROBE = f"""
+import sys, time, json
+start = time.perf_counter()
+import server
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{'import_ms': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+def _env(workdir):
+    # Isolated storage, no preload or retention: measure startup alone
+    env = dict(os.environ, CACHE_DIR=os.path.join(workdir, 'cache'), PRELOAD_PARSER='0',
+               PARSE_POOL_ADDRESS=os.path.join(workdir, 'parse_pool.sock'),
+               PROMETHEUS_MULTIPROC_DIR=os.path.join(workdir, 'metrics'))
+    os.makedirs(env['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+    for key in ('DATABASE_URL', 'RETENTION_INTERVAL'):
+        env.pop(key, None)
+    return env
+
+def measure_import(env):
+    out = subprocess.run([sys.executable, '-c', IMPORT_PROBE], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _status(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code  # a 404 is still a response
+    except Exception:
+        return None
+
+def measure_first_response(env, server_kind, paths, timeout=60):
+    port = _free_port()
+    if server_kind == 'gunicorn':
+        cmd = [sys.executable, '-m', 'gunicorn', 'server:app', '-c', 'gunicorn_config.py',
+               '--bind', f"127.0.0.1:{port}"]
+    else:
+        cmd = [sys.executable, '-c', f"from server import app; app.run(port={port}, debug=False)"]
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=dict(env, PORT=str(port)),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    timings = {}
+    try:
+        while len(timings) < len(paths):
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError(f"No response within {timeout}s")
+            if proc.poll() is not None:
+                raise RuntimeError(f"Server exited with {proc.returncode}")
+            for path in paths:
+                if path not in timings and _status(f"http://127.0.0.1:{port}{path}") is not None:
+                    timings[path] = (time.perf_counter() - start) * 1000
+            time.sleep(0.01)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return timings
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark server.py import time and time to first response")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--server', choices=['gunicorn', 'flask'], default='gunicorn')
+    parser.add_argument('--max-import-ms', type=float, help="Fail if median import time exceeds this")
+    parser.add_argument('--max-ttfr-ms', type=float, help="Fail if median time to first response exceeds this")
+    parser.add_argument('--json', metavar='PATH', help="Also write results as JSON")
+    args = parser.parse_args(argv)
+
+    paths = ['/api/cache', '/api/results/0000', '/']
+    workdir = tempfile.mkdtemp(prefix='syllabix_coldstart_')
+    env = _env(workdir)
+
+    imports, loaded, ttfr = [], set(), {p: [] for p in paths}
+    for run in range(args.runs):
+        probe = measure_import(env)
+        imports.append(probe['import_ms'])
+        loaded.update(probe['loaded'])
+        for path, ms in measure_first_response(env, args.server, paths).items():
+            ttfr[path].append(ms)
+        print(f"  run {run + 1}/{args.runs}: import {probe['import_ms']:.0f} ms, "
+              f"first response {min(ttfr[p][-1] for p in paths):.0f} ms")
+
+    results = {
+        'server': args.server,
+        'runs': args.runs,
+        'import_ms_median': round(statistics.median(imports), 1),
+        'pdf_stack_loaded_at_import': sorted(loaded),
+        'first_response_ms_median': {p: round(statistics.median(v), 1) for p, v in ttfr.items()},
+    }
+
+    print(f"\n{'='*60}")
+    print(f"COLD START ({args.server}, median of {args.runs})")
+    print(f"{'='*60}")
+    print(f"import server:        {results['import_ms_median']:.0f} ms")
+    print(f"PDF stack at import:  {', '.join(results['pdf_stack_loaded_at_import']) or 'not loaded ✅'}")
+    for path, ms in results['first_response_ms_median'].items():
+        print(f"first response {path:<22} {ms:.0f} ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    failures = []
+    if results['pdf_stack_loaded_at_import']:
+        failures.append("PDF stack imported at startup")
+    if args.max_import_ms and results['import_ms_median'] > args.max_import_ms:
+        failures.append(f"import {results['import_ms_median']} ms > {args.max_import_ms} ms")
+    first = min(results['first_response_ms_median'].values())
+    if args.max_ttfr_ms and first > args.max_ttfr_ms:
+        failures.append(f"first response {first} ms > {args.max_ttfr_ms} ms")
+    for failure in failures:
+        print(f"❌ Regression: {failure}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
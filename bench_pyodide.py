@@ -0,0 +1,259 @@
+"""
+Pyodide Boot Benchmark for frontend/public/py_worker.js
+Serves frontend/public plus a local mirror of the Pyodide CDN files and parser wheels
+(standing in for jsDelivr/PyPI), then boots the worker in a browser:
+  - cold: browser caches cleared, everything comes over the network
+  - warm: fresh workers that boot from the Cache API
+and reports each phase (script, runtime, packages, parser) and total boot time.
+
+The mirror is served with no-store, so warm runs measure the worker's own cache only.
+Runs headless through Playwright when installed; otherwise open the printed URL.
+
+Usage:
+    python bench_pyodide.py --fetch                  # download the mirror once (needs network)
+    python bench_pyodide.py --runs 3
+    python bench_pyodide.py --cdn                    # boot from the real CDN instead
+    python bench_pyodide.py --max-warm-ms 3000       # exit 1 on regression
+"""
+
+import os
+import re
+import sys
+import json
+import socket
+import argparse
+import threading
+import statistics
+import urllib.request
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PUBLIC_DIR = os.path.join(ROOT, 'frontend', 'public')
+WORKER_FILE = os.path.join(PUBLIC_DIR, 'py_worker.js')
+DEFAULT_MIRROR = os.path.join(ROOT, '.pyodide_mirror')
+CORE_FILES = ['pyodide.js', 'pyodide.asm.js', 'pyodide.asm.wasm', 'python_stdlib.zip', 'pyodide-lock.json']
+
+def worker_pins():
+    """Pyodide version, Pyodide packages and wheels, read from py_worker.js (single source)"""
+    with open(WORKER_FILE, 'r', encoding='utf-8') as f:
+        src = f.read()
+    version = re.search(r'PYODIDE_VERSION = "([^"]+)"', src).group(1)
+    packages = re.findall(r'"([^"]+)"', re.search(r'PYODIDE_PACKAGES = \[([^\]]*)\]', src).group(1))
+    wheels = re.findall(r'\{ name: "([^"]+)", file: "([^"]+)" \}', src)
+    return version, packages, wheels
+
+def _download(url, path):
+    if os.path.exists(path):
+        return
+    print(f"⬇️  {url}")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with urllib.request.urlopen(url, timeout=120) as resp, open(path + '.part', 'wb') as f:
+        f.write(resp.read())
+    os.replace(path + '.part', path)
+
+def fetch_mirror(mirror):
+    """Download the Pyodide core, the packages the worker loads (with their deps) and the wheels"""
+    version, packages, wheels = worker_pins()
+    cdn = f"https://cdn.jsdelivr.net/pyodide/v{version}/full/"
+    pyodide_dir = os.path.join(mirror, 'pyodide')
+    for name in CORE_FILES:
+        _download(cdn + name, os.path.join(pyodide_dir, name))
+
+    with open(os.path.join(pyodide_dir, 'pyodide-lock.json'), 'r', encoding='utf-8') as f:
+        lock = json.load(f)['packages']
+    todo, seen = list(packages), set()
+    while todo:
+        name = todo.pop().lower()
+        if name in seen:
+            continue
+        seen.add(name)
+        _download(cdn + lock[name]['file_name'], os.path.join(pyodide_dir, lock[name]['file_name']))
+        todo.extend(lock[name].get('depends', []))
+
+    for name, file in wheels:
+        _download(f"https://files.pythonhosted.org/packages/py3/{name[0]}/{name}/{file}",
+                  os.path.join(mirror, 'wheels', file))
+    print(f"✅ Mirror ready in {mirror}")
+
+BENCH_PAGE = """<!doctype html>
+<meta charset="utf-8"><title>py_worker boot benchmark</title>
+<pre id="log"></pre>
+<script>
+const runs = %(runs)d, workerUrl = %(worker_url)s;
+const log = (line) => { document.getElementById('log').textContent += line + '\\n'; };
+
+function boot() {
+    return new Promise((resolve, reject) => {
+        const start = performance.now();
+        const worker = new Worker(workerUrl);
+        worker.onmessage = (e) => {
+            if (e.data.status === 'ready') {
+                worker.terminate();
+                resolve({ wall_ms: Math.round(performance.now() - start), ...e.data });
+            } else if (e.data.status === 'init_failed') {
+                worker.terminate();
+                reject(new Error(e.data.error));
+            }
+        };
+        worker.onerror = (e) => { worker.terminate(); reject(new Error(e.message)); };
+        worker.postMessage({ type: 'init' });
+    });
+}
+
+(async () => {
+    const results = [];
+    try {
+        for (const key of await caches.keys()) await caches.delete(key);
+        for (let i = 0; i <= runs; i++) {
+            const result = { run: i, cold: i === 0, ...(await boot()) };
+            log(JSON.stringify(result));
+            results.push(result);
+        }
+    } catch (e) {
+        results.push({ error: String(e) });
+        log('error: ' + e);
+    }
+    await fetch('/__bench__/result', { method: 'POST', body: JSON.stringify(results) });
+    log('done');
+})();
+</script>
+"""
+
+class BenchHandler(SimpleHTTPRequestHandler):
+    """frontend/public at /, the mirror at /mirror/, the bench page at /__bench__"""
+    extensions_map = {**SimpleHTTPRequestHandler.extensions_map, '.wasm': 'application/wasm',
+                      '.js': 'text/javascript', '.whl': 'application/zip'}
+
+    def __init__(self, *args, mirror, page, done, **kwargs):
+        self.mirror, self.page, self.done = mirror, page, done
+        super().__init__(*args, directory=PUBLIC_DIR, **kwargs)
+
+    def log_message(self, *args):
+        pass
+
+    def end_headers(self):
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        super().end_headers()
+
+    def translate_path(self, path):
+        if path.startswith('/mirror/'):
+            rel = path[len('/mirror/'):].split('?', 1)[0]
+            return os.path.join(self.mirror, *[p for p in rel.split('/') if p not in ('', '.', '..')])
+        return super().translate_path(path)
+
+    def do_GET(self):
+        if self.path == '/__bench__':
+            body = self.page.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        super().do_GET()
+
+    def do_POST(self):
+        if self.path != '/__bench__/result':
+            self.send_error(404)
+            return
+        self.done['results'] = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.send_response(204)
+        self.end_headers()
+        self.done['event'].set()
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def run_browser(url):
+    """Open the bench page headless when Playwright is available. Returns False otherwise."""
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        return False
+
+    def _run():
+        with sync_playwright() as p:
+            browser = p.chromium.launch()
+            page = browser.new_page()
+            page.goto(url)
+            page.wait_for_function("document.getElementById('log').textContent.includes('done')",
+                                   timeout=600_000)
+            browser.close()
+    threading.Thread(target=_run, daemon=True).start()
+    return True
+
+def summarize(results):
+    runs = [r for r in results if 'timings' in r]
+    cold = [r for r in runs if r['cold']]
+    warm = [r for r in runs if not r['cold']]
+    summary = {'cold': cold[0] if cold else None, 'warm': None}
+    if warm:
+        phases = warm[0]['timings'].keys()
+        summary['warm'] = {phase: statistics.median(r['timings'][phase] for r in warm) for phase in phases}
+        summary['warm']['cache_misses'] = max(r['cache']['cacheMisses'] for r in warm)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark py_worker.js boot (cold and warm) against a local mirror")
+    parser.add_argument('--runs', type=int, default=3, help="Warm boots after the cold one")
+    parser.add_argument('--mirror', default=DEFAULT_MIRROR)
+    parser.add_argument('--fetch', action='store_true', help="Download the mirror first")
+    parser.add_argument('--cdn', action='store_true', help="Boot from the real CDN/PyPI instead of the mirror")
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--max-warm-ms', type=float, help="Fail if the median warm boot exceeds this")
+    parser.add_argument('--json', metavar='PATH', help="Also write results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.fetch:
+        fetch_mirror(args.mirror)
+    if not args.cdn and not os.path.exists(os.path.join(args.mirror, 'pyodide', 'pyodide.js')):
+        print(f"❌ No mirror in {args.mirror}: run with --fetch (or use --cdn)")
+        return 1
+
+    worker_url = '/py_worker.js' if args.cdn else '/py_worker.js?pyodide=/mirror/pyodide/&wheels=/mirror/wheels/'
+    page = BENCH_PAGE % {'runs': args.runs, 'worker_url': json.dumps(worker_url)}
+    done = {'event': threading.Event(), 'results': None}
+    port = args.port or _free_port()
+    httpd = ThreadingHTTPServer(('127.0.0.1', port),
+                                partial(BenchHandler, mirror=args.mirror, page=page, done=done))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    url = f"http://127.0.0.1:{port}/__bench__"
+    if run_browser(url):
+        print(f"🌐 Running headless Chromium against {url}")
+    else:
+        print(f"🌐 Playwright not installed: open {url} in a browser")
+
+    try:
+        if not done['event'].wait(timeout=900):
+            print("❌ Timed out waiting for results")
+            return 1
+    finally:
+        httpd.shutdown()
+
+    results = done['results']
+    errors = [r['error'] for r in results if 'error' in r]
+    if errors:
+        print(f"❌ Boot failed: {errors[0]}")
+        return 1
+
+    summary = summarize(results)
+    cold, warm = summary['cold'], summary['warm']
+    print(f"🥶 Cold: {cold['timings']} ({cold['cache']['cacheMisses']} fetched)")
+    if warm:
+        print(f"🔥 Warm (median of {args.runs}): {warm}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'runs': results, 'summary': summary}, f, indent=2)
+
+    if args.max_warm_ms is not None and warm and warm['total'] > args.max_warm_ms:
+        print(f"❌ Warm boot {warm['total']}ms exceeds {args.max_warm_ms}ms")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
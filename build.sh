@@ -17,3 +17,6 @@ npm run build
 
 # Return to root
 cd ..
+
+# 3. Precompress static data (.gz/.br served by Accept-Encoding)
+python static_export.py frontend/dist/data
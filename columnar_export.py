@@ -0,0 +1,152 @@
+"""
+Columnar Export (Parquet / Arrow)
+Flattens parsed results into two typed tables for analysis tools:
+  students        one row per student
+  subject_marks   one row per student x subject (long format)
+Low-cardinality strings (college, grade, status, program, ...) are dictionary-encoded.
+
+Results are appended to a dataset partitioned by program/semester, one file per result
+hash per table, so re-exporting a result replaces its files and cross-exam queries
+only read the partitions they need:
+    <out>/students/program=<p>/semester=<s>/<hash>-0.parquet
+    <out>/subject_marks/program=<p>/semester=<s>/<hash>-0.parquet
+
+Needs pyarrow (pip install pyarrow).
+
+Usage:
+    python columnar_export.py exports/                 # every stored result
+    python columnar_export.py exports/ <hash> <hash>   # selected results
+"""
+
+import io
+import sys
+
+TABLES = ('students', 'subject_marks')
+PARTITION_COLS = ['program', 'semester']
+
+def _pa():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise RuntimeError("pyarrow is not installed (pip install pyarrow)")
+
+def _schemas(pa):
+    dict_str = pa.dictionary(pa.int32(), pa.string())
+    result_cols = [
+        ('result_hash', dict_str), ('program', dict_str), ('semester', dict_str),
+        ('scheme', dict_str), ('examination', dict_str),
+    ]
+    students = pa.schema(result_cols + [
+        ('seat_no', pa.string()), ('name', pa.string()), ('status', dict_str),
+        ('gender', dict_str), ('ern', pa.string()), ('college', dict_str),
+        ('total_marks', pa.int32()), ('max_marks', pa.int32()), ('cgpa', pa.float32()),
+        ('result', dict_str),
+    ])
+    subject_marks = pa.schema(result_cols + [
+        ('seat_no', pa.string()), ('college', dict_str), ('code', dict_str), ('subject', dict_str),
+        ('credits', pa.float32()),
+        ('internal', pa.int16()), ('external', pa.int16()), ('term_work', pa.int16()), ('oral', pa.int16()),
+        ('internal_grace', pa.int16()), ('external_grace', pa.int16()),
+        ('term_work_grace', pa.int16()), ('oral_grace', pa.int16()),
+        ('total', pa.int16()), ('grade', dict_str), ('grade_points', pa.float32()), ('passed', pa.bool_()),
+    ])
+    return {'students': students, 'subject_marks': subject_marks}
+
+def _result_fields(result, result_hash):
+    meta = result.get('meta', {})
+    exam_info = result.get('exam_info', {})
+    field = lambda key: meta.get(key) or exam_info.get(key) or ''
+    return {
+        'result_hash': result_hash or meta.get('hash', ''),
+        'program': field('program') or 'Unknown Program',
+        'semester': field('semester') or 'Unknown',
+        'scheme': field('scheme'),
+        'examination': field('examination'),
+    }
+
+def result_tables(result, result_hash=None, student_filter=None):
+    """{'students': pa.Table, 'subject_marks': pa.Table} for one result"""
+    pa = _pa()
+    schemas = _schemas(pa)
+    common = _result_fields(result, result_hash)
+    students = result.get('students', [])
+
+    # Build column lists directly: no per-row dicts for the (large) long table
+    s_cols = {name: [] for name in schemas['students'].names}
+    m_cols = {name: [] for name in schemas['subject_marks'].names}
+    mark_keys = [name for name in schemas['subject_marks'].names if name not in common and name not in
+                 ('seat_no', 'college', 'code', 'subject')]
+
+    for s in students:
+        if student_filter is not None and not student_filter.matches(s):
+            continue
+        for key in ('seat_no', 'name', 'status', 'gender', 'ern', 'college', 'total_marks', 'max_marks',
+                    'cgpa', 'result'):
+            s_cols[key].append(s.get(key))
+        for subj in s.get('subjects', []):
+            m_cols['seat_no'].append(s.get('seat_no'))
+            m_cols['college'].append(s.get('college'))
+            m_cols['code'].append(subj.get('code'))
+            m_cols['subject'].append(subj.get('name'))
+            for key in mark_keys:
+                m_cols[key].append(subj.get(key))
+
+    tables = {}
+    for table, cols in (('students', s_cols), ('subject_marks', m_cols)):
+        rows = len(next(c for name, c in cols.items() if name not in common))
+        for key, value in common.items():
+            cols[key] = [value] * rows
+        schema = schemas[table]
+        tables[table] = pa.Table.from_arrays(
+            [pa.array(cols[f.name], type=f.type) for f in schema], schema=schema)
+    return tables
+
+def append_to_dataset(result, out_dir, result_hash=None):
+    """Write one result into the partitioned dataset (replacing its earlier export)"""
+    _pa()  # availability check: the RuntimeError explains how to install pyarrow
+    import pyarrow.parquet as pq
+
+    tables = result_tables(result, result_hash)
+    name = _result_fields(result, result_hash)['result_hash']
+    for table, data in tables.items():
+        pq.write_to_dataset(
+            data, root_path=f"{out_dir}/{table}", partition_cols=PARTITION_COLS,
+            basename_template=f"{name}-{{i}}.parquet", existing_data_behavior='overwrite_or_ignore')
+    return {table: data.num_rows for table, data in tables.items()}
+
+def to_bytes(result, table='students', fmt='parquet', result_hash=None, student_filter=None):
+    """One table of one result as Parquet or Arrow IPC (file format) bytes"""
+    pa = _pa()
+    data = result_tables(result, result_hash, student_filter)[table]
+    sink = io.BytesIO()
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(data, sink, compression='zstd')
+    else:
+        with pa.ipc.new_file(sink, data.schema) as writer:
+            writer.write_table(data)
+    return sink.getvalue()
+
+def main(argv=None):
+    import argparse
+    from storage import StorageManager
+
+    parser = argparse.ArgumentParser(description="Export stored results as a partitioned Parquet dataset")
+    parser.add_argument('out_dir')
+    parser.add_argument('hashes', nargs='*', help="Results to export (default: all)")
+    args = parser.parse_args(argv)
+
+    storage = StorageManager()
+    hashes = args.hashes or [item['hash'] for item in storage.list()]
+    for h in hashes:
+        result = storage.get(h)
+        if not result:
+            print(f"⚠️  {h}: not found")
+            continue
+        counts = append_to_dataset(result, args.out_dir, h)
+        print(f"📦 {h[:12]}: {counts['students']} students, {counts['subject_marks']} subject rows")
+    print(f"✅ Dataset in {args.out_dir}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -5,6 +5,8 @@ Extracts student data from Mumbai University result PDFs
 
 import pdfplumber
 import re
+import math
+import heapq
 import json
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
@@ -72,14 +74,23 @@ def extract_course_metadata(page) -> Dict[str, dict]:
                             return val != '...' and val.replace('.', '', 1).isdigit()
                         return False
                     
+                    # Passing/maximum marks of a column, None for '...'
+                    def column_marks(col_idx):
+                        return float(row[col_idx].strip()) if has_component(col_idx) else None
+
                     courses[code] = {
                         'name': name,
                         'credits': credits,
                         'max_marks': max_marks,
+                        'min_marks': column_marks(11),
                         'has_i1': has_component(4),   # I1 Max Marks column
                         'has_e1': has_component(6),   # E1 Max Marks column
                         'has_t1': has_component(8),   # T1 Max Marks column
                         'has_o1': has_component(10),  # O1 Max Marks column
+                        'i1_min': column_marks(3), 'i1_max': column_marks(4),
+                        'e1_min': column_marks(5), 'e1_max': column_marks(6),
+                        't1_min': column_marks(7), 't1_max': column_marks(8),
+                        'o1_min': column_marks(9), 'o1_max': column_marks(10),
                     }
     return courses
 
@@ -130,6 +141,26 @@ def extract_exam_info(page) -> Dict[str, str]:
         
     return info
 
+# A record's first line with the ERN printed before the college
+HEADER_WITH_ERN = re.compile(r'^(\d{7})\s+(.+?)\s+(Regular|Repeater)\s+(MALE|FEMALE)\s+\(([^)]+)\)\s+(.+)$')
+
+def parse_header_line(header_line: str) -> Optional[tuple]:
+    """(seat_no, name, status, gender, ern, college) from a record's first line.
+    ern is "" when it is printed on a later line."""
+    
+    # Try Pattern 1: seat_no NAME Regular MALE (ERN) COLLEGE
+    seat_match = HEADER_WITH_ERN.match(header_line)
+    if seat_match:
+        return (seat_match.group(1), seat_match.group(2).strip(), seat_match.group(3),
+                seat_match.group(4), seat_match.group(5), seat_match.group(6).strip())
+    
+    # Try Pattern 2: seat_no NAME Regular MALE COLLEGE (ERN on separate line)
+    seat_match = re.match(r'^(\d{7})\s+(.+?)\s+(Regular|Repeater)\s+(MALE|FEMALE)\s+(.+)$', header_line)
+    if seat_match:
+        return (seat_match.group(1), seat_match.group(2).strip(), seat_match.group(3),
+                seat_match.group(4), "", seat_match.group(5).strip())
+    return None
+
 def parse_student_block(lines: List[str], course_metadata: Dict) -> Optional[Student]:
     """Parse a block of lines belonging to one student"""
     
@@ -137,32 +168,12 @@ def parse_student_block(lines: List[str], course_metadata: Dict) -> Optional[Stu
         return None
     
     # First line: seat_no, name, status, gender, ern, college
-    header_line = lines[0]
-    
-    # Try Pattern 1: seat_no NAME Regular MALE (ERN) COLLEGE
-    seat_match = re.match(r'^(\d{7})\s+(.+?)\s+(Regular|Repeater)\s+(MALE|FEMALE)\s+\(([^)]+)\)\s+(.+)$', header_line)
+    fields = parse_header_line(lines[0])
+    if not fields:
+        return None
+    seat_no, name, status, gender, ern, college = fields
     
-    if seat_match:
-        seat_no = seat_match.group(1)
-        name = seat_match.group(2).strip()
-        status = seat_match.group(3)
-        gender = seat_match.group(4)
-        ern = seat_match.group(5)
-        college = seat_match.group(6).strip()
-    else:
-        # Try Pattern 2: seat_no NAME Regular MALE COLLEGE (ERN on separate line)
-        seat_match = re.match(r'^(\d{7})\s+(.+?)\s+(Regular|Repeater)\s+(MALE|FEMALE)\s+(.+)$', header_line)
-        
-        if not seat_match:
-            return None
-        
-        seat_no = seat_match.group(1)
-        name = seat_match.group(2).strip()
-        status = seat_match.group(3)
-        gender = seat_match.group(4)
-        college = seat_match.group(5).strip()
-        ern = ""
-        
+    if not ern:
         # Look for ERN in subsequent lines (usually in parentheses)
         for line in lines[1:5]:  # Check first few lines
             ern_match = re.search(r'\(?(MU\d+)\)?', line)
@@ -348,169 +359,378 @@ def parse_student_block(lines: List[str], course_metadata: Dict) -> Optional[Stu
         result=result
     )
 
-def parse_pdf(pdf_path: str) -> Dict:
-    """Main function to parse the entire PDF"""
-    
-    students = []
-    students = []
+@dataclass
+class StudentFilter:
+    """Which students to parse. Everything but `result` is checked on the record's
+    header line before parse_student_block runs (and, when the page's content stream
+    is plain text, before the page is laid out at all)."""
+    college: Optional[object] = None    # college code ("1331") or name substring, or a list of them
+    seat_from: Optional[str] = None     # inclusive seat number range
+    seat_to: Optional[str] = None
+    status: Optional[str] = None        # Regular / Repeater
+    result: Optional[str] = None        # PASS / FAILED (only known after parsing the block)
+
+    def _college_matches(self, college: str) -> bool:
+        from aggregates import college_matches  # server-side only: the browser parser never filters
+        needles = [self.college] if isinstance(self.college, str) else self.college
+        return any(college_matches(college, needle) for needle in needles)
+
+    def matches_header(self, seat_no: str, status: str, college: str) -> bool:
+        if self.seat_from and seat_no < str(self.seat_from):
+            return False
+        if self.seat_to and seat_no > str(self.seat_to):
+            return False
+        if self.status and status.lower() != self.status.lower():
+            return False
+        if self.college and not self._college_matches(college):
+            return False
+        return True
+
+    def matches(self, student: dict) -> bool:
+        """Full check on a parsed student dict"""
+        if self.result and student['result'].upper() != self.result.upper():
+            return False
+        return self.matches_header(student['seat_no'], student['status'], student['college'])
+
+# Text-showing strings in a raw content stream: (literal) and <hex> operands
+_PDF_LITERAL = re.compile(rb'\((?:[^()\\]|\\.)*\)', re.S)
+_PDF_HEX_STRING = re.compile(rb'(?<!<)<[0-9A-Fa-f\s]+>(?!>)')
+_PDF_ESCAPE = re.compile(rb'\\([nrtbf()\\]|[0-7]{1,3}|\n)')
+_PDF_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f', b'\n': b''}
+
+def _unescape(match):
+    code = match.group(1)
+    if code[:1].isdigit():
+        return bytes([int(code, 8) & 0xFF])
+    return _PDF_ESCAPES.get(code, code)
+
+def _raw_text_strings(page) -> Optional[List[str]]:
+    """Literal strings of the page's content stream, without laying the page out.
+    None when the text isn't stored as plain literals (hex/CID fonts, unreadable)."""
+    try:
+        from pdfminer.pdftypes import resolve1
+        contents = resolve1(page.page_obj.attrs.get('Contents'))
+        streams = contents if isinstance(contents, list) else [contents]
+        raw = b'\n'.join(resolve1(stream).get_data() for stream in streams if stream is not None)
+    except Exception:
+        return None
+    if _PDF_HEX_STRING.search(raw):
+        return None
+    return [_PDF_ESCAPE.sub(_unescape, m.group(0)[1:-1]).decode('latin-1') for m in _PDF_LITERAL.finditer(raw)]
+
+def page_may_match(page, student_filter: StudentFilter) -> bool:
+    """False only when every record header on the page is readable from the raw
+    content stream and none of them passes the filter, so the page can be skipped."""
+    strings = _raw_text_strings(page)
+    if strings is None:
+        return True
+    headers = [text for text in strings if re.match(r'^\d{7}\s+[A-Z]', text)]
+    if not headers:
+        return True
+    for text in headers:
+        # Only a complete header (ERN, then the college) in one string can rule a record out:
+        # when the college is drawn as a separate text object, pattern 2 would read the ERN as it
+        fields = HEADER_WITH_ERN.match(text)
+        if fields is None or student_filter.matches_header(fields.group(1), fields.group(3), fields.group(6)):
+            return True
+    return False
+
+# Generic skip patterns for page headers and footers
+SKIP_KEYWORDS = [
+    'SEAT NO', 'University Of Mumbai', 'PAGE :', '#:', 'ADC:',
+    '%Marks', 'Grade O', 'GRADE POINT', 'NEP 2020',
+    'TERM WORK', 'ORAL (', 'External (', 'Internal(',
+    'TOT GP', 'õC', 'õCG',
+]
+
+def read_header(pdf) -> Dict:
+    """Page 1: course metadata and exam info, plus the page count"""
     course_metadata = {}
     exam_info = {}
+    if pdf.pages:
+        course_metadata = extract_course_metadata(pdf.pages[0])
+        exam_info = extract_exam_info(pdf.pages[0])
+    return {'exam_info': exam_info, 'page_count': len(pdf.pages), 'course_metadata': course_metadata}
+
+def parse_page(page, course_metadata: Dict, student_filter: Optional[StudentFilter] = None) -> List[dict]:
+    """Students on one ledger page (pages 2+). Records never span pages, so pages
+    can be parsed independently and in any order."""
+    if student_filter and not page_may_match(page, student_filter):
+        return []
     
-    with pdfplumber.open(pdf_path) as pdf:
-        # Page 1: Extract course metadata and exam info
-        if pdf.pages:
-            course_metadata = extract_course_metadata(pdf.pages[0])
-            exam_info = extract_exam_info(pdf.pages[0])
-        
-        # Calculate total max marks from metadata (sum of all subject max marks)
-        total_max_marks = int(sum(m['max_marks'] for m in course_metadata.values()))
-        
-        # Build a set of subject codes for filtering page headers
-        subject_code_set = set(course_metadata.keys())
-        
-        # Generic skip patterns for page headers and footers
-        skip_keywords = [
-            'SEAT NO', 'University Of Mumbai', 'PAGE :', '#:', 'ADC:',
-            '%Marks', 'Grade O', 'GRADE POINT', 'NEP 2020',
-            'TERM WORK', 'ORAL (', 'External (', 'Internal(',
-            'TOT GP', 'õC', 'õCG',
-        ]
-        
-        def is_subject_header_line(line):
-            """Check if a line is a repeated page header listing subject codes.
-            These look like: '10411 : Applied 10412 : Applied Physics ...'
-            or continuation lines like: 'Mathematics-I (TERM ...'
-            """
-            # Subject code header: starts with a known subject code
-            first_token = line.split()[0] if line.split() else ''
-            if first_token.rstrip(':') in subject_code_set:
-                return True
-            return False
-        
-        # Pages 2+: Extract student data
-        for page_num, page in enumerate(pdf.pages[1:], start=2):
-            text = page.extract_text()
-            if not text:
-                continue
-            
-            lines = text.split('\n')
-            
-            # Find student record start (7-digit seat number at start of line)
-            current_block = []
-            
-            for line in lines:
-                # Check if this is a new student record
-                if re.match(r'^\d{7}\s+[A-Z]', line):
-                    # Process previous block if exists
-                    if current_block:
-                        student = parse_student_block(current_block, course_metadata)
-                        if student:
-                            student.max_marks = total_max_marks
-                            students.append(student)
-                    current_block = [line]
-                elif current_block:
-                    # Skip header lines, footer lines, and subject header lines
-                    if not any(skip in line for skip in skip_keywords):
-                        if not is_subject_header_line(line):
-                            current_block.append(line)
-            
-            # Don't forget the last block
+    text = page.extract_text()
+    if not text:
+        return []
+
+    # Calculate total max marks from metadata (sum of all subject max marks)
+    total_max_marks = int(sum(m['max_marks'] for m in course_metadata.values()))
+
+    # Build a set of subject codes for filtering page headers
+    subject_code_set = set(course_metadata.keys())
+
+    def is_subject_header_line(line):
+        """Check if a line is a repeated page header listing subject codes.
+        These look like: '10411 : Applied 10412 : Applied Physics ...'
+        or continuation lines like: 'Mathematics-I (TERM ...'
+        """
+        # Subject code header: starts with a known subject code
+        first_token = line.split()[0] if line.split() else ''
+        if first_token.rstrip(':') in subject_code_set:
+            return True
+        return False
+
+    students = []
+
+    def flush(block):
+        student = parse_student_block(block, course_metadata)
+        if student:
+            student.max_marks = total_max_marks
+            student = asdict(student)
+            if not student_filter or not student_filter.result or student_filter.matches(student):
+                students.append(student)
+
+    def wanted(header_line):
+        """Header-line pushdown: unwanted records are never collected or parsed"""
+        if not student_filter:
+            return True
+        fields = parse_header_line(header_line)
+        return fields is None or student_filter.matches_header(fields[0], fields[2], fields[5])
+
+    # Find student record start (7-digit seat number at start of line)
+    current_block = []
+
+    for line in text.split('\n'):
+        # Check if this is a new student record
+        if re.match(r'^\d{7}\s+[A-Z]', line):
+            # Process previous block if exists
             if current_block:
-                student = parse_student_block(current_block, course_metadata)
-                if student:
-                    student.max_marks = total_max_marks
-                    students.append(student)
-    
-    # Calculate statistics
+                flush(current_block)
+            # An empty block swallows the record's lines until the next seat number
+            current_block = [line] if wanted(line) else []
+        elif current_block:
+            # Skip header lines, footer lines, and subject header lines
+            if not any(skip in line for skip in SKIP_KEYWORDS):
+                if not is_subject_header_line(line):
+                    current_block.append(line)
+
+    # Don't forget the last block
+    if current_block:
+        flush(current_block)
+    return students
+
+GRADE_ORDER = ['O', 'A+', 'A', 'B+', 'B', 'C', 'D', 'F']
+CGPA_BINS = 10  # [0, 1), [1, 2), ... [9, 10]; CGPA 0 (not awarded) is left out
+PERCENTILES = [10, 25, 50, 75, 90, 99]
+
+def percentiles(values: List[float], points=PERCENTILES) -> Dict:
+    """Nearest-rank percentiles of `values` ({'p50': ...}); empty when there are none"""
+    values = sorted(values)
+    if not values:
+        return {}
+    return {f'p{p}': values[max(math.ceil(p / 100 * len(values)) - 1, 0)] for p in points}
+
+def _histogram() -> Dict:
+    return {'grade_counts': {}, 'subject_grades': {}, 'cgpa_bins': [0] * CGPA_BINS, 'totals': []}
+
+def _add_to_histogram(hist: Dict, student: dict):
+    if student['cgpa'] and student['cgpa'] > 0:
+        hist['cgpa_bins'][min(int(student['cgpa']), CGPA_BINS - 1)] += 1
+    if student['total_marks'] is not None:
+        hist['totals'].append(student['total_marks'])
+    for subject in student['subjects']:
+        grade = subject['grade']
+        if not grade:
+            continue
+        hist['grade_counts'][grade] = hist['grade_counts'].get(grade, 0) + 1
+        counts = hist['subject_grades'].setdefault(subject['code'], {})
+        counts[grade] = counts.get(grade, 0) + 1
+
+def _finish_histogram(hist: Dict) -> Dict:
+    return {
+        'grade_counts': hist['grade_counts'],
+        'subject_grades': hist['subject_grades'],
+        'cgpa_bins': hist['cgpa_bins'],
+        'total_marks_percentiles': percentiles(hist['totals']),
+    }
+
+TOP_K = 5
+
+class TopK:
+    """The best k values seen, ties kept: a bounded min-heap of distinct values, each
+    holding every entry that reached it. O(log k) per add, so O(n log k) for a pass."""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.heap = []     # distinct values, smallest (first to drop) on top
+        self.entries = {}  # value -> entries with that value
+
+    def add(self, value, entry: dict):
+        if value in self.entries:
+            self.entries[value].append(entry)
+        elif len(self.heap) < self.k:
+            heapq.heappush(self.heap, value)
+            self.entries[value] = [entry]
+        elif value > self.heap[0]:
+            del self.entries[heapq.heapreplace(self.heap, value)]
+            self.entries[value] = [entry]
+
+    def ranked(self) -> List[dict]:
+        """Entries best first with competition ranks (1, 2, 2, 4); a tie group that
+        straddles position k is kept whole"""
+        ranked = []
+        for value in sorted(self.heap, reverse=True):
+            if len(ranked) >= self.k:
+                break
+            rank = len(ranked) + 1
+            ranked.extend({**entry, 'value': value, 'rank': rank} for entry in self.entries[value])
+        return ranked
+
+def _student_rankings(k: int) -> Dict:
+    return {'cgpa': TopK(k), 'total_marks': TopK(k)}
+
+def _add_to_rankings(lists: Dict, student: dict, entry: dict):
+    if student['cgpa'] and student['cgpa'] > 0:
+        lists['cgpa'].add(student['cgpa'], entry)
+    if student['total_marks']:
+        lists['total_marks'].add(student['total_marks'], entry)
+
+def _ranked(lists: Dict) -> Dict:
+    return {key: top.ranked() for key, top in lists.items()}
+
+def compute_statistics(students: List[dict], course_metadata: Dict, top_k: int = TOP_K) -> Dict:
+    """Result-wide statistics from student dicts (as returned by parse_page), in one pass:
+    pass counts per college and subject, the distributions dashboards draw (grade mix,
+    CGPA bands, total-marks percentiles) and top-k lists with ties (overall and per college
+    by CGPA and total marks, per subject by subject total)"""
     total_students = len(students)
-    passed_students = [s for s in students if s.result == "PASS"]
-    pass_percentage = (len(passed_students) / total_students * 100) if total_students > 0 else 0
-    
-    # Calculate median CGPA
-    cgpas = [s.cgpa for s in students if s.cgpa > 0]
+    passed_students = 0
+    cgpas = []
+    colleges = {}  # name -> counts, histogram and rankings of that college
+    histogram = _histogram()
+    rankings = _student_rankings(top_k)
+    subject_rankings = {}
+
+    for s in students:
+        college = colleges.get(s['college'])
+        if college is None:
+            college = colleges[s['college']] = {'total': 0, 'passed': 0, 'subjects': {},
+                                                'histogram': _histogram(), 'rankings': _student_rankings(top_k)}
+        college['total'] += 1
+        if s['result'] == "PASS":
+            passed_students += 1
+            college['passed'] += 1
+        if s['cgpa'] > 0:
+            cgpas.append(s['cgpa'])
+
+        entry = {'seat_no': s['seat_no'], 'name': s['name'], 'college': s['college']}
+        for hist, lists in ((histogram, rankings), (college['histogram'], college['rankings'])):
+            _add_to_histogram(hist, s)
+            _add_to_rankings(lists, s, entry)
+
+        for subj in s['subjects']:
+            counts = college['subjects'].get(subj['code'])
+            if counts is None:
+                counts = college['subjects'][subj['code']] = {'total': 0, 'passed': 0}
+            counts['total'] += 1
+            if subj['passed']:
+                counts['passed'] += 1
+            if subj['total']:
+                top = subject_rankings.get(subj['code'])
+                if top is None:
+                    top = subject_rankings[subj['code']] = TopK(top_k)
+                top.add(subj['total'], entry)
+
+    pass_percentage = (passed_students / total_students * 100) if total_students > 0 else 0
+
+    # Median CGPA
     cgpas.sort()
     median_cgpa = cgpas[len(cgpas) // 2] if cgpas else 0
-    
-    # Find subject toppers
+
+    # Subject toppers: the first (in ledger order) of each subject's rank-1 group
+    ranked_subjects = _ranked(subject_rankings)
     subject_toppers = {}
     for code in course_metadata.keys():
-        max_marks = 0
-        topper = None
-        for student in students:
-            for subject in student.subjects:
-                if subject.code == code and subject.total and subject.total > max_marks:
-                    max_marks = subject.total
-                    topper = {'seat_no': student.seat_no, 'name': student.name, 'marks': max_marks}
-        if topper:
-            subject_toppers[code] = topper
-            
-    # Calculate College Statistics
+        ranked = ranked_subjects.get(code)
+        if ranked:
+            top = ranked[0]
+            ties = sum(1 for entry in ranked if entry['rank'] == 1) - 1
+            subject_toppers[code] = {'seat_no': top['seat_no'], 'name': top['name'], 'marks': top['value'], 'ties': ties}
+
+    # College statistics, subjects in course table order (only those its students took)
     college_stats = {}
-    
-    # Group students by college
-    college_map = {}
-    for student in students:
-        # Extract short college name for grouping key if needed, or use full string
-        # Using full string for exactness
-        c_name = student.college
-        if c_name not in college_map:
-            college_map[c_name] = []
-        college_map[c_name].append(student)
-        
-    for c_name, c_students in college_map.items():
-        c_total = len(c_students)
-        c_passed = len([s for s in c_students if s.result == "PASS"])
-        c_pass_pct = (c_passed / c_total * 100) if c_total > 0 else 0
-        
-        # Subject-wise stats for this college
+    for c_name, college in colleges.items():
         c_subjects = {}
         for code in course_metadata.keys():
-            s_passed = 0
-            s_failed = 0
-            s_total_subj = 0
-            
-            for s in c_students:
-                # Find subject in student's list
-                subj = next((sub for sub in s.subjects if sub.code == code), None)
-                if subj:
-                    s_total_subj += 1
-                    if subj.passed:
-                        s_passed += 1
-                    else:
-                        s_failed += 1
-            
-            # Only include if students actually took this subject
-            if s_total_subj > 0:
+            counts = college['subjects'].get(code)
+            if counts:
                 c_subjects[code] = {
                     'name': course_metadata[code]['name'],
-                    'total': s_total_subj,
-                    'passed': s_passed,
-                    'failed': s_failed,
-                    'pass_percentage': round((s_passed / s_total_subj * 100), 2)
+                    'total': counts['total'],
+                    'passed': counts['passed'],
+                    'failed': counts['total'] - counts['passed'],
+                    'pass_percentage': round((counts['passed'] / counts['total'] * 100), 2)
                 }
-        
         college_stats[c_name] = {
-            'total_students': c_total,
-            'passed_students': c_passed,
-            'failed_students': c_total - c_passed,
-            'pass_percentage': round(c_pass_pct, 2),
+            'total_students': college['total'],
+            'passed_students': college['passed'],
+            'failed_students': college['total'] - college['passed'],
+            'pass_percentage': round(college['passed'] / college['total'] * 100, 2),
             'subject_stats': c_subjects
         }
-    
+
     return {
-        'exam_info': exam_info,
-        'course_metadata': course_metadata,
-        'students': [asdict(s) for s in students],
-        'statistics': {
-            'total_students': total_students,
-            'passed_students': len(passed_students),
-            'pass_percentage': round(pass_percentage, 2),
-            'median_cgpa': round(median_cgpa, 2),
-            'subject_toppers': subject_toppers,
-            'college_statistics': college_stats
+        'total_students': total_students,
+        'passed_students': passed_students,
+        'pass_percentage': round(pass_percentage, 2),
+        'median_cgpa': round(median_cgpa, 2),
+        'subject_toppers': subject_toppers,
+        'college_statistics': college_stats,
+        'histograms': {
+            'grade_order': GRADE_ORDER,
+            **_finish_histogram(histogram),
+            'colleges': {c_name: _finish_histogram(college['histogram']) for c_name, college in colleges.items()},
+        },
+        'rankings': {
+            'k': top_k,
+            'overall': _ranked(rankings),
+            'colleges': {c_name: _ranked(college['rankings']) for c_name, college in colleges.items()},
+            'subjects': ranked_subjects,
         }
     }
 
+def build_result(header: Dict, students: List[dict]) -> Dict:
+    """Assemble the parse_pdf output from read_header + parsed pages"""
+    return {
+        'exam_info': header['exam_info'],
+        'page_count': header['page_count'],
+        'course_metadata': header['course_metadata'],
+        'students': students,
+        'statistics': compute_statistics(students, header['course_metadata'])
+    }
+
+def iter_students(pdf_path: str, student_filter: Optional[StudentFilter] = None):
+    """Yield student dicts page by page, without holding the whole ledger in memory"""
+    with pdfplumber.open(pdf_path) as pdf:
+        course_metadata = read_header(pdf)['course_metadata']
+        for page in pdf.pages[1:]:
+            yield from parse_page(page, course_metadata, student_filter)
+            page.close()
+
+def parse_pdf(pdf_path: str, student_filter: Optional[StudentFilter] = None) -> Dict:
+    """Main function to parse the entire PDF. With a student_filter, only matching
+    students are parsed and the statistics cover just them."""
+    
+    students = []
+    
+    with pdfplumber.open(pdf_path) as pdf:
+        header = read_header(pdf)
+        
+        # Pages 2+: Extract student data
+        for page in pdf.pages[1:]:
+            students.extend(parse_page(page, header['course_metadata'], student_filter))
+    
+    return build_result(header, students)
+
 def main():
     """Test the parser with the sample PDF"""
     pdf_path = r"d:\Projects\stats\Bachelor of Engineering( Electronics Engineering)_Term_1_Grade_card.pdf"
@@ -1,86 +1,253 @@
-
 // Pyodide Web Worker for Syllabix
+//
+// Boot is kept lean and cached:
+//   - only what parse_results.py imports is loaded: pdfplumber + pdfminer.six wheels and
+//     their compiled deps from the Pyodide repo (no micropip / PyPI resolution)
+//   - Pyodide core files and wheels are cached in the Cache API under a versioned name,
+//     so later workers boot without the network; older versions are deleted on boot
+//   - the parser source is revalidated on each boot and served from the cache offline
+//   - `?pyodide=<base>&wheels=<base>` on the worker URL points at a local mirror
+//     instead of the CDN (see bench_pyodide.py); phase timings come with 'ready'
+
+const PYODIDE_VERSION = "0.25.1";
+
+// Pure-Python wheels, pinned (pdfplumber's image deps Pillow/pypdfium2 are never imported)
+const PARSER_WHEELS = [
+    { name: "pdfminer.six", file: "pdfminer.six-20231228-py3-none-any.whl" },
+    { name: "pdfplumber", file: "pdfplumber-0.11.4-py3-none-any.whl" },
+];
+// Compiled deps of pdfminer.six, prebuilt in the Pyodide repo
+const PYODIDE_PACKAGES = ["cryptography", "charset-normalizer"];
+
+const CACHE_PREFIX = "syllabix-py-";
+const CACHE_NAME = CACHE_PREFIX + [PYODIDE_VERSION, ...PARSER_WHEELS.map((w) => w.file)].join("|");
+
+const params = new URL(self.location.href).searchParams;
+const resolve = (base) => new URL(base, self.location.href).href;
+const PYODIDE_BASE = resolve(params.get("pyodide") || `https://cdn.jsdelivr.net/pyodide/v${PYODIDE_VERSION}/full/`);
+const WHEEL_URLS = PARSER_WHEELS.map(({ name, file }) =>
+    params.get("wheels")
+        ? resolve(params.get("wheels")) + file
+        : `https://files.pythonhosted.org/packages/py3/${name[0]}/${name}/${file}`
+);
+const PARSER_URL = resolve("/parse_results.py");
 
 let pyodide = null;
-let scriptLoaded = false;
+let setupPromise = null;
+const bootStats = { cacheHits: 0, cacheMisses: 0 };
+
+// --- Cache API ---
+let cachePromise = null;
+function openCache() {
+    if (!cachePromise) {
+        // Cache API is missing outside secure contexts: fall back to the network
+        cachePromise = (self.caches ? caches.open(CACHE_NAME) : Promise.resolve(null)).catch(() => null);
+    }
+    return cachePromise;
+}
+
+async function dropOldCaches() {
+    if (!self.caches) return;
+    for (const key of await caches.keys()) {
+        if (key.startsWith(CACHE_PREFIX) && key !== CACHE_NAME) await caches.delete(key);
+    }
+}
+
+const nativeFetch = self.fetch.bind(self);
+
+async function cachedFetch(url, init) {
+    const cache = await openCache();
+    const hit = cache && await cache.match(url);
+    if (hit) {
+        bootStats.cacheHits++;
+        return hit;
+    }
+    bootStats.cacheMisses++;
+    const response = await nativeFetch(url, init);
+    if (cache && response.ok) await cache.put(url, response.clone()).catch(() => {});
+    return response;
+}
+
+// Pyodide fetches its wasm, stdlib and wheels with fetch(): route those through the cache
+const isVersioned = (url) => url.startsWith(PYODIDE_BASE) || WHEEL_URLS.includes(url);
+self.fetch = (input, init) => {
+    const url = typeof input === "string" ? input : input.url;
+    return isVersioned(url) ? cachedFetch(url, init) : nativeFetch(input, init);
+};
+
+// Parser source: revalidate (cheap 304 when unchanged), use the cached copy when offline
+async function fetchParserSource() {
+    const cache = await openCache();
+    try {
+        const response = await nativeFetch(PARSER_URL, { cache: "no-cache" });
+        if (!response.ok) throw new Error(`parse_results.py: HTTP ${response.status}`);
+        if (cache) await cache.put(PARSER_URL, response.clone()).catch(() => {});
+        return await response.text();
+    } catch (e) {
+        const hit = cache && await cache.match(PARSER_URL);
+        if (!hit) throw e;
+        return hit.text();
+    }
+}
+
+// Page-range driver around parse_results. A document stays open per job id, so one
+// worker can take several page ranges of the same PDF (see src/lib/parallelParse.js).
+// Each page's students go to `emit` as plain JS objects (to_js): nothing is serialized
+// to one big JSON string on either side.
+const STREAM_PARSER = `
+import pdfplumber
+import parse_results
+from js import Object
+from pyodide.ffi import to_js
+
+_docs = {}
+
+def _js(value):
+    return to_js(value, dict_converter=Object.fromEntries)
+
+def open_doc(path):
+    if path not in _docs:
+        pdf = pdfplumber.open(path)
+        _docs[path] = (pdf, parse_results.read_header(pdf))
+    return _js(_docs[path][1])
+
+def close_doc(path):
+    if path in _docs:
+        _docs.pop(path)[0].close()
+
+def parse_pages(path, emit, first_page=2, last_page=None, with_statistics=False):
+    pdf, header = _docs[path]
+    meta = header['course_metadata']
+    last_page = min(last_page or header['page_count'], header['page_count'])
+    students = []
+    for number in range(first_page, last_page + 1):
+        page = pdf.pages[number - 1]
+        batch = parse_results.parse_page(page, meta)
+        page.close()  # drop pdfminer's cached layout objects for this page
+        if with_statistics:
+            students.extend(batch)
+        emit(_js({'page': number, 'first_page': first_page, 'last_page': last_page, 'students': batch}))
+    if with_statistics:
+        return _js(parse_results.compute_statistics(students, meta))
+
+def statistics(students, course_metadata):
+    """Same statistics as parse_pdf, for students merged from several workers"""
+    return _js(parse_results.compute_statistics(students.to_py(), course_metadata.to_py()))
+`;
 
 // 1. Initial Setup
 async function setupPyodide() {
-    if (pyodide) return pyodide;
-
-    // Load remote Pyodide script
-    importScripts("https://cdn.jsdelivr.net/pyodide/v0.25.1/full/pyodide.js");
+    const timings = {};
+    const t0 = performance.now();
+    const mark = (phase) => { timings[phase] = Math.round(performance.now() - t0); };
 
-    pyodide = await loadPyodide();
+    dropOldCaches().catch(() => {});
+    const parserSource = fetchParserSource();
 
-    // Install Dependencies
-    await pyodide.loadPackage("micropip");
-    const micropip = pyodide.pyimport("micropip");
+    // pyodide.js via the cache too (importScripts would only hit the HTTP cache)
+    const script = await (await cachedFetch(PYODIDE_BASE + "pyodide.js")).text();
+    const scriptUrl = URL.createObjectURL(new Blob([script], { type: "text/javascript" }));
+    importScripts(scriptUrl);
+    URL.revokeObjectURL(scriptUrl);
+    mark("script");
 
-    // Install PDFPlumber + Pandas + TQDM (Used by parse_results)
-    postMessage({ status: 'loading', message: "Installing Python libraries... (This happens once)" });
-    await micropip.install(['pandas', 'pdfplumber', 'openpyxl', 'tqdm']);
+    const py = await loadPyodide({ indexURL: PYODIDE_BASE });
+    mark("runtime");
 
-    // Load the local parsing script
-    postMessage({ status: 'loading', message: "Loading logic..." });
-    let response = await fetch('/parse_results.py');
-    let code = await response.text();
+    postMessage({ status: "loading", message: "Loading PDF libraries..." });
+    try {
+        await py.loadPackage([...PYODIDE_PACKAGES, ...WHEEL_URLS]);
+    } catch (e) {
+        // Pins unavailable (mirror incomplete, index moved): resolve through micropip instead
+        console.warn("Lean package load failed, falling back to micropip:", e);
+        await py.loadPackage("micropip");
+        await py.pyimport("micropip").install(["pdfplumber"]);
+    }
+    mark("packages");
 
-    // Write code to virtual FS so Python can import it
-    pyodide.FS.writeFile("parse_results.py", code);
+    // Write code to virtual FS and import it now, so the first parse doesn't pay for it
+    py.FS.writeFile("parse_results.py", await parserSource);
+    py.runPython(STREAM_PARSER);
+    mark("parser");
 
-    console.log("✅ Pyodide Ready!");
+    pyodide = py;
+    timings.total = timings.parser;
+    console.log("✅ Pyodide Ready!", timings, bootStats);
+    postMessage({ status: "ready", timings, cache: { ...bootStats } });
     return pyodide;
 }
 
+function ensurePyodide() {
+    if (!setupPromise) {
+        setupPromise = setupPyodide().catch((e) => {
+            setupPromise = null;  // allow a retry on the next message
+            throw e;
+        });
+    }
+    return setupPromise;
+}
+
 // 2. Message Handler
 self.onmessage = async (event) => {
     // Warmup Command
     if (event.data.type === 'init') {
         try {
-            await setupPyodide();
+            await ensurePyodide();
             console.log("🔥 Pyodide Warmed Up!");
-        } catch (e) { console.error("Warmup failed:", e); }
+        } catch (e) {
+            console.error("Warmup failed:", e);
+            postMessage({ status: 'init_failed', error: e.message });
+        }
         return;
     }
 
-    const { fileBuffer, filename } = event.data;
+    // Jobs (replies carry the job id; 'error' ends any of them):
+    //   { type: 'open', id, fileBuffer }                          -> 'opened' { header }
+    //   { type: 'pages', id, firstPage, lastPage, withStatistics } -> 'progress' per page, then 'pages_done'
+    //   { type: 'statistics', id, students, course_metadata }    -> 'statistics' { statistics }
+    //   { type: 'close', id }
+    const { type, id } = event.data;
+    const path = `/tmp/upload_${id}.pdf`;
 
     try {
-        if (!pyodide) await setupPyodide();
-
-        postMessage({ status: 'processing', message: `Analyzing ${filename}...` });
-
-        // Write uploaded file to virtual FS
-        pyodide.FS.writeFile(filename, new Uint8Array(fileBuffer));
-
-        // Run Python Code!
-        // We import the user's function and call it
-        let result = await pyodide.runPythonAsync(`
-            import js
-            from parse_results import parse_pdf
-            import json
-            
-            # Run parser on virtual file
-            filename = "${filename}"
-            print(f"Processing {filename} inside browser...")
-            
-            try:
-                data = parse_pdf(filename)
-                # Serialize result to JSON string to pass back
-                json.dumps(data)
-            except Exception as e:
-                json.dumps({"error": str(e)})
-        `);
-
-        // Cleanup virtual file
-        pyodide.FS.unlink(filename);
-
-        // Send back JSON result
-        postMessage({ status: 'complete', result: JSON.parse(result) });
+        await ensurePyodide();
+
+        if (type === 'open') {
+            // Write uploaded file to virtual FS
+            pyodide.FS.writeFile(path, new Uint8Array(event.data.fileBuffer));
+            postMessage({ status: 'opened', id, header: callPy('open_doc', path) });
+
+        } else if (type === 'pages') {
+            const { firstPage, lastPage, withStatistics } = event.data;
+            const emit = (batch) => postMessage({
+                status: 'progress',
+                id,
+                message: `Parsing page ${batch.page} of ${batch.last_page}...`,
+                ...batch,
+            });
+            const statistics = callPy('parse_pages', path, emit, firstPage, lastPage ?? null, !!withStatistics);
+            postMessage({ status: 'pages_done', id, firstPage, lastPage, statistics });
+
+        } else if (type === 'statistics') {
+            const statistics = callPy('statistics', event.data.students, event.data.course_metadata);
+            postMessage({ status: 'statistics', id, statistics });
+
+        } else if (type === 'close') {
+            callPy('close_doc', path);
+            if (pyodide.FS.analyzePath(path).exists) pyodide.FS.unlink(path);
+        }
 
     } catch (error) {
         console.error("Worker Error:", error);
-        postMessage({ status: 'error', error: error.message });
+        postMessage({ status: 'error', id, error: error.message });
     }
 };
+
+function callPy(name, ...args) {
+    const fn = pyodide.globals.get(name);
+    try {
+        return fn(...args);
+    } finally {
+        fn.destroy();
+    }
+}
@@ -4,6 +4,7 @@ import Upload from './components/Upload'
 import CachedResults from './components/CachedResults'
 import Dashboard from './components/Dashboard'
 import FloatingShapes from './components/FloatingShapes'
+import { fetchSummary, loadAllStudents } from './lib/shardedResult'
 
 function App() {
   const [resultData, setResultData] = useState(null)
@@ -13,6 +14,7 @@ function App() {
   const taglineRef = useRef(null)
   const contentRef = useRef(null)
   const footerRef = useRef(null)
+  const shardLoadRef = useRef(null)
 
   useEffect(() => { loadCachedResults() }, [])
 
@@ -22,6 +24,7 @@ function App() {
       // If we go back to home path, clear results
       const path = window.location.pathname
       if (path === '/home' || path === '/') {
+        shardLoadRef.current?.abort()
         setResultData(null)
         setFileName('')
         loadCachedResults()
@@ -93,7 +96,14 @@ function App() {
 
     // 1. Fetch Static Cache (Foundation results that are committed)
     try {
-      const staticRes = await fetch('/data/index.json')
+      // Pointer is revalidated each load; the versioned index it names is cached forever
+      let indexUrl = '/data/index.json'
+      const pointerRes = await fetch('/data/index.latest.json', { cache: 'no-cache' })
+      if (pointerRes.ok && (pointerRes.headers.get('content-type') || '').includes('json')) {
+        const pointer = await pointerRes.json()
+        if (pointer.index) indexUrl = `/data/${pointer.index}`
+      }
+      const staticRes = await fetch(indexUrl)
       if (staticRes.ok) {
         const staticData = await staticRes.json()
         combined = [...staticData]
@@ -139,7 +149,26 @@ function App() {
     const hash = typeof input === 'object' ? input.hash : input
 
     try {
-      // Try static file first
+      // Try the sharded static layout first: render from the summary, stream students in
+      const summary = await fetchSummary(hash)
+      if (summary?.layout) {
+        shardLoadRef.current?.abort()
+        const controller = new AbortController()
+        shardLoadRef.current = controller
+
+        setResultData({ ...summary, students: [], shardHash: hash })
+        setFileName(summary.meta?.filename || 'Cached Result')
+        window.history.pushState({ hasResult: true }, '', '/results')
+
+        loadAllStudents(hash, summary.layout.chunk_count, (students) => {
+          setResultData((prev) => prev?.shardHash === hash
+            ? { ...prev, students: prev.students.concat(students) }
+            : prev)
+        }, { signal: controller.signal }).catch((e) => console.error('Student chunks failed:', e))
+        return
+      }
+
+      // Then the monolithic static file
       const staticRes = await fetch(`/data/${hash}.json`)
       if (staticRes.ok) {
         const data = await staticRes.json()
@@ -163,6 +192,7 @@ function App() {
   }
 
   const handleReset = () => {
+    shardLoadRef.current?.abort()
     // If we have history state, go back (triggering popstate logic)
     if (window.history.state?.hasResult) {
       window.history.back()
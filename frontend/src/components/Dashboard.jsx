@@ -60,7 +60,8 @@ export default function Dashboard({ data, fileName, onReset }) {
                     <div style={{ minWidth: 0 }}>
                         <h2 style={{ fontSize: '15px', fontWeight: 700, overflow: 'hidden', textOverflow: 'ellipsis', whiteSpace: 'nowrap' }}>{fileName}</h2>
                         <p style={{ fontSize: '12px', marginTop: '2px', color: 'var(--color-text-muted)' }}>
-                            {data.students.length} students · {Object.keys(data.course_metadata).length} subjects
+                            {data.statistics?.total_students ?? data.students.length} students · {Object.keys(data.course_metadata).length} subjects
+                            {data.layout && data.students.length < data.layout.student_count && ` · loading ${data.students.length}/${data.layout.student_count}`}
                         </p>
                     </div>
                 </div>
@@ -86,7 +87,7 @@ export default function Dashboard({ data, fileName, onReset }) {
 
             <div className="two-col" style={{ marginBottom: '24px' }}>
                 <Toppers toppers={data.statistics.subject_toppers} metadata={data.course_metadata} onStudentClick={handleStudentClick} />
-                <GradeChart students={data.students} />
+                <GradeChart students={data.students} histograms={data.statistics.histograms} />
             </div>
 
             {data.statistics.college_statistics && Object.keys(data.statistics.college_statistics).length > 0 && (
@@ -96,7 +97,7 @@ export default function Dashboard({ data, fileName, onReset }) {
             )}
 
             <div style={{ marginBottom: '24px' }} ref={searchRef}>
-                <StudentSearch students={data.students} externalSeatNo={lookupSeatNo} onExternalConsumed={() => setLookupSeatNo(null)} />
+                <StudentSearch students={data.students} shardHash={data.shardHash} externalSeatNo={lookupSeatNo} onExternalConsumed={() => setLookupSeatNo(null)} />
             </div>
 
             <StudentsTable students={data.students} onStudentClick={handleStudentClick} />
@@ -6,7 +6,7 @@ import { Chart, DoughnutController, ArcElement, Tooltip, Legend } from 'chart.js
 Chart.register(DoughnutController, ArcElement, Tooltip, Legend)
 gsap.registerPlugin(ScrollTrigger)
 
-export default function GradeChart({ students }) {
+export default function GradeChart({ students, histograms }) {
     const canvasRef = useRef(null)
     const chartRef = useRef(null)
     const cardRef = useRef(null)
@@ -15,11 +15,16 @@ export default function GradeChart({ students }) {
         if (!canvasRef.current) return
 
         const gradeCounts = { O: 0, 'A+': 0, A: 0, 'B+': 0, B: 0, C: 0, D: 0, F: 0 }
-        students.forEach((s) => {
-            s.subjects.forEach((sub) => {
-                if (sub.grade && gradeCounts.hasOwnProperty(sub.grade)) gradeCounts[sub.grade]++
+        if (histograms?.grade_counts) {
+            // Precomputed at parse time
+            for (const grade of Object.keys(gradeCounts)) gradeCounts[grade] = histograms.grade_counts[grade] || 0
+        } else {
+            students.forEach((s) => {
+                s.subjects.forEach((sub) => {
+                    if (sub.grade && gradeCounts.hasOwnProperty(sub.grade)) gradeCounts[sub.grade]++
+                })
             })
-        })
+        }
 
         if (chartRef.current) chartRef.current.destroy()
 
@@ -92,7 +97,7 @@ export default function GradeChart({ students }) {
         })
 
         return () => { if (chartRef.current) chartRef.current.destroy(); trigger.kill() }
-    }, [students])
+    }, [students, histograms])
 
     return (
         <div
@@ -4,11 +4,13 @@ import { ScrollTrigger } from 'gsap/ScrollTrigger'
 
 gsap.registerPlugin(ScrollTrigger)
 
-function CgpaHistogram({ students }) {
+function CgpaHistogram({ students, bins: precomputed }) {
     const barsRef = useRef(null)
 
-    // Compute CGPA distribution in 10 buckets: 0-1, 1-2, ..., 9-10
+    // CGPA distribution in 10 buckets: 0-1, 1-2, ..., 9-10 (precomputed at parse time
+    // in statistics.histograms; counted here only for results stored before that)
     const buckets = useMemo(() => {
+        if (precomputed) return precomputed
         const bins = new Array(10).fill(0)
         students.forEach((s) => {
             if (s.cgpa != null && s.cgpa > 0) {
@@ -17,7 +19,7 @@ function CgpaHistogram({ students }) {
             }
         })
         return bins
-    }, [students])
+    }, [students, precomputed])
 
     const max = Math.max(...buckets, 1)
 
@@ -147,7 +149,7 @@ export default function StatsGrid({ stats, students }) {
                         >
                             0
                         </p>
-                        {item.histogram && students && <CgpaHistogram students={students} />}
+                        {item.histogram && (stats.histograms || students) && <CgpaHistogram students={students} bins={stats.histograms?.cgpa_bins} />}
                     </div>
                 ))}
             </div>
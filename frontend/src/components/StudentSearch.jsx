@@ -1,10 +1,12 @@
 import { useState, useEffect, useRef } from 'react'
 import gsap from 'gsap'
 import { ScrollTrigger } from 'gsap/ScrollTrigger'
+import { fetchStudentBySeat } from '../lib/shardedResult'
+import { lookupSeat, searchName, fetchHit } from '../lib/searchIndex'
 
 gsap.registerPlugin(ScrollTrigger)
 
-export default function StudentSearch({ students, externalSeatNo, onExternalConsumed }) {
+export default function StudentSearch({ students, shardHash, externalSeatNo, onExternalConsumed }) {
     const [seatNo, setSeatNo] = useState('')
     const [result, setResult] = useState(null)
     const cardRef = useRef(null)
@@ -74,19 +76,49 @@ export default function StudentSearch({ students, externalSeatNo, onExternalCons
         F: { bg: '#ef444422', color: '#FAFAF9' },
     }
 
-    const runAnalysis = (query) => {
+    // Seat number or name. Students of sharded results may not have streamed in yet:
+    // then the static search index (or seats.json) locates the one chunk to fetch.
+    const findStudent = async (q) => {
+        if (/^\d+$/.test(q)) {
+            const local = students.find((s) => s.seat_no === q)
+            if (local || !shardHash) return { student: local }
+            const hit = (await lookupSeat(q))?.find((h) => h.hash === shardHash)
+            return { student: hit ? await fetchHit(hit) : await fetchStudentBySeat(shardHash, q) }
+        }
+
+        const words = q.toLowerCase().split(/\s+/)
+        const nameMatches = (name) => {
+            const tokens = name.toLowerCase().split(/\s+/)
+            return words.every((w) => tokens.some((t) => t.startsWith(w)))
+        }
+        let matches = students.filter((s) => nameMatches(s.name))
+        if (!matches.length && shardHash) {
+            matches = (await searchName(q, shardHash)) || []
+        }
+        if (matches.length === 1) {
+            const match = matches[0]
+            return { student: match.subjects ? match : await fetchHit(match) }
+        }
+        return { matches: matches.slice(0, 8).map(({ name, seat_no }) => ({ name, seat_no })), total: matches.length }
+    }
+
+    const runAnalysis = async (query) => {
         const q = (query || seatNo).trim()
         if (!q) return
 
-        const student = students.find((s) => s.seat_no === q)
+        const { student, matches, total } = await findStudent(q)
+        if (matches?.length) {
+            setResult({ error: true, message: `${total} students match "${q}"`, matches })
+            return
+        }
         if (!student) {
-            setResult({ error: true, message: `No student found for seat #${q}` })
+            setResult({ error: true, message: /^\d+$/.test(q) ? `No student found for seat #${q}` : `No student named "${q}"` })
             return
         }
 
         const rank = students.filter((s) => s.total_marks > student.total_marks).length + 1
         const percentile = (
-            (students.filter((s) => s.total_marks < student.total_marks).length / students.length) * 100
+            (students.filter((s) => s.total_marks < student.total_marks).length / Math.max(students.length, 1)) * 100
         ).toFixed(1)
 
         const subjectComparison = student.subjects
@@ -133,8 +165,7 @@ export default function StudentSearch({ students, externalSeatNo, onExternalCons
                     value={seatNo}
                     onChange={(e) => setSeatNo(e.target.value)}
                     onKeyDown={(e) => e.key === 'Enter' && runAnalysis()}
-                    placeholder="Enter seat number"
-                    maxLength={7}
+                    placeholder="Seat number or name"
                     style={{
                         flex: 1, padding: '12px 18px', borderRadius: 'var(--radius-sm)',
                         background: 'var(--color-surface-2)', border: '1px solid var(--color-border)',
@@ -167,6 +198,23 @@ export default function StudentSearch({ students, externalSeatNo, onExternalCons
                     {result.error ? (
                         <div style={{ padding: '24px', textAlign: 'center', background: 'var(--color-negative-soft)', borderRadius: 'var(--radius-sm)', border: '1px solid rgba(248,113,113,0.2)' }}>
                             <p style={{ color: 'var(--color-negative)', fontSize: '14px', fontWeight: 600 }}>{result.message}</p>
+                            {result.matches && (
+                                <div style={{ display: 'flex', flexWrap: 'wrap', gap: '8px', justifyContent: 'center', marginTop: '14px' }}>
+                                    {result.matches.map((m) => (
+                                        <button
+                                            key={m.seat_no}
+                                            onClick={() => { setSeatNo(m.seat_no); runAnalysis(m.seat_no) }}
+                                            style={{
+                                                fontSize: '12px', fontWeight: 600, padding: '6px 12px', borderRadius: '999px',
+                                                background: 'var(--color-surface-2)', border: '1px solid var(--color-border)',
+                                                color: 'var(--color-text-secondary)', cursor: 'pointer', fontFamily: 'var(--font-body)',
+                                            }}
+                                        >
+                                            {m.name} · #{m.seat_no}
+                                        </button>
+                                    ))}
+                                </div>
+                            )}
                         </div>
                     ) : (
                         <div style={{ background: 'var(--color-surface-2)', borderRadius: 'var(--radius-sm)', border: '1px solid var(--color-border)', overflow: 'hidden' }}>
@@ -89,7 +89,9 @@ export default function Toppers({ toppers, metadata, onStudentClick }) {
                             </div>
                             <div className="topper-score" style={{ textAlign: 'right', flexShrink: 0, marginLeft: '16px' }}>
                                 <p className="font-display" style={{ fontSize: '20px', lineHeight: 1, color: 'var(--color-accent)' }}>{topper.marks}</p>
-                                <p style={{ fontSize: '10px', color: 'var(--color-text-muted)', fontWeight: 500 }}>#{topper.seat_no}</p>
+                                <p style={{ fontSize: '10px', color: 'var(--color-text-muted)', fontWeight: 500 }}>
+                                    #{topper.seat_no}{topper.ties > 0 && ` · +${topper.ties} tied`}
+                                </p>
                             </div>
                         </div>
                     )
@@ -1,5 +1,6 @@
 import { useState, useRef, useEffect } from 'react'
 import gsap from 'gsap'
+import { parseInWorkers } from '../lib/parallelParse'
 
 export default function Upload({ onFileProcessed }) {
     const [isDragging, setIsDragging] = useState(false)
@@ -49,16 +50,28 @@ export default function Upload({ onFileProcessed }) {
     }, [])
 
     const [statusMessage, setStatusMessage] = useState("Analyzing your results...")
-    const workerRef = useRef(null)
+    const workersRef = useRef([])
+
+    // Pyodide workers: one is started (and warmed) right away, more are added on demand
+    // for big ledgers and kept for later uploads
+    const getWorkers = (count) => {
+        while (workersRef.current.length < count) {
+            const worker = new Worker('/py_worker.js')
+            worker.postMessage({ type: 'init' })
+            workersRef.current.push(worker)
+        }
+        return workersRef.current
+    }
 
     // Initialize Pyodide Worker
     useEffect(() => {
-        workerRef.current = new Worker('/py_worker.js')
-
         // Start background download immediately!
-        workerRef.current.postMessage({ type: 'init' })
+        getWorkers(1)
 
-        return () => workerRef.current?.terminate()
+        return () => {
+            workersRef.current.forEach((worker) => worker.terminate())
+            workersRef.current = []
+        }
     }, [])
 
     const handleDragOver = (e) => { e.preventDefault(); setIsDragging(true) }
@@ -85,32 +98,17 @@ export default function Upload({ onFileProcessed }) {
         }
 
         // Try Browser Parsing First
-        if (workerRef.current) {
-            const reader = new FileReader()
-            reader.onload = (e) => {
-                const buffer = e.target.result
-
-                // Listener for this specific job
-                const handleMsg = (event) => {
-                    const { status, result, error, message } = event.data
-
-                    if (status === 'loading' || status === 'processing') {
-                        setStatusMessage(message)
-                    } else if (status === 'complete') {
-                        workerRef.current.removeEventListener('message', handleMsg)
-                        onFileProcessed(result, file.name)
-                        setIsProcessing(false)
-                    } else if (status === 'error') {
-                        workerRef.current.removeEventListener('message', handleMsg)
-                        console.warn("Browser Parse Failed, falling back to Cloud:", error)
-                        fallbackToCloud(file)
-                    }
-                }
-
-                workerRef.current.addEventListener('message', handleMsg)
-                workerRef.current.postMessage({ fileBuffer: buffer, filename: file.name })
+        if (typeof Worker !== 'undefined') {
+            let result
+            try {
+                const buffer = await file.arrayBuffer()
+                result = await parseInWorkers(buffer, getWorkers, { onStatus: setStatusMessage })
+            } catch (error) {
+                console.warn("Browser Parse Failed, falling back to Cloud:", error)
+                return fallbackToCloud(file)
             }
-            reader.readAsArrayBuffer(file)
+            onFileProcessed(result, file.name)
+            setIsProcessing(false)
         } else {
             fallbackToCloud(file)
         }
@@ -0,0 +1,129 @@
+// Browser-side PDF parsing across several Pyodide workers (public/py_worker.js)
+//   1. the first worker opens the PDF and reports the header (page count, course metadata)
+//   2. more workers join when the ledger is big enough; pages 2..N are handed out in
+//      small ranges from a shared queue, so a worker still booting simply takes fewer
+//   3. students are merged in page order and statistics computed once, by
+//      parse_results.compute_statistics, so the result matches parse_pdf exactly
+
+// Rough peak per Pyodide worker with pdfplumber loaded and a ledger open
+const WORKER_MEMORY_MB = 300
+const MAX_WORKERS = 8
+const MIN_PAGES_PER_WORKER = 6
+// A page range that fails is retried (by the same worker, or whichever is free) this many times in all
+const MAX_RANGE_ATTEMPTS = 3
+
+// Leave a core for the UI thread and half of the device memory for everything else
+export function pickWorkerCount() {
+    const cores = navigator.hardwareConcurrency || 2
+    const memoryGb = navigator.deviceMemory || 4  // Chromium only, reported in steps up to 8
+    const byMemory = Math.floor((memoryGb * 1024 * 0.5) / WORKER_MEMORY_MB)
+    return Math.max(1, Math.min(cores - 1, byMemory, MAX_WORKERS))
+}
+
+// One job on one worker: resolves with the reply whose status is `done`
+function request(worker, message, done, { onMessage, transfer = [] } = {}) {
+    return new Promise((resolve, reject) => {
+        const handle = (event) => {
+            const data = event.data
+            if (data.id === undefined) {
+                // Boot progress ('loading') from a worker that is still starting up
+                if (data.message) onMessage?.(data)
+                return
+            }
+            if (data.id !== message.id) return
+            if (data.status === 'error') {
+                worker.removeEventListener('message', handle)
+                reject(new Error(data.error))
+            } else if (data.status === done) {
+                worker.removeEventListener('message', handle)
+                resolve(data)
+            } else {
+                onMessage?.(data)
+            }
+        }
+        worker.addEventListener('message', handle)
+        worker.postMessage(message, transfer)
+    })
+}
+
+// getWorkers(n) returns at least n workers (creating them as needed).
+// onStatus(message) and onProgress({ pagesDone, pageCount, students }) report progress.
+export async function parseInWorkers(buffer, getWorkers, { maxWorkers = pickWorkerCount(), onStatus, onProgress } = {}) {
+    const id = `${Date.now()}_${Math.random().toString(36).slice(2, 8)}`
+    const relay = (data) => data.message && onStatus?.(data.message)
+    const [first] = getWorkers(1)
+    const opened = new Set()
+
+    try {
+        // Keep our own copy of the bytes: the last worker opened gets the original transferred
+        const { header } = await request(first, { type: 'open', id, fileBuffer: buffer.slice(0) }, 'opened', { onMessage: relay })
+        opened.add(first)
+        const pageCount = header.page_count
+        const ledgerPages = Math.max(pageCount - 1, 0)
+
+        const byPage = new Map()
+        let studentCount = 0
+        const onPage = (data) => {
+            if (data.status !== 'progress') return relay(data)
+            // A retried range reports its pages again
+            studentCount += data.students.length - (byPage.get(data.page)?.length || 0)
+            byPage.set(data.page, data.students)
+            onStatus?.(`Parsing page ${byPage.size + 1} of ${pageCount}... (${studentCount} students)`)
+            onProgress?.({ pagesDone: byPage.size + 1, pageCount, students: studentCount })
+        }
+
+        const count = Math.max(1, Math.min(maxWorkers, Math.floor(ledgerPages / MIN_PAGES_PER_WORKER)))
+        let statistics = null
+
+        if (count === 1) {
+            // Single worker: one pass with statistics computed at the end of it
+            ({ statistics } = await request(first, { type: 'pages', id, firstPage: 2, lastPage: null, withStatistics: true }, 'pages_done', { onMessage: onPage }))
+        } else {
+            const workers = getWorkers(count).slice(0, count)
+            const rangeSize = Math.min(25, Math.max(2, Math.ceil(ledgerPages / (count * 4))))
+            const queue = []
+            for (let p = 2; p <= pageCount; p += rangeSize) queue.push({ firstPage: p, lastPage: Math.min(p + rangeSize - 1, pageCount), attempts: 0 })
+
+            const failures = []
+            const drain = async (worker, index) => {
+                if (!opened.has(worker)) {
+                    const last = index === workers.length - 1
+                    try {
+                        await request(worker, { type: 'open', id, fileBuffer: last ? buffer : buffer.slice(0) }, 'opened', { transfer: last ? [buffer] : [] })
+                        opened.add(worker)
+                    } catch (e) {
+                        failures.push(e)
+                        return  // the remaining workers pick up its share
+                    }
+                }
+                // A failed range goes back to the front of the queue and this worker keeps
+                // draining, so it is retried even when every other worker has already finished
+                while (queue.length) {
+                    const range = queue.shift()
+                    try {
+                        await request(worker, { type: 'pages', id, firstPage: range.firstPage, lastPage: range.lastPage }, 'pages_done', { onMessage: onPage })
+                    } catch (e) {
+                        if (++range.attempts >= MAX_RANGE_ATTEMPTS) {
+                            throw new Error(`Pages ${range.firstPage}-${range.lastPage} failed ${range.attempts} times: ${e.message}`)
+                        }
+                        queue.unshift(range)
+                    }
+                }
+            }
+            await Promise.all(workers.map(drain))
+            if (queue.length) throw failures[0] || new Error('No worker could parse the remaining pages')
+        }
+
+        // Merge in page order (the order parse_pdf sees them)
+        const students = []
+        for (let p = 2; p <= pageCount; p++) for (const s of byPage.get(p) || []) students.push(s)
+
+        if (!statistics) {
+            onStatus?.('Computing statistics...')
+            ;({ statistics } = await request(first, { type: 'statistics', id, students, course_metadata: header.course_metadata }, 'statistics'))
+        }
+        return { ...header, students, statistics }
+    } finally {
+        for (const worker of opened) worker.postMessage({ type: 'close', id })
+    }
+}
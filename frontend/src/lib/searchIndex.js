@@ -0,0 +1,77 @@
+// Prebuilt static search index across all results (see static_export.build_search_index)
+//   /data/search/meta.json          hashes + available shards
+//   /data/search/seats/<ppp>.json   seat_no -> [[hash_idx, chunk, offset], ...]
+//   /data/search/names/<pp>.json    [[token, name, seat_no, hash_idx, chunk, offset], ...]
+import { fetchChunk } from './shardedResult'
+
+let metaPromise = null
+const shardCache = new Map()
+
+async function fetchJson(url) {
+    const res = await fetch(url)
+    if (!res.ok || !(res.headers.get('content-type') || '').includes('json')) return null
+    return res.json()
+}
+
+function fetchMeta() {
+    if (!metaPromise) metaPromise = fetchJson('/data/search/meta.json').catch(() => null)
+    return metaPromise
+}
+
+function fetchShard(kind, key) {
+    const url = `/data/search/${kind}/${key}.json`
+    if (!shardCache.has(url)) shardCache.set(url, fetchJson(url).catch(() => null))
+    return shardCache.get(url)
+}
+
+const toHit = (meta, [hashIdx, chunk, offset], extra = {}) => ({ hash: meta.hashes[hashIdx], chunk, offset, ...extra })
+
+// All results a seat number appears in: [{ hash, chunk, offset }]
+export async function lookupSeat(seatNo) {
+    const meta = await fetchMeta()
+    if (!meta) return null
+    const key = seatNo.slice(0, meta.seat_prefix_len)
+    if (!meta.seat_shards.includes(key)) return []
+    const shard = await fetchShard('seats', key)
+    return (shard?.[seatNo] || []).map((p) => toHit(meta, p))
+}
+
+// Students with a name word starting with `query`: [{ hash, chunk, offset, name, seat_no }]
+// `hash` restricts hits to one result (applied before `limit`)
+export async function searchName(query, hash = null, limit = 20) {
+    const meta = await fetchMeta()
+    const words = query.trim().toLowerCase().split(/\s+/).filter(Boolean)
+    const word = words[0] || ''
+    if (!meta || word.length < meta.name_prefix_len) return null
+    const key = word.slice(0, meta.name_prefix_len)
+    if (!meta.name_shards.includes(key)) return []
+    const entries = (await fetchShard('names', key)) || []
+
+    // Entries are sorted by token: binary search to the first candidate
+    let lo = 0, hi = entries.length
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1
+        if (entries[mid][0] < word) lo = mid + 1
+        else hi = mid
+    }
+    const hits = []
+    const seen = new Set()
+    for (let i = lo; i < entries.length && entries[i][0].startsWith(word) && hits.length < limit; i++) {
+        const [, name, seat_no, ...posting] = entries[i]
+        if (hash && meta.hashes[posting[0]] !== hash) continue
+        // Remaining query words must prefix some other word of the name
+        const tokens = name.toLowerCase().split(/\s+/)
+        if (!words.every((w) => tokens.some((t) => t.startsWith(w)))) continue
+        const id = `${posting[0]}:${seat_no}`
+        if (seen.has(id)) continue
+        seen.add(id)
+        hits.push(toHit(meta, posting, { name, seat_no }))
+    }
+    return hits
+}
+
+// Resolve a hit to the full student record (fetches one chunk)
+export async function fetchHit({ hash, chunk, offset }) {
+    const students = await fetchChunk(hash, chunk)
+    return students[offset] || null
+}
@@ -0,0 +1,65 @@
+// Sharded static results (see static_export.py)
+//   /data/<hash>/summary.json        everything except students, plus `layout`
+//   /data/<hash>/students/<n>.json   students sorted by seat_no
+//   /data/<hash>/seats.json          [first_seat, last_seat] per chunk
+
+const seatMaps = new Map()
+const chunkCache = new Map()
+
+export async function fetchSummary(hash) {
+    const res = await fetch(`/data/${hash}/summary.json`)
+    if (!res.ok) return null
+    // Static hosts answer unknown paths with index.html — only accept JSON
+    if (!(res.headers.get('content-type') || '').includes('json')) return null
+    return res.json()
+}
+
+export async function fetchChunk(hash, n) {
+    const key = `${hash}/${n}`
+    if (!chunkCache.has(key)) {
+        chunkCache.set(key, fetch(`/data/${hash}/students/${n}.json`).then((res) => {
+            if (!res.ok) throw new Error(`Chunk ${n} failed`)
+            return res.json()
+        }).catch((e) => { chunkCache.delete(key); throw e }))
+    }
+    return chunkCache.get(key)
+}
+
+async function fetchSeatMap(hash) {
+    if (!seatMaps.has(hash)) {
+        seatMaps.set(hash, fetch(`/data/${hash}/seats.json`)
+            .then((res) => res.ok ? res.json() : [])
+            .catch((e) => { seatMaps.delete(hash); throw e }))
+    }
+    return seatMaps.get(hash)
+}
+
+// Fetch only the chunk that can contain this seat number
+export async function fetchStudentBySeat(hash, seatNo) {
+    const ranges = await fetchSeatMap(hash)
+    let lo = 0, hi = ranges.length - 1
+    while (lo <= hi) {
+        const mid = (lo + hi) >> 1
+        const [first, last] = ranges[mid]
+        if (seatNo < first) hi = mid - 1
+        else if (seatNo > last) lo = mid + 1
+        else {
+            const chunk = await fetchChunk(hash, mid)
+            return chunk.find((s) => s.seat_no === seatNo) || null
+        }
+    }
+    return null
+}
+
+// Stream every chunk in order, calling onChunk(students) as each one arrives
+export async function loadAllStudents(hash, chunkCount, onChunk, { concurrency = 4, signal } = {}) {
+    let next = 0
+    const worker = async () => {
+        while (next < chunkCount && !signal?.aborted) {
+            const n = next++
+            const students = await fetchChunk(hash, n)
+            if (!signal?.aborted) onChunk(students, n)
+        }
+    }
+    await Promise.all(Array.from({ length: Math.min(concurrency, chunkCount) }, worker))
+}
@@ -1,9 +1,28 @@
 
+import io
 import csv
-import json
-import re
+import sys
+import argparse
 from pathlib import Path
-import parse_results  # This imports the existing logic
+import batch_parse  # parse_results.parse_pdf over several files, merged
+
+# Per-student columns, in sheet order: (header, student key)
+STUDENT_COLUMNS = [
+    ('Seat No', 'seat_no'), ('Name', 'name'), ('Gender', 'gender'), ('Status', 'status'),
+    ('ERN', 'ern'), ('College', 'college'), ('Total Marks', 'total_marks'), ('CGPA', 'cgpa'),
+    ('Result', 'result'),
+]
+
+# Per-subject columns: (suffix, subject key, course_metadata flag saying the subject has it)
+SUBJECT_COLUMNS = [
+    ('TermWork', 'term_work', 'has_t1'),
+    ('Theory', 'external', 'has_e1'),  # 'external' is usually theory
+    ('Internal', 'internal', 'has_i1'),
+    ('Oral', 'oral', 'has_o1'),
+    ('Total', 'total', None),
+    ('Grade', 'grade', None),
+    ('GradePts', 'grade_points', None),
+]
 
 def filter_students(students, college_keyword):
     filtered = []
@@ -15,102 +34,135 @@ def filter_students(students, college_keyword):
             filtered.append(s)
     return filtered
 
-def flatten_student(s):
-    # Flatten subject marks
-    flat = {
-        'Seat No': s['seat_no'],
-        'Name': s['name'],
-        'Branch': s.get('branch', 'Unknown'),  # Added Branch
-        'Gender': s['gender'],
-        'Status': s['status'],
-        'ERN': s['ern'],
-        'College': s['college'],
-        'Total Marks': s['total_marks'],
-        'CGPA': s['cgpa'],
-        'Result': s['result'],
-    }
-    
-    # Sort subjects by code to ensure column alignment
-    sorted_subjects = sorted(s['subjects'], key=lambda x: x['code'])
-    
-    for subj in sorted_subjects:
-        code = subj['code']
-        # We'll use the code as prefix
-        flat[f'{code}_TermWork'] = subj['term_work']
-        flat[f'{code}_Theory'] = subj['external'] # 'external' is usually theory
-        flat[f'{code}_Internal'] = subj['internal']
-        flat[f'{code}_Oral'] = subj['oral'] 
-        flat[f'{code}_Total'] = subj['total']
-        flat[f'{code}_Grade'] = subj['grade']
-        flat[f'{code}_GradePts'] = subj['grade_points']
-        
-    return flat
-
-def main():
-    # Map file paths to Branch names
-    files = [
-        (r"d:\Projects\stats\1211461 Bachelor of Engineering( Computer Science and Engineering) ( Semester - I) ( NEP 2020 ).pdf", "CSE"),
-        (r"d:\Projects\stats\Bachelor of Engineering( Electronics Engineering)_Term_1_Grade_card.pdf", "EE")
-    ]
-    
-    all_students = []
-    
+def sheet_columns(course_metadata, students=(), tag=None):
+    """Columns for a result: student fields, then every subject in course_metadata with
+    the components it actually has (codes are taken from students only when the
+    metadata is missing). `tag` adds a column for a batch source key, e.g. 'branch'."""
+    columns = [('student', header, key) for header, key in STUDENT_COLUMNS]
+    if tag:
+        columns.insert(2, ('student', tag.title(), tag))
+
+    codes = list(course_metadata)
+    if not course_metadata:
+        for s in students:
+            for subj in s['subjects']:
+                if subj['code'] not in codes:
+                    codes.append(subj['code'])
+
+    for code in codes:
+        info = course_metadata.get(code)
+        for suffix, key, flag in SUBJECT_COLUMNS:
+            if info is None or flag is None or info.get(flag, True):
+                columns.append(('subject', f'{code}_{suffix}', (code, key)))
+    return columns
+
+def flatten_student(s, columns):
+    """One sheet row for a student, in column order"""
+    subjects = {subj['code']: subj for subj in s['subjects']}
+    row = []
+    for kind, _header, key in columns:
+        if kind == 'student':
+            row.append(s.get(key, 'Unknown'))
+        else:
+            code, field = key
+            row.append(subjects[code].get(field) if code in subjects else None)
+    return row
+
+def iter_csv(result, student_filter=None, tag=None):
+    """CSV text for a result, one row at a time (for streaming responses)"""
+    columns = sheet_columns(result.get('course_metadata', {}), result.get('students', []), tag)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def _take():
+        text = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return text
+
+    writer.writerow([header for _kind, header, _key in columns])
+    yield _take()
+    for s in result.get('students', []):
+        if student_filter is None or student_filter.matches(s):
+            writer.writerow(flatten_student(s, columns))
+            yield _take()
+
+def write_xlsx(result, fileobj, student_filter=None, tag=None):
+    """Write a result as XLSX in openpyxl's write-only mode (rows are not kept in memory)"""
+    from openpyxl import Workbook
+
+    columns = sheet_columns(result.get('course_metadata', {}), result.get('students', []), tag)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title='Students')
+    ws.append([header for _kind, header, _key in columns])
+    for s in result.get('students', []):
+        if student_filter is None or student_filter.matches(s):
+            ws.append(flatten_student(s, columns))
+    wb.save(fileobj)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export one college's students from several branch PDFs")
+    parser.add_argument('files', nargs='+', metavar='BRANCH=PDF',
+                        help="Branch PDF, tagged with its branch (a bare path is tagged with its file name)")
+    parser.add_argument('--college', action='append', help="College code or name (default: 1331, then MAEER)")
+    parser.add_argument('-o', '--output', required=True, help="Output .csv or .xlsx")
+    args = parser.parse_args(argv)
+
+    files = []
+    for spec in args.files:
+        branch, sep, path = spec.partition('=')
+        files.append((path, branch) if sep else (spec, Path(spec).stem))
+    colleges = args.college or ["1331", "MAEER"]
+
+    existing = []
     for pdf_file, branch in files:
         if not Path(pdf_file).exists():
             print(f"File not found: {pdf_file}")
             continue
-            
-        print(f"Parsing {pdf_file} for branch {branch}...")
-        try:
-            result = parse_results.parse_pdf(pdf_file)
-            print(f"Found {len(result['students'])} students in {Path(pdf_file).name}")
-            
-            # Inject branch info
-            for student in result['students']:
-                student['branch'] = branch
-                
-            all_students.extend(result['students'])
-        except Exception as e:
-            print(f"Error parsing {pdf_file}: {e}")
-            import traceback
-            traceback.print_exc()
-
-    # Filter for MAEER's MIT (1331)
-    target_students = filter_students(all_students, "1331")
-    
-    if not target_students:
-        print("No students found with '1331'. Trying 'MAEER'...")
-        target_students = filter_students(all_students, "MAEER")
-        
+        existing.append((branch, pdf_file))
+
+    # Parse all branches concurrently and tag each student with its branch.
+    # Only the target college's records are parsed: the college is checked on each
+    # record's header line (and whole pages without it are skipped) before any marks parsing.
+    from parse_results import StudentFilter
+    print(f"Parsing {len(existing)} files...")
+    try:
+        merged = batch_parse.parse_batch(existing, tag='branch', student_filter=StudentFilter(college=colleges))
+    except Exception as e:
+        print(f"Error parsing files: {e}")
+        import traceback
+        traceback.print_exc()
+        return
+
+    for source in merged['sources']:
+        print(f"Found {source['student_count']} students for branch {source['source']}")
+    all_students = merged['students']
+
+    # First keyword that matches anything wins (MAEER's MIT is 1331)
+    target_students = []
+    for keyword in colleges:
+        target_students = filter_students(all_students, keyword)
+        if target_students:
+            break
+        print(f"No students found with '{keyword}'.")
+
     print(f"Total target students found: {len(target_students)}")
-    
+
     if not target_students:
         print("No students found matching the criteria.")
         return
 
-    # Flatten data for CSV
-    flat_data = [flatten_student(s) for s in target_students]
-    
-    # Determine all CSV headers (superset of keys)
-    headers = list(flat_data[0].keys())
-    # Ensure standard columns come first
-    std_cols = ['Seat No', 'Name', 'Branch', 'Gender', 'Status', 'ERN', 'College', 'Total Marks', 'CGPA', 'Result']
-    
-    # Remove std cols from headers to re-add them in order
-    for c in std_cols:
-        if c in headers:
-            headers.remove(c)
-    
-    final_headers = std_cols + headers
-    
-    # Write to CSV
-    output_file = r"d:\Projects\stats\MAEER_MIT_Students.csv"
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=final_headers)
-        writer.writeheader()
-        writer.writerows(flat_data)
-        
+    # Columns come from course_metadata (every branch), not from the first student
+    result = {**merged, 'students': target_students}
+    output_file = args.output
+    if output_file.lower().endswith('.xlsx'):
+        with open(output_file, 'wb') as f:
+            write_xlsx(result, f, tag='branch')
+    else:
+        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+            f.writelines(iter_csv(result, tag='branch'))
+
     print(f"Successfully saved data to {output_file}")
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
@@ -1,68 +1,117 @@
-
 import os
+import sys
 import json
-import shutil
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from static_export import (PUBLIC_DATA_DIR, write_atomic, index_entry, write_index, write_sharded, has_sharded,
+                           remove_exported, build_search_index, compress_tree, print_compression_report,
+                           write_compression_report)
 
 CACHE_DIR = "cache"
-PUBLIC_DATA_DIR = "frontend/public/data"
 
-def generate_static_cache():
+# (hash, size, mtime) of every exported cache file plus its index entry, so unchanged
+# files are neither re-read nor re-copied on the next run
+MANIFEST_FILE = "static_manifest.json"
+
+def load_manifest():
+    if os.path.exists(MANIFEST_FILE):
+        try:
+            with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️  Could not read manifest ({e}), processing everything.")
+    return {}
+
+def export_cache_file(filename, size, mtime):
+    """Copy one cache file to public/data (atomically), write its sharded layout
+    and return its index entry. Runs in a worker process."""
+    src_path = os.path.join(CACHE_DIR, filename)
+    dst_path = os.path.join(PUBLIC_DATA_DIR, filename)
+    file_hash = filename.replace('.json', '')
+
+    with open(src_path, 'rb') as f:
+        raw = f.read()
+    data = json.loads(raw)
+
+    meta = data.get('meta', {})
+    stats = data.get('statistics', {})
+
+    # Fallback metadata
+    if not meta:
+        meta = {
+            'filename': 'Unknown Result File',
+            'timestamp': mtime,
+            'hash': file_hash
+        }
+
+    write_atomic(dst_path, raw)
+    write_sharded(file_hash, data)
+    return {'size': size, 'mtime': mtime, 'entry': index_entry(meta.get('hash', file_hash), meta, stats)}
+
+def generate_static_cache(full=False, workers=None):
     if not os.path.exists(CACHE_DIR):
         print("No cache directory found.")
         return
 
     os.makedirs(PUBLIC_DATA_DIR, exist_ok=True)
-    
-    index = []
-    
-    for filename in os.listdir(CACHE_DIR):
-        if not filename.endswith('.json'):
+
+    # --full re-exports everything, but still needs the last manifest to know what was removed
+    previous_manifest = load_manifest()
+    old_manifest = {} if full else previous_manifest
+    manifest = {}
+    todo = []
+    current = set()
+
+    for entry in os.scandir(CACHE_DIR):
+        if not entry.name.endswith('.json'):
             continue
-            
-        src_path = os.path.join(CACHE_DIR, filename)
-        dst_path = os.path.join(PUBLIC_DATA_DIR, filename)
-        
-        try:
-            with open(src_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            meta = data.get('meta', {})
-            stats = data.get('statistics', {})
-            
-            # Fallback metadata
-            if not meta:
-                meta = {
-                    'filename': 'Unknown Result File',
-                    'timestamp': os.path.getmtime(src_path),
-                    'hash': filename.replace('.json', '')
-                }
-            
-            entry = {
-                'hash': meta.get('hash', filename.replace('.json', '')),
-                'filename': meta.get('filename', 'Unknown'),
-                'timestamp': meta.get('timestamp', 0),
-                'student_count': stats.get('total_students', 0),
-                'college_count': len(stats.get('college_statistics', {}))
-            }
-            index.append(entry)
-            
-            # Copy file to public/data
-            shutil.copy2(src_path, dst_path)
-            print(f"Copied {filename} to public/data")
-            
-        except Exception as e:
-            print(f"Error processing {filename}: {e}")
-            
-    # Sort index by timestamp desc
-    index.sort(key=lambda x: x['timestamp'], reverse=True)
-    
-    # Save index.json
-    index_path = os.path.join(PUBLIC_DATA_DIR, "index.json")
-    with open(index_path, 'w', encoding='utf-8') as f:
-        json.dump(index, f, indent=2)
-        
-    print(f"Generated index.json with {len(index)} entries.")
+        current.add(entry.name)
+        st = entry.stat()
+        previous = old_manifest.get(entry.name)
+        if (previous and previous['size'] == st.st_size and previous['mtime'] == st.st_mtime
+                and os.path.exists(os.path.join(PUBLIC_DATA_DIR, entry.name))
+                and has_sharded(entry.name.replace('.json', ''))):
+            manifest[entry.name] = previous
+        else:
+            todo.append((entry.name, st.st_size, st.st_mtime))
+
+    unchanged = len(manifest)
+
+    # Results evicted or deleted from the cache since the last run leave public/data too
+    # (only ones this script exported: the bundled sample results are not in the manifest)
+    removed = 0
+    for filename in set(previous_manifest) - current:
+        if remove_exported(filename.replace('.json', '')):
+            print(f"Removed {filename} from public/data")
+        removed += 1
+
+    if todo:
+        # Reading + parsing JSON is CPU-bound, so fan out over processes
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(export_cache_file, *item): item[0] for item in todo}
+            for future in as_completed(futures):
+                filename = futures[future]
+                try:
+                    manifest[filename] = future.result()
+                    print(f"Copied {filename} to public/data")
+                except Exception as e:
+                    print(f"Error processing {filename}: {e}")
+
+    # Save index.json (sorted by timestamp desc)
+    index = write_index([item['entry'] for item in manifest.values()])
+    write_atomic(MANIFEST_FILE, json.dumps(manifest, indent=2).encode('utf-8'))
+
+    # The search index spans all results, so rebuild it whenever the set changed
+    if todo or removed or not os.path.exists(
+            os.path.join(PUBLIC_DATA_DIR, 'search', 'meta.json')):
+        build_search_index()
+
+    report = compress_tree()
+    print_compression_report(report)
+    write_compression_report(report)
+
+    print(f"Generated index.json with {len(index)} entries "
+          f"({len(todo)} new or changed, {unchanged} unchanged, {removed} removed).")
 
 if __name__ == "__main__":
-    generate_static_cache()
+    generate_static_cache(full='--full' in sys.argv[1:])
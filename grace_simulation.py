@@ -0,0 +1,321 @@
+"""
+Grace-mark / What-if Simulation
+Re-evaluates a whole cohort under a different grace rule or passing threshold, e.g.
+"how many would pass with up to +2 grace in external". A result is loaded once into
+(students x subjects x components) arrays; every rule set is then evaluated with numpy
+array operations, so a query over 50k students takes milliseconds.
+
+The recorded result is the baseline: an empty rule set reproduces it exactly. Only subjects
+a rule touches are re-evaluated, and only for students with printed marks in them; for a
+component with a grace rule, the recorded grace (@N) is replaced by the rule's grace.
+Passing marks come from the rules, then from the ledger's course table (course_metadata
+*_min, min_marks). A failure is only overturned when every passing mark of the subject is
+known; results parsed before those were recorded need `pass_fraction` or `thresholds`.
+
+Rule set (all optional):
+    {"grace": {"external": 2, "internal": 1},   # max grace per component per subject
+     "student_cap": 6,                           # max grace per student, else none is given
+     "pass_fraction": 0.4,                       # passing mark = fraction of the maximum
+     "thresholds": {"10411": {"external": 30, "total": 40}}}
+
+Needs numpy (pip install numpy).
+
+Usage:
+    python grace_simulation.py <hash> '{"grace": {"external": 2}}'
+"""
+
+import sys
+import json
+import threading
+from collections import OrderedDict
+
+# (student key, course_metadata prefix), in array order
+COMPONENTS = [('internal', 'i1'), ('external', 'e1'), ('term_work', 't1'), ('oral', 'o1')]
+COMPONENT_KEYS = [key for key, _prefix in COMPONENTS]
+# Percentage cut-offs of the 10-point scale: (minimum %, grade points, grade)
+GRADE_SCALE = [(90, 10, 'O'), (80, 9, 'A+'), (70, 8, 'A'), (60, 7, 'B+'), (55, 6, 'B'), (50, 5, 'C'), (40, 4, 'D')]
+GRADES = [grade for _cutoff, _points, grade in GRADE_SCALE] + ['F']
+
+def _np():
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        raise RuntimeError("numpy is not installed (pip install numpy)")
+
+class Cohort:
+    """A result as arrays: n students x s subjects (x 4 components)"""
+
+    def __init__(self, result):
+        np = _np()
+        meta = result.get('course_metadata', {})
+        students = result.get('students', [])
+        self.codes = list(meta)
+        for s in students:
+            for subj in s['subjects']:
+                if subj['code'] not in meta and subj['code'] not in self.codes:
+                    self.codes.append(subj['code'])
+        self.names = {code: meta.get(code, {}).get('name', code) for code in self.codes}
+        column = {code: j for j, code in enumerate(self.codes)}
+        n, s, c = len(students), len(self.codes), len(COMPONENTS)
+
+        def per_subject(key):
+            return np.array([meta.get(code, {}).get(key) or np.nan for code in self.codes], dtype=float).reshape(s)
+
+        self.credits = np.nan_to_num(per_subject('credits'))
+        self.max_marks = per_subject('max_marks')
+        self.min_total = per_subject('min_marks')
+        self.comp_min = np.stack([per_subject(f'{prefix}_min') for _key, prefix in COMPONENTS], axis=-1).reshape(s, c)
+        self.comp_max = np.stack([per_subject(f'{prefix}_max') for _key, prefix in COMPONENTS], axis=-1).reshape(s, c)
+        expected = np.array([[bool(meta.get(code, {}).get(f'has_{prefix}', True)) for _key, prefix in COMPONENTS]
+                             for code in self.codes], dtype=bool).reshape(s, c)
+
+        self.marks = np.full((n, s, c), np.nan)
+        self.grace = np.zeros((n, s, c))
+        self.total = np.full((n, s), np.nan)
+        self.taken = np.zeros((n, s), dtype=bool)
+        self.passed = np.ones((n, s), dtype=bool)
+        self.points = np.zeros((n, s))
+        self.grade = np.full((n, s), len(GRADES), dtype=np.int8)  # index into GRADES, len = none
+        self.result_passed = np.zeros(n, dtype=bool)
+        self.cgpa = np.zeros(n)
+        self.seat_no = [st['seat_no'] for st in students]
+        self.college_names = []
+        college_index = {}
+        self.college = np.zeros(n, dtype=np.int32)
+        grade_index = {grade: g for g, grade in enumerate(GRADES)}
+
+        for i, st in enumerate(students):
+            if st['college'] not in college_index:
+                college_index[st['college']] = len(self.college_names)
+                self.college_names.append(st['college'])
+            self.college[i] = college_index[st['college']]
+            self.result_passed[i] = st['result'] == 'PASS'
+            self.cgpa[i] = st.get('cgpa') or 0
+            for subj in st['subjects']:
+                j = column[subj['code']]
+                self.taken[i, j] = True
+                self.passed[i, j] = bool(subj['passed'])
+                self.points[i, j] = subj.get('grade_points') or 0
+                self.grade[i, j] = grade_index.get(subj.get('grade'), len(GRADES))
+                if subj.get('total') is not None:
+                    self.total[i, j] = subj['total']
+                for k, key in enumerate(COMPONENT_KEYS):
+                    if subj.get(key) is not None:
+                        self.marks[i, j, k] = subj[key]
+                    self.grace[i, j, k] = subj.get(f'{key}_grace') or 0
+
+        # A component is expected where the subject has it and the student took the subject
+        self.expected_in_subject = expected
+        self.expected = expected[None, :, :] & self.taken[:, :, None]
+
+    def nbytes(self):
+        """Memory held by the arrays (the seat number list is not counted)"""
+        return sum(value.nbytes for value in vars(self).values() if hasattr(value, 'nbytes'))
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _marks(value, label):
+    if not _is_number(value) or value < 0:
+        raise ValueError(f"{label} must be a non-negative number")
+
+def _components(value, label, keys):
+    if not isinstance(value, dict):
+        raise ValueError(f"{label} must be an object")
+    for key, marks in value.items():
+        if key not in keys:
+            raise ValueError(f"{label} must use {', '.join(keys)}")
+        _marks(marks, f"{label}.{key}")
+
+def validate_rules(rules):
+    """Raise ValueError for a malformed rule set"""
+    if not isinstance(rules, dict):
+        raise ValueError("rules must be an object")
+    unknown = set(rules) - {'grace', 'student_cap', 'pass_fraction', 'thresholds'}
+    if unknown:
+        raise ValueError(f"unknown rule(s): {', '.join(sorted(unknown))}")
+    _components(rules.get('grace', {}), 'grace', COMPONENT_KEYS)
+    thresholds = rules.get('thresholds', {})
+    if not isinstance(thresholds, dict):
+        raise ValueError("thresholds must be an object of subject codes")
+    for code, limits in thresholds.items():
+        _components(limits, f"thresholds.{code}", COMPONENT_KEYS + ['total'])
+    if rules.get('student_cap') is not None:
+        _marks(rules['student_cap'], 'student_cap')
+    fraction = rules.get('pass_fraction')
+    if fraction is not None and not (_is_number(fraction) and 0 < fraction <= 1):
+        raise ValueError("pass_fraction must be a number in (0, 1]")
+
+def simulate(cohort, rules):
+    """Outcome of the cohort under `rules` compared with the recorded one"""
+    np = _np()
+    validate_rules(rules)
+    n = len(cohort.seat_no)
+    none = len(GRADES)  # grade index of "no grade"
+
+    # Passing marks set by the rules (NaN where a rule says nothing)
+    rule_comp_min = np.full(cohort.comp_min.shape, np.nan)
+    rule_min_total = np.full(cohort.min_total.shape, np.nan)
+    fraction = rules.get('pass_fraction')
+    if fraction:
+        rule_comp_min = np.ceil(fraction * cohort.comp_max)
+        rule_min_total = np.ceil(fraction * cohort.max_marks)
+    for code, limits in rules.get('thresholds', {}).items():
+        if code not in cohort.names:
+            continue
+        j = cohort.codes.index(code)
+        for k, key in enumerate(COMPONENT_KEYS):
+            if key in limits:
+                rule_comp_min[j, k] = limits[key]
+        if 'total' in limits:
+            rule_min_total[j] = limits['total']
+    comp_min = np.where(np.isnan(rule_comp_min), cohort.comp_min, rule_comp_min)
+    min_total = np.where(np.isnan(rule_min_total), cohort.min_total, rule_min_total)
+
+    # Only cells (student x subject) a rule touches are re-evaluated, and only when every
+    # expected component has printed marks; everything else keeps the ledger's outcome
+    cap = np.array([rules.get('grace', {}).get(key, 0) for key in COMPONENT_KEYS], dtype=float)
+    graced = cap > 0
+    touched = ((~np.isnan(rule_comp_min) | graced[None, :]) & cohort.expected_in_subject).any(axis=1)
+    touched |= ~np.isnan(rule_min_total)
+    has_marks = ~np.isnan(cohort.total) & ~(cohort.expected & np.isnan(cohort.marks)).any(axis=2)
+    evaluate = cohort.taken & touched[None, :] & has_marks
+
+    # Grace: the rule's grace replaces the recorded (@N) grace of the components it covers,
+    # and is given only for what a component is short of its passing mark, up to the cap
+    removed = np.where(graced[None, None, :], cohort.grace, 0.0)
+    raw = cohort.marks - removed
+    short = np.nan_to_num(comp_min[None, :, :] - raw, nan=0.0).clip(min=0)
+    applied = np.where(evaluate[:, :, None] & cohort.expected & graced[None, None, :] & ~np.isnan(comp_min)[None, :, :]
+                       & (short <= cap), short, 0.0)
+    student_cap = rules.get('student_cap')
+    if student_cap is not None:
+        applied[applied.sum(axis=(1, 2)) > student_cap] = 0
+
+    new = raw + applied
+    new_total = cohort.total - removed.sum(axis=2) + applied.sum(axis=2)
+    comp_ok = (~cohort.expected | np.isnan(comp_min)[None, :, :] | (new >= comp_min[None, :, :])).all(axis=2)
+    total_ok = np.isnan(min_total)[None, :] | (new_total >= min_total[None, :])
+    checks_ok = comp_ok & total_ok
+    # A failure can only be overturned when every passing mark of the subject is known
+    known = (~np.isnan(min_total) & ~np.isnan(cohort.max_marks))[None, :] & \
+        ~(cohort.expected & np.isnan(comp_min)[None, :, :]).any(axis=2)
+    reevaluated = np.where(known, checks_ok, cohort.passed & checks_ok)
+    sub_pass = np.where(evaluate, reevaluated, cohort.passed) & cohort.taken
+
+    # Grades: recorded ones where the outcome and total stand; otherwise from the percentage
+    # of the maximum, and F / 0 points for failed subjects
+    pct = np.nan_to_num(new_total / cohort.max_marks[None, :] * 100, nan=0.0)
+    scale_points = np.select([pct >= cutoff for cutoff, _p, _g in GRADE_SCALE], [p for _c, p, _g in GRADE_SCALE], 0)
+    scale_grade = np.select([pct >= cutoff for cutoff, _p, _g in GRADE_SCALE], list(range(len(GRADE_SCALE))), none - 1)
+    regrade = evaluate & sub_pass & (~cohort.passed | (new_total != cohort.total))
+    failed = evaluate & ~sub_pass
+    points = np.where(regrade, scale_points, np.where(failed, 0, cohort.points))
+    grade = np.where(regrade, scale_grade, np.where(failed, none - 1, cohort.grade))
+
+    # Students with no changed subject keep their recorded result and CGPA
+    changed = ((sub_pass != (cohort.passed & cohort.taken)) | (grade != cohort.grade)).any(axis=1)
+    all_passed = (sub_pass | ~cohort.taken).all(axis=1) & cohort.taken.any(axis=1)
+    student_pass = np.where(changed, all_passed, cohort.result_passed)
+    credits = cohort.credits[None, :] * cohort.taken
+    credit_sum = credits.sum(axis=1)
+    new_cgpa = np.where(all_passed & (credit_sum > 0),
+                        (points * credits).sum(axis=1) / np.where(credit_sum > 0, credit_sum, 1), 0)
+    cgpa = np.where(changed, new_cgpa, cohort.cgpa)
+
+    before, after = cohort.result_passed, student_pass
+    colleges = len(cohort.college_names)
+    by_college = lambda mask: np.bincount(cohort.college, weights=mask, minlength=colleges).astype(int)
+    c_total = np.bincount(cohort.college, minlength=colleges)
+    c_before, c_after = by_college(before), by_college(after)
+    s_before = (cohort.passed & cohort.taken).sum(axis=0)
+    s_after = sub_pass.sum(axis=0)
+    s_taken = cohort.taken.sum(axis=0)
+
+    def grade_counts(grades, taken):
+        counts = np.bincount(grades[taken], minlength=len(GRADES) + 1)
+        return {g: int(counts[i]) for i, g in enumerate(GRADES) if counts[i]}
+
+    def median(values):
+        values = np.sort(values[values > 0])
+        return round(float(values[len(values) // 2]), 2) if len(values) else 0
+
+    pct_of = lambda part, whole: round(float(part) / whole * 100, 2) if whole else 0
+    graced = applied.sum(axis=(1, 2)) > 0
+    return {
+        'rules': rules,
+        'students': n,
+        'before': {'passed': int(before.sum()), 'pass_percentage': pct_of(before.sum(), n),
+                   'median_cgpa': median(cohort.cgpa), 'grade_counts': grade_counts(cohort.grade, cohort.taken)},
+        'after': {'passed': int(after.sum()), 'pass_percentage': pct_of(after.sum(), n),
+                  'median_cgpa': median(cgpa), 'grade_counts': grade_counts(grade, cohort.taken)},
+        'newly_passed': int((after & ~before).sum()),
+        'newly_failed': int((before & ~after).sum()),
+        'newly_passed_seats': [cohort.seat_no[i] for i in np.flatnonzero(after & ~before)],
+        'grace': {
+            'students': int(graced.sum()),
+            'marks': {key: int(applied[:, :, k].sum()) for k, key in enumerate(COMPONENT_KEYS)},
+        },
+        'subjects': {
+            code: {'name': cohort.names[code], 'students': int(s_taken[j]),
+                   'passed_before': int(s_before[j]), 'passed_after': int(s_after[j]),
+                   'pass_delta': int(s_after[j] - s_before[j])}
+            for j, code in enumerate(cohort.codes) if s_taken[j]
+        },
+        'colleges': {
+            name: {'students': int(c_total[c]), 'passed_before': int(c_before[c]), 'passed_after': int(c_after[c]),
+                   'pass_delta': int(c_after[c] - c_before[c]),
+                   'pass_percentage_after': pct_of(c_after[c], c_total[c])}
+            for c, name in enumerate(cohort.college_names)
+        },
+    }
+
+# Cohort arrays per result hash: built on the first simulation, reused by the next ones.
+# Also bounded by the arrays' total size; the most recent cohort is always kept.
+COHORT_CACHE_SIZE = 8
+COHORT_CACHE_BYTES = 64 * 1024 * 1024
+_cohorts = OrderedDict()
+_cohort_lock = threading.Lock()
+
+def simulate_stored(storage, file_hash, rules):
+    """simulate() for a stored result. None if it does not exist."""
+    with _cohort_lock:
+        cohort = _cohorts.get(file_hash)
+        if cohort is not None:
+            _cohorts.move_to_end(file_hash)
+    if cohort is None:
+        result = storage.get(file_hash)
+        if not result:
+            return None
+        cohort = Cohort(result)
+        with _cohort_lock:
+            _cohorts[file_hash] = cohort
+            while len(_cohorts) > 1 and (len(_cohorts) > COHORT_CACHE_SIZE or
+                                         sum(c.nbytes() for c in _cohorts.values()) > COHORT_CACHE_BYTES):
+                _cohorts.popitem(last=False)
+    return simulate(cohort, rules)
+
+def main(argv=None):
+    import argparse
+    from storage import StorageManager
+
+    parser = argparse.ArgumentParser(description="Simulate grace rules / passing thresholds over a stored result")
+    parser.add_argument('hash')
+    parser.add_argument('rules', nargs='?', default='{}', help="Rule set as JSON")
+    args = parser.parse_args(argv)
+
+    report = simulate_stored(StorageManager(), args.hash, json.loads(args.rules))
+    if report is None:
+        print("⚠️  Result not found")
+        return
+    before, after = report['before'], report['after']
+    print(f"🎯 Pass: {before['passed']} ({before['pass_percentage']}%) -> {after['passed']} ({after['pass_percentage']}%)")
+    print(f"   {report['newly_passed']} newly passed, {report['newly_failed']} newly failed, "
+          f"{report['grace']['students']} students given grace")
+    for code, row in report['subjects'].items():
+        if row['pass_delta']:
+            print(f"   {code} {row['name']}: {row['pass_delta']:+d}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
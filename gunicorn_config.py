@@ -1,8 +1,42 @@
 import os
+import shutil
+import tempfile
 
 port = os.environ.get("PORT", 10000)
 bind = f"0.0.0.0:{port}"
-workers = 1
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
 timeout = 300
-max_requests = 10
-worker_class = 'sync'
+
+# Request workers only do I/O and JSON; PDF parsing runs in the parse pool
+# (parse_pool.py), so threads keep reads responsive while a parse is running.
+# Parse processes are recycled by memory (PARSE_WORKER_MAX_RSS_MB), not request count.
+worker_class = 'gthread'
+threads = int(os.environ.get("WEB_THREADS", 8))
+
+# Prometheus multiprocess mode: workers write metrics to a shared directory that
+# /metrics aggregates. Must be set before workers import prometheus_client.
+prometheus_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'syllabix_metrics'))
+
+parse_pool_process = None
+
+def on_starting(server):
+    global parse_pool_process
+
+    # Stale files from a previous run would be summed into the new one
+    shutil.rmtree(prometheus_dir, ignore_errors=True)
+    os.makedirs(prometheus_dir, exist_ok=True)
+
+    # Start the pool before workers fork so they inherit its address and auth key
+    if os.environ.get('PARSE_POOL_SIZE', '') != '0':
+        from parse_pool import start_pool_process
+        parse_pool_process = start_pool_process()
+
+def on_exit(server):
+    if parse_pool_process is not None:
+        parse_pool_process.terminate()
+        parse_pool_process.wait(timeout=10)
+
+def child_exit(server, worker):
+    from metrics import mark_worker_dead
+    mark_worker_dead(worker.pid)
@@ -0,0 +1,407 @@
+"""
+Load Testing Harness for the result analysis API
+Boots server.py under gunicorn with a given config against local storage and
+drives a mixed workload of /api/parse (synthetic PDFs), /api/cache and
+/api/results/<hash>. Reports throughput, p50/p95/p99 latency and error rates.
+
+Usage:
+    python loadtest.py                                    # file storage, gunicorn_config.py
+    python loadtest.py --config gunicorn_config.py --gunicorn-args "--workers 4 --worker-class gthread --threads 8"
+    python loadtest.py --database-url postgresql://localhost/syllabix_load --concurrency 16 --duration 60
+    python loadtest.py --mix parse=1,cache=4,results=10 --json report.json
+
+Synthetic ledgers follow the Mumbai University layout parse_results expects, so
+parse requests exercise the real parser. Each parse request uploads a new PDF
+(cache miss) unless --parse-reuse is set, in which case a fixed pool is reused
+(cache hits after the first round).
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shlex
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.request
+import urllib.error
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PASSWORD = 'loadtest'
+
+# --- SYNTHETIC PDF GENERATION ---
+SUBJECTS = [
+    # code, title, credits, (I1 min/max), (E1 min/max), (T1 min/max), (O1 min/max)
+    ('10411', 'Applied Mathematics-I', 3, (8, 20), (32, 80), None, None),
+    ('10412', 'Applied Physics', 2, (8, 20), (24, 60), None, None),
+    ('10413', 'Engineering Mechanics', 3, (8, 20), (32, 80), None, None),
+    ('10414', 'Applied Physics Lab', 1, None, None, (10, 25), (10, 25)),
+    ('10415', 'Programming Lab', 1, None, None, (10, 25), None),
+]
+FIRST_NAMES = ['AARAV', 'DIYA', 'KABIR', 'ISHA', 'ROHAN', 'SNEHA', 'ARJUN', 'MEERA', 'VIHAAN', 'ANANYA']
+LAST_NAMES = ['SHARMA', 'PATIL', 'DESAI', 'KULKARNI', 'JOSHI', 'NAIR', 'IYER', 'MEHTA']
+COLLEGES = ["1331: MAEER's MIT College of Engineering", "1012: Sardar Patel Institute of Technology",
+            "1107: Vidyalankar Institute of Technology"]
+GRADES = [(90, 10, 'O'), (80, 9, 'A+'), (70, 8, 'A'), (60, 7, 'B+'), (55, 6, 'B'), (50, 5, 'C'), (40, 4, 'D'), (0, 0, 'F')]
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def _text_ops(x, y, text, size=7):
+    return f"BT /F1 {size} Tf {x} {y} Td ({_escape(text)}) Tj ET"
+
+def _build_pdf(page_streams):
+    """Assemble a minimal PDF (Helvetica, one content stream per page)"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for stream in page_streams:
+        data = stream.encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 842 1191] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode())
+        page_ids.append(len(objects))
+    kids = ' '.join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+def _metadata_page():
+    """Page 1: exam header and the 13-column course table (ruled, so extract_tables finds it)"""
+    ops = [_text_ops(40, 1150, "University Of Mumbai"),
+           _text_ops(40, 1135, "OFFICE REGISTER FOR THE Bachelor of Engineering ( Semester - I ) "
+                               "( NEP 2020 ) EXAMINATION HELD IN DECEMBER 2024")]
+    col_widths = [40, 150] + [45] * 11
+    xs = [30]
+    for w in col_widths:
+        xs.append(xs[-1] + w)
+    header = [['Code', 'Title', 'Cr', 'I1', '', 'E1', '', 'T1', '', 'O1', '', 'Total', ''],
+              ['', '', '', 'Min', 'Max', 'Min', 'Max', 'Min', 'Max', 'Min', 'Max', 'Min', 'Max']]
+    rows = header[:]
+    for code, title, credits, i1, e1, t1, o1 in SUBJECTS:
+        cells = [code, title, str(credits)]
+        total_min = total_max = 0
+        for comp in (i1, e1, t1, o1):
+            if comp:
+                cells += [str(comp[0]), str(comp[1])]
+                total_min += comp[0]
+                total_max += comp[1]
+            else:
+                cells += ['...', '...']
+        rows.append(cells + [str(total_min), str(total_max)])
+
+    top, row_h = 1100, 18
+    bottom = top - row_h * len(rows)
+    lines = []
+    for r in range(len(rows) + 1):
+        y = top - r * row_h
+        lines.append(f"{xs[0]} {y} m {xs[-1]} {y} l S")
+    for x in xs:
+        lines.append(f"{x} {top} m {x} {bottom} l S")
+    for r, cells in enumerate(rows):
+        y = top - (r + 1) * row_h + 5
+        for c, cell in enumerate(cells):
+            if cell:
+                ops.append(_text_ops(xs[c] + 3, y, cell))
+    return '\n'.join(["0.5 w"] + lines + ops)
+
+def _grade(pct):
+    for cutoff, points, grade in GRADES:
+        if pct >= cutoff:
+            return points, grade
+    return 0, 'F'
+
+def _student_lines(rng, seat_no):
+    name = f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(FIRST_NAMES)}"
+    gender = rng.choice(['MALE', 'FEMALE'])
+    status = 'Regular' if rng.random() < 0.9 else 'Repeater'
+    ern = f"MU{rng.randint(10 ** 15, 10 ** 16 - 1)}"
+    comps = {'I1': [], 'E1': [], 'T1': [], 'O1': []}
+    tot = []
+    total_marks = 0
+    credit_sum = cxg_sum = 0
+    failed = False
+    for code, title, credits, i1, e1, t1, o1 in SUBJECTS:
+        subject_total = subject_max = 0
+        subject_failed = False
+        for key, comp in (('I1', i1), ('E1', e1), ('T1', t1), ('O1', o1)):
+            if not comp:
+                continue
+            mark = rng.randint(int(comp[1] * 0.4), comp[1])
+            if mark < comp[0]:
+                subject_failed = True
+                comps[key].append(f"{mark} 0 F 0.0")
+            else:
+                comps[key].append(f"{mark} P")
+            subject_total += mark
+            subject_max += comp[1]
+        points, grade = _grade(subject_total / subject_max * 100)
+        if subject_failed:
+            points, grade = 0, 'F'
+            failed = True
+        tot.append(f"{subject_total} {points} {grade} {credits} {points * credits:.1f}")
+        total_marks += subject_total
+        credit_sum += credits
+        cxg_sum += points * credits
+    cgpa = cxg_sum / credit_sum if not failed else 0.0
+    result = 'FAILED' if failed else 'PASS'
+
+    lines = [f"{seat_no} {name} {status} {gender} ({ern}) {rng.choice(COLLEGES)}"]
+    for key in ('T1', 'O1', 'E1'):
+        lines.append(f"{key} " + ' '.join(comps[key]))
+    lines.append("I1 " + ' '.join(comps['I1']) + f" ({total_marks}) {result}")
+    lines.append("TOT " + ' '.join(tot) + f" {credit_sum} {cxg_sum:.1f} {cgpa:.5f}")
+    return lines
+
+def make_synthetic_pdf(n_students=200, seed=None, students_per_page=20, split_headers=False):
+    """Build a ledger PDF with n_students students; different seeds give different hashes.
+    split_headers draws each record's college as its own text object (same line), as some
+    ledgers do."""
+    rng = random.Random(seed)
+    pages = [_metadata_page()]
+    first_seat = rng.randint(1000000, 8000000)
+    for start in range(0, n_students, students_per_page):
+        ops, y = [], 1150
+        for seat in range(first_seat + start, first_seat + min(start + students_per_page, n_students)):
+            for i, line in enumerate(_student_lines(rng, seat)):
+                if i == 0 and split_headers:
+                    head, _, college = line.partition(') ')
+                    ops.append(_text_ops(20, y, head + ')', size=6))
+                    ops.append(_text_ops(300, y, college, size=6))
+                else:
+                    ops.append(_text_ops(20, y, line, size=6))
+                y -= 9
+            y -= 4
+        pages.append('\n'.join(ops))
+    return _build_pdf(pages)
+
+# --- HTTP CLIENT ---
+def _multipart(filename, content):
+    boundary = uuid.uuid4().hex
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: application/pdf\r\n\r\n").encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+def _request(url, data=None, headers=None, timeout=300):
+    req = urllib.request.Request(url, data=data, headers=headers or {})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            body = resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        body, status = e.read(), e.code
+    except Exception:
+        body, status = b'', 0
+    return status, body, time.perf_counter() - start
+
+def _parse_request(base_url, content, filename):
+    body, content_type = _multipart(filename, content)
+    return _request(f"{base_url}/api/parse", data=body,
+                    headers={'Content-Type': content_type, 'X-Upload-Password': PASSWORD})
+
+# --- SERVER LIFECYCLE ---
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_server(config, gunicorn_args, port, env, log_path):
+    cmd = [sys.executable, '-m', 'gunicorn', 'server:app', '-c', config, '--bind', f"127.0.0.1:{port}"]
+    cmd += shlex.split(gunicorn_args or '')
+    log = open(log_path, 'w')
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {proc.returncode}, see {log_path}")
+        status, _, _ = _request(f"http://127.0.0.1:{port}/api/cache", timeout=2)
+        if status == 200:
+            return proc
+        time.sleep(0.25)
+    proc.terminate()
+    raise RuntimeError(f"Server did not come up within 60s, see {log_path}")
+
+# --- WORKLOAD ---
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, weight = part.split('=')
+        if name not in ('parse', 'cache', 'results'):
+            raise ValueError(f"Unknown operation in mix: {name}")
+        mix[name] = float(weight)
+    return mix
+
+def run_workload(base_url, mix, duration, concurrency, pdf_students, parse_reuse, seed_hashes):
+    samples = {op: [] for op in mix}
+    errors = {op: 0 for op in mix}
+    lock = threading.Lock()
+    stop_at = time.time() + duration
+    ops, weights = zip(*mix.items())
+    hashes = list(seed_hashes)
+    reuse_pool = [make_synthetic_pdf(pdf_students, seed=f"reuse-{i}") for i in range(4)] if parse_reuse else []
+
+    def worker(worker_id):
+        rng = random.Random(worker_id)
+        n = 0
+        while time.time() < stop_at:
+            op = rng.choices(ops, weights)[0]
+            if op == 'parse':
+                content = rng.choice(reuse_pool) if parse_reuse else \
+                    make_synthetic_pdf(pdf_students, seed=f"w{worker_id}-{n}-{time.time()}")
+                status, body, elapsed = _parse_request(base_url, content, f"load_{worker_id}_{n}.pdf")
+                if status == 200:
+                    try:
+                        h = json.loads(body).get('meta', {}).get('hash')
+                        if h:
+                            with lock:
+                                hashes.append(h)
+                    except ValueError:
+                        pass
+            elif op == 'cache':
+                status, _, elapsed = _request(f"{base_url}/api/cache")
+            else:
+                with lock:
+                    h = rng.choice(hashes) if hashes else 'missing'
+                status, _, elapsed = _request(f"{base_url}/api/results/{h}")
+            n += 1
+            with lock:
+                samples[op].append(elapsed)
+                if status != 200:
+                    errors[op] += 1
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    wall = time.perf_counter() - start
+
+    report = {'wall_seconds': round(wall, 2), 'operations': {}}
+    all_samples = []
+    for op in ops:
+        values = sorted(samples[op])
+        all_samples += values
+        report['operations'][op] = _summarize(values, errors[op], wall)
+    report['total'] = _summarize(sorted(all_samples), sum(errors.values()), wall)
+    return report
+
+def _summarize(values, error_count, wall):
+    return {
+        'requests': len(values),
+        'errors': error_count,
+        'error_rate': round(error_count / len(values), 4) if values else 0.0,
+        'throughput_rps': round(len(values) / wall, 2) if wall else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 1),
+        'p95_ms': round(percentile(values, 95) * 1000, 1),
+        'p99_ms': round(percentile(values, 99) * 1000, 1),
+    }
+
+def print_report(report, settings):
+    print(f"\n{'='*78}")
+    print(f"LOAD TEST: {settings['config']} {settings['gunicorn_args'] or ''}".rstrip())
+    print(f"storage={settings['storage']} concurrency={settings['concurrency']} "
+          f"duration={settings['duration']}s mix={settings['mix']}")
+    print(f"{'='*78}")
+    print(f"{'operation':<10}{'reqs':>8}{'err%':>8}{'req/s':>9}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}")
+    rows = list(report['operations'].items()) + [('total', report['total'])]
+    for op, r in rows:
+        print(f"{op:<10}{r['requests']:>8}{r['error_rate'] * 100:>7.1f}%{r['throughput_rps']:>9.2f}"
+              f"{r['p50_ms']:>11.1f}{r['p95_ms']:>11.1f}{r['p99_ms']:>11.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the result analysis API")
+    parser.add_argument('--config', default='gunicorn_config.py', help="gunicorn config file")
+    parser.add_argument('--gunicorn-args', default='', help="Extra gunicorn CLI args (override the config)")
+    parser.add_argument('--database-url', help="Local PostgreSQL URL (default: file storage in a temp dir)")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30, help="Seconds of load")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('parse=1,cache=3,results=6'))
+    parser.add_argument('--pdf-students', type=int, default=200, help="Students per synthetic PDF")
+    parser.add_argument('--parse-reuse', action='store_true', help="Reuse a small PDF pool (cache hits)")
+    parser.add_argument('--seed-results', type=int, default=3, help="Results parsed before the run starts")
+    parser.add_argument('--json', metavar='PATH', help="Also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='syllabix_load_')
+    port = _free_port()
+    env = dict(os.environ, PORT=str(port), UPLOAD_PASSWORD=PASSWORD,
+               CACHE_DIR=os.path.join(workdir, 'cache'),
+               PARSE_POOL_ADDRESS=os.path.join(workdir, 'parse_pool.sock'),
+               PROMETHEUS_MULTIPROC_DIR=os.path.join(workdir, 'metrics'))
+    os.makedirs(env['PROMETHEUS_MULTIPROC_DIR'])
+    env.pop('RETENTION_INTERVAL', None)
+    if args.database_url:
+        env['DATABASE_URL'] = args.database_url
+        env.setdefault('DATABASE_SSLMODE', 'disable')
+    else:
+        env.pop('DATABASE_URL', None)
+
+    settings = {
+        'config': args.config, 'gunicorn_args': args.gunicorn_args,
+        'storage': 'db' if args.database_url else 'file',
+        'concurrency': args.concurrency, 'duration': args.duration,
+        'mix': ','.join(f"{k}={v:g}" for k, v in args.mix.items()),
+    }
+
+    log_path = os.path.join(workdir, 'gunicorn.log')
+    print(f"🚀 Starting gunicorn on port {port} (log: {log_path})")
+    proc = start_server(args.config, args.gunicorn_args, port, env, log_path)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        print(f"🌱 Seeding {args.seed_results} results...")
+        seed_hashes = []
+        for i in range(args.seed_results):
+            status, body, _ = _parse_request(base_url, make_synthetic_pdf(args.pdf_students, seed=f"seed-{i}"),
+                                             f"seed_{i}.pdf")
+            if status != 200:
+                print(f"⚠️  Seed parse failed ({status}): {body[:200]!r}")
+                continue
+            seed_hashes.append(json.loads(body)['meta']['hash'])
+
+        print(f"🔥 Running for {args.duration}s with {args.concurrency} clients...")
+        report = run_workload(base_url, args.mix, args.duration, args.concurrency,
+                              args.pdf_students, args.parse_reuse, seed_hashes)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    print_report(report, settings)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'settings': settings, 'report': report}, f, indent=2)
+        print(f"\nReport saved to: {args.json}")
+
+    if not args.database_url:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Prometheus metrics for the result analysis server
+Exposed at /metrics. With several gunicorn workers, set PROMETHEUS_MULTIPROC_DIR
+(gunicorn_config.py does this) so every worker writes to a shared directory and
+the endpoint aggregates them.
+
+If prometheus_client is not installed, every metric is a no-op and /metrics
+returns 501, so the server still runs.
+"""
+
+import os
+import time
+import functools
+from contextlib import contextmanager
+
+try:
+    from prometheus_client import (
+        Counter, Gauge, Histogram, CollectorRegistry, generate_latest,
+        CONTENT_TYPE_LATEST, REGISTRY,
+    )
+    from prometheus_client import multiprocess
+    METRICS_ENABLED = True
+except ImportError:
+    METRICS_ENABLED = False
+
+class _NoopMetric:
+    """Stand-in used when prometheus_client is unavailable"""
+    def labels(self, *args, **kwargs): return self
+    def observe(self, *args, **kwargs): pass
+    def inc(self, *args, **kwargs): pass
+    def dec(self, *args, **kwargs): pass
+    def set(self, *args, **kwargs): pass
+
+# Latency buckets (seconds): fast cached reads up to multi-minute parses
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+PAGE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+if METRICS_ENABLED:
+    REQUEST_LATENCY = Histogram(
+        'syllabix_http_request_duration_seconds', 'HTTP request latency by route',
+        ['method', 'route', 'status'], buckets=REQUEST_BUCKETS)
+    PARSE_DURATION = Histogram(
+        'syllabix_parse_pdf_duration_seconds', 'Time spent in parse_pdf',
+        buckets=REQUEST_BUCKETS)
+    PARSE_PAGES = Histogram(
+        'syllabix_parse_pdf_pages', 'Pages per parsed PDF', buckets=PAGE_BUCKETS)
+    PARSE_CACHE = Counter(
+        'syllabix_parse_cache_lookups_total', 'Result cache lookups for /api/parse (hit/miss)',
+        ['result'])
+    PARSE_IN_FLIGHT = Gauge(
+        'syllabix_parse_in_flight', 'Parse jobs currently running', multiprocess_mode='livesum')
+    STORAGE_LATENCY = Histogram(
+        'syllabix_storage_operation_duration_seconds', 'StorageManager operation latency',
+        ['operation', 'mode'], buckets=REQUEST_BUCKETS)
+    DB_CONNECTION_ERRORS = Counter(
+        'syllabix_db_connection_errors_total', 'Failed PostgreSQL connection attempts')
+else:
+    REQUEST_LATENCY = PARSE_DURATION = PARSE_PAGES = PARSE_CACHE = _NoopMetric()
+    PARSE_IN_FLIGHT = STORAGE_LATENCY = DB_CONNECTION_ERRORS = _NoopMetric()
+
+@contextmanager
+def track_parse():
+    """Time a parse_pdf call and count it as in flight while it runs"""
+    PARSE_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PARSE_DURATION.observe(time.perf_counter() - start)
+        PARSE_IN_FLIGHT.dec()
+
+def timed_storage(operation):
+    """Decorator for StorageManager methods: latency labelled by operation and mode"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                STORAGE_LATENCY.labels(operation, self.mode).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def init_app(app):
+    """Record per-route request latency and register the /metrics endpoint"""
+    from flask import request, g, Response
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_latency(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            # Label by URL rule (e.g. /api/results/<file_hash>) to keep cardinality bounded
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            REQUEST_LATENCY.labels(request.method, route, str(response.status_code)).observe(
+                time.perf_counter() - start)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        if not METRICS_ENABLED:
+            return Response("prometheus_client is not installed\n", status=501, mimetype='text/plain')
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+def mark_worker_dead(pid):
+    """gunicorn child_exit hook: drop live gauges of a dead worker"""
+    if METRICS_ENABLED and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
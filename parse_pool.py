@@ -0,0 +1,292 @@
+"""
+Parse Worker Pool
+Runs parse_pdf in a persistent pool of pre-warmed processes that lives outside the
+gunicorn request workers, so request threads stay free for reads while PDFs parse.
+
+gunicorn_config.py starts the pool from the master process. Request workers talk to
+it over a local socket (PARSE_POOL_ADDRESS / PARSE_POOL_AUTHKEY). The socket lives in
+a private temporary directory per server instance, so several instances on one host
+never share (or remove) each other's pool. Tasks are handed to idle processes one at
+a time, so a process that dies fails exactly the task it held. Pool processes are
+recycled when their resident memory passes PARSE_WORKER_MAX_RSS_MB, not after a fixed
+number of requests. Without a pool (e.g. `python server.py`), parse() runs in-process.
+
+Settings (environment):
+    PARSE_POOL_SIZE           number of parse processes (default: CPU count, max 4;
+                              0 keeps parsing inside the gunicorn workers)
+    PARSE_WORKER_MAX_RSS_MB   recycle a parse process above this RSS (default: 768)
+    PARSE_TIMEOUT             seconds a request waits for its parse (default: 300)
+
+Run standalone with: python parse_pool.py
+"""
+
+import os
+import sys
+import time
+import signal
+import secrets
+import subprocess
+import tempfile
+import itertools
+import threading
+import traceback
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import Listener, Client
+
+def new_address():
+    """A socket path in a fresh private directory (one per server instance)"""
+    return os.path.join(tempfile.mkdtemp(prefix='syllabix_pool_'), 'parse_pool.sock')
+
+def pool_size():
+    return int(os.environ.get('PARSE_POOL_SIZE', 0)) or max(1, min(4, os.cpu_count() or 1))
+
+def max_rss_mb():
+    return int(os.environ.get('PARSE_WORKER_MAX_RSS_MB', 768))
+
+def parse_timeout():
+    return float(os.environ.get('PARSE_TIMEOUT', 300))
+
+def _current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except Exception:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # peak, KB on Linux
+
+def _worker_main(tasks, events, max_rss):
+    """Parse process: take tasks until memory grows past max_rss, then exit to be replaced"""
+    from parse_results import parse_pdf  # already imported by the pool when forked
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    pid = os.getpid()
+    while True:
+        events.put(('ready', None, pid))
+        item = tasks.get()
+        if item is None:
+            return
+        task_id, pdf_path = item
+        try:
+            events.put(('done', task_id, (True, parse_pdf(pdf_path))))
+        except Exception as e:
+            traceback.print_exc()
+            events.put(('done', task_id, (False, f"{type(e).__name__}: {e}")))
+
+        rss = _current_rss_mb()
+        if rss > max_rss:
+            events.put(('recycle', None, (pid, round(rss))))
+            return
+
+class ParsePool:
+    """Fixed-size set of parse processes; each idle process is handed one task at a time"""
+
+    def __init__(self, size=None, max_rss=None):
+        # Fork after parse_results is imported so every process starts warm
+        methods = multiprocessing.get_all_start_methods()
+        self.ctx = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+        self.size = size or pool_size()
+        self.max_rss = max_rss or max_rss_mb()
+        self.events = self.ctx.Queue()
+        self.workers = {}      # pid -> (Process, its task queue)
+        self.backlog = deque() # (task_id, pdf_path) waiting for an idle process
+        self.idle = []         # pids waiting for a task
+        self.pending = {}      # task_id -> [threading.Event, (ok, payload)]
+        self.running = {}      # task_id -> pid it was handed to
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.recycled = 0
+
+    def start(self):
+        import parse_results  # pre-warm: pdfplumber/pdfminer load once, before forking
+        for _ in range(self.size):
+            self._spawn()
+        threading.Thread(target=self._collect, name='parse-pool-collect', daemon=True).start()
+        threading.Thread(target=self._supervise, name='parse-pool-supervise', daemon=True).start()
+        print(f"⚙️  Parse pool ready: {self.size} processes, recycle above {self.max_rss} MB")
+
+    def _spawn(self):
+        tasks = self.ctx.Queue()
+        p = self.ctx.Process(target=_worker_main, args=(tasks, self.events, self.max_rss), daemon=True)
+        p.start()
+        with self.lock:
+            self.workers[p.pid] = (p, tasks)
+
+    def _dispatch(self):
+        """Hand backlog tasks to idle processes, recording which process holds each. Call with the lock held."""
+        while self.backlog and self.idle:
+            pid = self.idle.pop()
+            if pid not in self.workers:
+                continue
+            task_id, pdf_path = self.backlog.popleft()
+            self.running[task_id] = pid
+            self.workers[pid][1].put((task_id, pdf_path))
+
+    def _finish(self, task_id, outcome):
+        with self.lock:
+            self.running.pop(task_id, None)
+            entry = self.pending.get(task_id)
+        if entry:
+            entry[1] = outcome
+            entry[0].set()
+
+    def _collect(self):
+        while True:
+            kind, task_id, payload = self.events.get()
+            if kind == 'ready':
+                with self.lock:
+                    if payload in self.workers:
+                        self.idle.append(payload)
+                        self._dispatch()
+            elif kind == 'done':
+                self._finish(task_id, payload)
+            elif kind == 'recycle':
+                pid, rss = payload
+                self.recycled += 1
+                print(f"♻️  Recycling parse process {pid} ({rss} MB > {self.max_rss} MB)")
+
+    def _supervise(self):
+        """Replace processes that exited (recycled or crashed)"""
+        while True:
+            time.sleep(0.5)
+            with self.lock:
+                dead = [(pid, p) for pid, (p, _) in self.workers.items() if not p.is_alive()]
+                for pid, _ in dead:
+                    del self.workers[pid]
+                    if pid in self.idle:
+                        self.idle.remove(pid)
+            for pid, p in dead:
+                p.join()
+                # Fail every task handed to it (e.g. OOM-killed mid-parse, or before it began)
+                with self.lock:
+                    lost = [t for t, owner in self.running.items() if owner == pid]
+                for task_id in lost:
+                    self._finish(task_id, (False, f"Parse process {pid} died (exit code {p.exitcode})"))
+                if p.exitcode != 0:
+                    print(f"⚠️  Parse process {pid} exited with {p.exitcode}, replacing")
+                self._spawn()
+
+    def submit(self, pdf_path, timeout=None):
+        """Parse in the pool and wait. Returns (ok, result_or_error)."""
+        task_id = next(self.ids)
+        done = threading.Event()
+        with self.lock:
+            self.pending[task_id] = [done, None]
+            self.backlog.append((task_id, pdf_path))
+            self._dispatch()
+        finished = done.wait(timeout or parse_timeout())
+        with self.lock:
+            outcome = self.pending.pop(task_id)[1]
+            if not finished:
+                # Cancel: drop it from the backlog, or stop the process still parsing it
+                self.backlog = deque(item for item in self.backlog if item[0] != task_id)
+                owner = self.running.pop(task_id, None)
+                if owner in self.workers:
+                    self.workers[owner][0].terminate()
+        if not finished:
+            return False, "Parse timed out"
+        return outcome
+
+    def shutdown(self):
+        for _, tasks in list(self.workers.values()):
+            tasks.put(None)
+        for p, _ in list(self.workers.values()):
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+
+# --- POOL SERVER (one per server instance, outside the request workers) ---
+def _handle(pool, conn):
+    try:
+        while True:
+            try:
+                pdf_path = conn.recv()
+            except EOFError:
+                break
+            conn.send(pool.submit(pdf_path))
+    except Exception as e:
+        print(f"❌ Parse pool connection error: {e}")
+    finally:
+        conn.close()
+
+def serve(address=None, authkey=None):
+    address = address or os.environ.get('PARSE_POOL_ADDRESS') or new_address()
+    authkey = authkey or os.environ.get('PARSE_POOL_AUTHKEY', '').encode() or None
+
+    # SIGTERM -> normal exit, so daemon parse processes are cleaned up too
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    pool = ParsePool()
+    pool.start()
+    if os.path.exists(address):
+        os.remove(address)
+    listener = Listener(address, family='AF_UNIX', authkey=authkey)
+    print(f"⚙️  Parse pool listening on {address}")
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                print(f"⚠️  Rejected parse pool client: {e}")
+                continue
+            threading.Thread(target=_handle, args=(pool, conn), daemon=True).start()
+    finally:
+        listener.close()
+        pool.shutdown()
+
+def start_pool_process():
+    """Launch the pool server as a separate process (from the gunicorn master).
+    Exports the address and a fresh auth key so forked request workers inherit them."""
+    if not os.environ.get('PARSE_POOL_ADDRESS'):
+        os.environ['PARSE_POOL_ADDRESS'] = new_address()
+    os.environ.setdefault('PARSE_POOL_AUTHKEY', secrets.token_hex(16))
+    # A plain subprocess rather than multiprocessing, so forked workers inherit no child handles
+    return subprocess.Popen([sys.executable, '-u', os.path.abspath(__file__)], env=os.environ.copy(),
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+
+# --- CLIENT (request workers) ---
+def preload_in_background(delay=None):
+    """Without a pool, import the parser stack in a daemon thread shortly after startup.
+    Cached reads are served immediately and the first upload skips the pdfplumber import.
+    Disable with PRELOAD_PARSER=0; PRELOAD_PARSER_DELAY sets the delay in seconds."""
+    if os.environ.get('PARSE_POOL_ADDRESS') or os.environ.get('PRELOAD_PARSER', '1') == '0':
+        return None
+    if delay is None:
+        delay = float(os.environ.get('PRELOAD_PARSER_DELAY', 2))
+
+    def _preload():
+        start = time.perf_counter()
+        import parse_results
+        print(f"📚 Parser preloaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    timer = threading.Timer(delay, _preload)
+    timer.daemon = True
+    timer.start()
+    return timer
+
+def parse(pdf_path):
+    """Parse a PDF in the pool when one is configured, otherwise in this process"""
+    address = os.environ.get('PARSE_POOL_ADDRESS')
+    if address:
+        try:
+            conn = Client(address, family='AF_UNIX', authkey=os.environ.get('PARSE_POOL_AUTHKEY', '').encode() or None)
+        except (OSError, multiprocessing.AuthenticationError) as e:
+            # Missing socket, or another instance's pool behind it: never fail the upload
+            print(f"⚠️  Parse pool unavailable ({e}), parsing in-process")
+        else:
+            try:
+                conn.send(os.path.abspath(pdf_path))
+                if not conn.poll(parse_timeout()):
+                    raise TimeoutError("Parse timed out")
+                ok, payload = conn.recv()
+            finally:
+                conn.close()
+            if not ok:
+                raise RuntimeError(payload)
+            return payload
+
+    from parse_results import parse_pdf  # lazy: keeps pdfplumber off the cold-start path
+    return parse_pdf(pdf_path)
+
+if __name__ == "__main__":
+    serve()
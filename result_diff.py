@@ -0,0 +1,206 @@
+"""
+Result Diff
+Compares two results of the same exam, e.g. a ledger and its re-issue after revaluation.
+Students are joined by seat number (falling back to ERN when a seat number changed) with
+hash maps, so a diff is O(n). Reports every student whose marks, grades, CGPA or result
+changed, plus per-college and per-subject deltas.
+
+Usage:
+    python result_diff.py <old_hash> <new_hash>
+    python result_diff.py old.json new.json
+"""
+
+import sys
+import json
+import threading
+from collections import OrderedDict
+
+STUDENT_FIELDS = ('result', 'cgpa', 'total_marks')
+SUBJECT_FIELDS = ('internal', 'external', 'term_work', 'oral', 'internal_grace', 'external_grace',
+                  'term_work_grace', 'oral_grace', 'total', 'grade', 'grade_points', 'passed')
+EXAM_FIELDS = ('program', 'semester', 'scheme', 'examination')
+
+def match_students(old_students, new_students):
+    """{id(old student): new student}. Seat numbers are joined first for everyone; only
+    the students left on both sides are then joined by ERN, so no student matches twice."""
+    by_seat = {s['seat_no']: s for s in new_students}
+    matches, claimed, unmatched = {}, set(), []
+    for before in old_students:
+        after = by_seat.get(before['seat_no'])
+        if after is None or id(after) in claimed:
+            unmatched.append(before)
+            continue
+        matches[id(before)] = after
+        claimed.add(id(after))
+
+    by_ern = {s['ern']: s for s in new_students if s.get('ern') and id(s) not in claimed}
+    for before in unmatched:
+        after = by_ern.get(before.get('ern')) if before.get('ern') else None
+        if after is not None and id(after) not in claimed:
+            matches[id(before)] = after
+            claimed.add(id(after))
+    return matches
+
+def student_changes(old, new):
+    """{field: [old, new]} and {code: {field: [old, new]}} for one matched student"""
+    fields = {key: [old.get(key), new.get(key)] for key in STUDENT_FIELDS if old.get(key) != new.get(key)}
+    if old['seat_no'] != new['seat_no']:
+        fields['seat_no'] = [old['seat_no'], new['seat_no']]
+
+    old_subjects = {subj['code']: subj for subj in old.get('subjects', [])}
+    subjects = {}
+    for subj in new.get('subjects', []):
+        before = old_subjects.pop(subj['code'], None)
+        if before is None:
+            subjects[subj['code']] = {'added': True}
+            continue
+        changed = {key: [before.get(key), subj.get(key)] for key in SUBJECT_FIELDS if before.get(key) != subj.get(key)}
+        if changed:
+            subjects[subj['code']] = changed
+    for code in old_subjects:
+        subjects[code] = {'removed': True}
+    return fields, subjects
+
+def _college_row():
+    return {'students': 0, 'changed': 0, 'passed_before': 0, 'passed_after': 0,
+            'newly_passed': 0, 'newly_failed': 0, 'cgpa_delta': 0.0}
+
+def _subject_row(name):
+    return {'name': name, 'students': 0, 'changed': 0, 'grade_changes': 0, 'passed_before': 0,
+            'passed_after': 0, 'total_delta': 0}
+
+def diff_results(old, new):
+    """Diff two results: changed/added/removed students and per-college/per-subject deltas"""
+    old_students = old.get('students', [])
+    matches = match_students(old_students, new.get('students', []))
+    names = {**{code: info.get('name', code) for code, info in old.get('course_metadata', {}).items()},
+             **{code: info.get('name', code) for code, info in new.get('course_metadata', {}).items()}}
+
+    changed = []
+    removed = []
+    matched = set()
+    colleges = {}
+    subjects = {}
+
+    for before in old_students:
+        after = matches.get(id(before))
+        if after is None:
+            removed.append({'seat_no': before['seat_no'], 'name': before['name'], 'college': before['college']})
+            continue
+        matched.add(id(after))
+
+        fields, subject_changes = student_changes(before, after)
+        if fields or subject_changes:
+            changed.append({
+                'seat_no': after['seat_no'], 'ern': after.get('ern'), 'name': after['name'],
+                'college': after['college'], 'fields': fields, 'subjects': subject_changes,
+            })
+
+        row = colleges.setdefault(after['college'], _college_row())
+        row['students'] += 1
+        row['changed'] += bool(fields or subject_changes)
+        was, now = before['result'] == 'PASS', after['result'] == 'PASS'
+        row['passed_before'] += was
+        row['passed_after'] += now
+        row['newly_passed'] += now and not was
+        row['newly_failed'] += was and not now
+        row['cgpa_delta'] += (after.get('cgpa') or 0) - (before.get('cgpa') or 0)
+
+        old_subjects = {subj['code']: subj for subj in before.get('subjects', [])}
+        for subj in after.get('subjects', []):
+            prev = old_subjects.get(subj['code'])
+            if prev is None:
+                continue
+            srow = subjects.setdefault(subj['code'], _subject_row(names.get(subj['code'], subj['code'])))
+            srow['students'] += 1
+            srow['changed'] += subj['code'] in subject_changes
+            srow['grade_changes'] += prev.get('grade') != subj.get('grade')
+            srow['passed_before'] += bool(prev.get('passed'))
+            srow['passed_after'] += bool(subj.get('passed'))
+            srow['total_delta'] += (subj.get('total') or 0) - (prev.get('total') or 0)
+
+    added = [{'seat_no': s['seat_no'], 'name': s['name'], 'college': s['college']}
+             for s in new.get('students', []) if id(s) not in matched]
+
+    for row in colleges.values():
+        row['pass_delta'] = row['passed_after'] - row['passed_before']
+        row['cgpa_delta'] = round(row['cgpa_delta'], 2)
+    for row in subjects.values():
+        row['pass_delta'] = row['passed_after'] - row['passed_before']
+
+    old_exam, new_exam = old.get('exam_info', {}), new.get('exam_info', {})
+    return {
+        'same_exam': all(old_exam.get(key) == new_exam.get(key) for key in EXAM_FIELDS),
+        'summary': {
+            'matched': len(matched),
+            'changed': len(changed),
+            'added': len(added),
+            'removed': len(removed),
+            'newly_passed': sum(row['newly_passed'] for row in colleges.values()),
+            'newly_failed': sum(row['newly_failed'] for row in colleges.values()),
+        },
+        'students': changed,
+        'added': added,
+        'removed': removed,
+        'colleges': {name: row for name, row in colleges.items() if row['changed']},
+        'subjects': {code: row for code, row in subjects.items() if row['changed']},
+    }
+
+# Results are stored under the hash of their PDF, so a diff for a hash pair never goes stale.
+# Also bounded by the students listed across cached diffs; the most recent diff is always kept.
+DIFF_CACHE_SIZE = 32
+DIFF_CACHE_STUDENTS = 25000
+_diff_cache = OrderedDict()
+_diff_lock = threading.Lock()
+
+def _listed(diff):
+    return len(diff['students']) + len(diff['added']) + len(diff['removed'])
+
+def diff_stored(storage, old_hash, new_hash):
+    """diff_results for two stored results, cached by the hash pair. None if either is missing."""
+    key = (old_hash, new_hash)
+    with _diff_lock:
+        if key in _diff_cache:
+            _diff_cache.move_to_end(key)
+            return _diff_cache[key]
+
+    old, new = storage.get(old_hash), storage.get(new_hash)
+    if not old or not new:
+        return None
+    diff = {'old': old_hash, 'new': new_hash, **diff_results(old, new)}
+
+    with _diff_lock:
+        _diff_cache[key] = diff
+        while len(_diff_cache) > 1 and (len(_diff_cache) > DIFF_CACHE_SIZE or
+                                        sum(_listed(d) for d in _diff_cache.values()) > DIFF_CACHE_STUDENTS):
+            _diff_cache.popitem(last=False)
+    return diff
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Diff two results of the same exam")
+    parser.add_argument('old', help="Stored result hash or result JSON file")
+    parser.add_argument('new', help="Stored result hash or result JSON file")
+    args = parser.parse_args(argv)
+
+    if args.old.endswith('.json') and args.new.endswith('.json'):
+        with open(args.old, encoding='utf-8') as f_old, open(args.new, encoding='utf-8') as f_new:
+            diff = diff_results(json.load(f_old), json.load(f_new))
+    else:
+        from storage import StorageManager
+        diff = diff_stored(StorageManager(), args.old, args.new)
+        if diff is None:
+            print("⚠️  Result not found")
+            return
+
+    summary = diff['summary']
+    if not diff['same_exam']:
+        print("⚠️  The two results are from different exams")
+    print(f"🔍 {summary['matched']} matched, {summary['changed']} changed, "
+          f"{summary['added']} added, {summary['removed']} removed")
+    print(f"   {summary['newly_passed']} newly passed, {summary['newly_failed']} newly failed")
+    for code, row in diff['subjects'].items():
+        print(f"   {code} {row['name']}: {row['changed']} changed, pass {row['pass_delta']:+d}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,148 @@
+"""
+Cache Retention for stored results
+Keeps cache/ (file mode) or the results table (db mode) under a byte/row budget
+by evicting the least recently accessed, unpinned results.
+
+Usage:
+    python retention.py --max-bytes 500MB --max-rows 200
+    python retention.py --pin <hash>
+    python retention.py --loop 3600          # run forever, once an hour
+
+Budgets default to the CACHE_MAX_BYTES / CACHE_MAX_ROWS environment variables.
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import threading
+
+from storage import StorageManager
+
+SIZE_UNITS = {'': 1, 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+def parse_size(value):
+    """Parse '500MB', '2GB', '1048576' into bytes (None passes through)"""
+    if value is None or value == '':
+        return None
+    match = re.match(r'^\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*$', str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size: {value}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+def budget_from_env():
+    max_bytes = parse_size(os.environ.get('CACHE_MAX_BYTES'))
+    max_rows = os.environ.get('CACHE_MAX_ROWS')
+    return max_bytes, int(max_rows) if max_rows else None
+
+def select_evictions(entries, max_bytes=None, max_rows=None):
+    """Pick results to evict, oldest access first, until the budget is met.
+    entries must be sorted least recently accessed first (StorageManager.usage order)."""
+    total_bytes = sum(e['bytes'] for e in entries)
+    total_rows = len(entries)
+    victims = []
+
+    for entry in entries:
+        over_bytes = max_bytes is not None and total_bytes > max_bytes
+        over_rows = max_rows is not None and total_rows > max_rows
+        if not (over_bytes or over_rows):
+            break
+        if entry['pinned']:
+            continue
+        victims.append(entry)
+        total_bytes -= entry['bytes']
+        total_rows -= 1
+
+    return victims
+
+def _time_list(storage):
+    start = time.perf_counter()
+    storage.list()
+    return round((time.perf_counter() - start) * 1000, 2)
+
+def enforce_retention(storage, max_bytes=None, max_rows=None, dry_run=False):
+    """Evict results over budget and report what was reclaimed"""
+    # Snapshot access order before timing list(), which reads every result
+    entries = storage.usage()
+    list_ms_before = _time_list(storage)
+    victims = select_evictions(entries, max_bytes, max_rows)
+
+    evicted = 0
+    if victims and not dry_run:
+        evicted = storage.delete([v['hash'] for v in victims])
+
+    stats = {
+        'mode': storage.mode,
+        'dry_run': dry_run,
+        'rows_before': len(entries),
+        'bytes_before': sum(e['bytes'] for e in entries),
+        'pinned': sum(1 for e in entries if e['pinned']),
+        'evicted': len(victims) if dry_run else evicted,
+        'bytes_reclaimed': sum(v['bytes'] for v in victims),
+        'evicted_hashes': [v['hash'] for v in victims],
+        'list_ms_before': list_ms_before,
+        'list_ms_after': list_ms_before if dry_run else _time_list(storage),
+    }
+    stats['rows_after'] = stats['rows_before'] - stats['evicted']
+    stats['bytes_after'] = stats['bytes_before'] - stats['bytes_reclaimed']
+    return stats
+
+def print_stats(stats):
+    label = "Would evict" if stats['dry_run'] else "Evicted"
+    print(f"🧹 Retention ({stats['mode']} mode)")
+    print(f"   Results: {stats['rows_before']} → {stats['rows_after']} ({stats['pinned']} pinned)")
+    print(f"   Size:    {stats['bytes_before'] / 1024 / 1024:.2f} MB → {stats['bytes_after'] / 1024 / 1024:.2f} MB")
+    print(f"   {label} {stats['evicted']} results, reclaimed {stats['bytes_reclaimed'] / 1024 / 1024:.2f} MB")
+    print(f"   list() latency: {stats['list_ms_before']} ms → {stats['list_ms_after']} ms")
+    if stats['mode'] == 'db' and stats['evicted'] and not stats['dry_run']:
+        print("   ℹ️  Postgres returns space to the OS after VACUUM (autovacuum handles this).")
+
+def start_background_retention(storage, interval, max_bytes=None, max_rows=None):
+    """Run retention every `interval` seconds in a daemon thread"""
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                stats = enforce_retention(storage, max_bytes, max_rows)
+                if stats['evicted']:
+                    print_stats(stats)
+            except Exception as e:
+                print(f"❌ Retention failed: {e}")
+
+    thread = threading.Thread(target=loop, name='cache-retention', daemon=True)
+    thread.start()
+    return thread
+
+def main(argv=None):
+    env_bytes, env_rows = budget_from_env()
+
+    parser = argparse.ArgumentParser(description="Evict least recently used results over a size budget")
+    parser.add_argument('--max-bytes', type=parse_size, default=env_bytes, help="Byte budget, e.g. 500MB")
+    parser.add_argument('--max-rows', type=int, default=env_rows, help="Maximum number of stored results")
+    parser.add_argument('--dry-run', action='store_true', help="Report what would be evicted")
+    parser.add_argument('--pin', metavar='HASH', action='append', default=[], help="Never evict this result")
+    parser.add_argument('--unpin', metavar='HASH', action='append', default=[], help="Allow eviction again")
+    parser.add_argument('--loop', metavar='SECONDS', type=int, help="Keep running at this interval")
+    args = parser.parse_args(argv)
+
+    storage = StorageManager()
+
+    for file_hash in args.pin:
+        print(f"📌 Pinned {file_hash}" if storage.set_pinned(file_hash, True) else f"⚠️  No result {file_hash}")
+    for file_hash in args.unpin:
+        print(f"📍 Unpinned {file_hash}" if storage.set_pinned(file_hash, False) else f"⚠️  No result {file_hash}")
+
+    if args.max_bytes is None and args.max_rows is None:
+        if not (args.pin or args.unpin):
+            print("ℹ️  No budget given (--max-bytes/--max-rows or CACHE_MAX_BYTES/CACHE_MAX_ROWS). Nothing to do.")
+        return 0
+
+    while True:
+        print_stats(enforce_retention(storage, args.max_bytes, args.max_rows, args.dry_run))
+        if not args.loop:
+            return 0
+        time.sleep(args.loop)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,228 +3,46 @@ Flask Server for University Result Analysis
 Provides API endpoints for PDF parsing and result analysis
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import os
 import tempfile
 import json
-from parse_results import parse_pdf
+import parse_pool
+import batch_parse
+import generate_sheets
+import aggregates
+import result_diff
+import grace_simulation
+import student_query
+from storage import StorageManager
+from retention import budget_from_env, start_background_retention
+import metrics
 import traceback
 import hashlib
 import time
-from datetime import datetime
-
-# --- DATABASE / STORAGE MANAGER ---
-class StorageManager:
-    def __init__(self, app):
-        self.app = app
-        self.mode = 'file'
-        
-        # Check for DATABASE_URL env var (Render/Heroku/etc)
-        self.db_url = os.environ.get('DATABASE_URL')
-        if self.db_url:
-            self.mode = 'db'
-            print("✅ Configured for PostgreSQL Database")
-            self._init_db()
-        else:
-            print("ℹ️  No DATABASE_URL found. Using local file storage.")
-
-    def _get_conn(self):
-        try:
-            import psycopg2
-            return psycopg2.connect(self.db_url, sslmode='require')
-        except Exception as e:
-            print(f"❌ DB Connection Error: {e}")
-            return None
-
-    def _init_db(self):
-        """Create table if not exists"""
-        if self.mode != 'db': return
-        
-        conn = self._get_conn()
-        if not conn: return
-        
-        try:
-            cur = conn.cursor()
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS results (
-                    hash TEXT PRIMARY KEY,
-                    filename TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    meta JSONB,
-                    data JSONB
-                );
-            """)
-            conn.commit()
-            cur.close()
-            print("✅ DB Schema Initialized")
-        except Exception as e:
-            print(f"❌ Failed to init DB schema: {e}")
-        finally:
-            if conn: conn.close()
-
-    def save(self, file_hash, result_data):
-        if self.mode == 'db':
-            conn = self._get_conn()
-            if not conn: return False
-            
-            try:
-                import json
-                cur = conn.cursor()
-                meta = result_data.get('meta', {})
-                timestamp = datetime.fromtimestamp(meta.get('timestamp', time.time()))
-                
-                # Upsert (Insert or Do Nothing if exists)
-                cur.execute("""
-                    INSERT INTO results (hash, filename, created_at, meta, data)
-                    VALUES (%s, %s, %s, %s, %s)
-                    ON CONFLICT (hash) DO UPDATE 
-                    SET meta = EXCLUDED.meta, data = EXCLUDED.data;
-                """, (
-                    file_hash, 
-                    meta.get('filename', 'Unknown'), 
-                    timestamp,
-                    json.dumps(meta), 
-                    json.dumps(result_data)
-                ))
-                conn.commit()
-                cur.close()
-                return True
-            except Exception as e:
-                print(f"❌ DB Save Error: {e}")
-                return False
-            finally:
-                if conn: conn.close()
-        else:
-            # File Mode
-            try:
-                cache_dir = os.path.join(self.app.root_path, 'cache')
-                os.makedirs(cache_dir, exist_ok=True)
-                cache_path = os.path.join(cache_dir, f"{file_hash}.json")
-                with open(cache_path, 'w', encoding='utf-8') as f:
-                    json.dump(result_data, f, ensure_ascii=False)
-                return True
-            except Exception as e:
-                print(f"❌ File Save Error: {e}")
-                return False
-
-    def get(self, file_hash):
-        if self.mode == 'db':
-            conn = self._get_conn()
-            if not conn: return None
-            
-            try:
-                cur = conn.cursor()
-                cur.execute("SELECT data FROM results WHERE hash = %s", (file_hash,))
-                row = cur.fetchone()
-                cur.close()
-                if row:
-                    return row[0] # data column is already dict/json
-                return None
-            except Exception as e:
-                print(f"❌ DB Get Error: {e}")
-                return None
-            finally:
-                if conn: conn.close()
-        else:
-            # File Mode
-            cache_path = os.path.join(self.app.root_path, 'cache', f"{file_hash}.json")
-            if os.path.exists(cache_path):
-                try:
-                    with open(cache_path, 'r', encoding='utf-8') as f:
-                        return json.load(f)
-                except Exception as e:
-                    print(f"⚠️  Corrupted cache file {file_hash}: {e}")
-                    try:
-                        os.remove(cache_path)
-                        print(f"🗑️  Deleted corrupted cache file.")
-                    except: pass
-            return None
-
-    def list(self):
-        results = []
-        if self.mode == 'db':
-            conn = self._get_conn()
-            if not conn: return []
-            
-            try:
-                cur = conn.cursor()
-                cur.execute("""
-                    SELECT hash, meta, data->'statistics' as stats 
-                    FROM results 
-                    ORDER BY created_at DESC
-                """)
-                rows = cur.fetchall()
-                cur.close()
-                
-                for r in rows:
-                    h, meta, stats = r
-                    if not meta: meta = {}
-                    if not stats: stats = {}
-                    
-                    results.append({
-                        'hash': h,
-                        'filename': meta.get('filename', 'Unknown'),
-                        'timestamp': meta.get('timestamp', 0),
-                        'student_count': stats.get('total_students', 0),
-                        'college_count': len(stats.get('college_statistics', {})),
-                        'program': meta.get('program'),
-                        'semester': meta.get('semester'),
-                        'scheme': meta.get('scheme'),
-                        'examination': meta.get('examination')
-                    })
-                return results
-
-            except Exception as e:
-                print(f"❌ DB List Error: {e}")
-                return []
-            finally:
-                if conn: conn.close()
-        else:
-            # File Mode
-            cache_dir = os.path.join(self.app.root_path, 'cache')
-            if not os.path.exists(cache_dir):
-                return []
-            
-            for filename in os.listdir(cache_dir):
-                if not filename.endswith('.json'): continue
-                try:
-                    filepath = os.path.join(cache_dir, filename)
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        meta = data.get('meta', {})
-                        stats = data.get('statistics', {})
-                        exam = data.get('exam_info', {})
-                        
-                        if not meta:
-                            meta = {'filename': 'Unknown', 'timestamp': os.path.getmtime(filepath), 'hash': filename.replace('.json', '')}
-                        
-                        if 'program' not in meta:
-                            meta['program'] = exam.get('program', 'Unknown')
-                            meta['semester'] = exam.get('semester', '')
-
-                        results.append({
-                            'hash': meta.get('hash', filename.replace('.json', '')),
-                            'filename': meta.get('filename', 'Unknown'),
-                            'timestamp': meta.get('timestamp', 0),
-                            'student_count': stats.get('total_students', 0),
-                            'college_count': len(stats.get('college_statistics', {})),
-                            'program': meta.get('program'),
-                            'semester': meta.get('semester'),
-                            'scheme': meta.get('scheme'),
-                            'examination': meta.get('examination')
-                        })
-                except: pass
-            
-            results.sort(key=lambda x: x['timestamp'], reverse=True)
-            return results
+import re
 
 app = Flask(__name__, static_folder='frontend/dist/assets', static_url_path='/assets')
 CORS(app)
+metrics.init_app(app)
 
 storage = StorageManager(app)
 
+# The PDF stack (pdfplumber/pdfminer) is never imported at startup: read-only endpoints
+# serve straight away and parsing happens in the parse pool, or in-process after a
+# background preload when no pool is running.
+parse_pool.preload_in_background()
+
+# Optional background cache retention (RETENTION_INTERVAL seconds, CACHE_MAX_BYTES / CACHE_MAX_ROWS)
+retention_interval = int(os.environ.get('RETENTION_INTERVAL', 0))
+if retention_interval > 0:
+    max_bytes, max_rows = budget_from_env()
+    if max_bytes is not None or max_rows is not None:
+        start_background_retention(storage, retention_interval, max_bytes, max_rows)
+        print(f"🧹 Cache retention every {retention_interval}s (bytes={max_bytes}, rows={max_rows})")
+
 # Configure upload settings
 UPLOAD_FOLDER = tempfile.gettempdir()
 ALLOWED_EXTENSIONS = {'pdf'}
@@ -235,14 +53,76 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def check_upload_password():
+    required_password = os.environ.get('UPLOAD_PASSWORD', 'syllabix')
+    return request.headers.get('X-Upload-Password') == required_password
+
+def result_meta(result, filename, file_hash):
+    """The 'meta' block stored with every parsed result; 'timestamp' is set once, when the
+    result is first stored, and re-uploads of the same file never change it"""
+    exam_info = result.get('exam_info', {})
+    return {
+        'filename': filename,
+        'timestamp': time.time(),
+        'hash': file_hash,
+        'program': exam_info.get('program', 'Unknown Program'),
+        'semester': exam_info.get('semester', ''),
+        'scheme': exam_info.get('scheme', ''),
+        'examination': exam_info.get('examination', '')
+    }
+
+# Large results go out as a stream: the students list in slices, each encoded on its own,
+# instead of one response string built next to the result dict
+STREAM_STUDENTS_PER_CHUNK = 500
+
+def iter_result_json(result):
+    yield '{'
+    for i, (key, value) in enumerate(result.items()):
+        prefix = (',' if i else '') + json.dumps(key) + ':'
+        if key == 'students' and isinstance(value, list):
+            yield prefix + '['
+            for start in range(0, len(value), STREAM_STUDENTS_PER_CHUNK):
+                chunk = json.dumps(value[start:start + STREAM_STUDENTS_PER_CHUNK], ensure_ascii=False)[1:-1]
+                yield (',' if start else '') + chunk
+            yield ']'
+        else:
+            yield prefix + json.dumps(value, ensure_ascii=False)
+    yield '}'
+
+def stream_result(result):
+    return Response(iter_result_json(result), mimetype='application/json')
+
 @app.route('/')
 def index():
     return send_from_directory('frontend/dist', 'index.html')
 
+# Static result data: only files named by a digest of their own content (index.<version>.json)
+# never change under that name. Files named by a PDF hash (<hash>.json, <hash>/summary.json,
+# its chunks) are rewritten on re-export, so they, like index.json, its pointer and the
+# search index, are revalidated (ETag / Last-Modified, a 304 when unchanged)
+IMMUTABLE_DATA = re.compile(r'^data/index\.[0-9a-f]{12}\.json$')
+
+def send_data_file(path):
+    """Serve a data/ file, preferring its precompressed .br/.gz variant"""
+    response = None
+    for suffix, encoding in (('.br', 'br'), ('.gz', 'gzip')):
+        if request.accept_encodings[encoding] and os.path.exists(os.path.join('frontend/dist', path + suffix)):
+            response = send_from_directory('frontend/dist', path + suffix, mimetype='application/json')
+            response.headers['Content-Encoding'] = encoding
+            break
+    if response is None:
+        response = send_from_directory('frontend/dist', path)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = ('public, max-age=31536000, immutable' if IMMUTABLE_DATA.match(path)
+                                         else 'no-cache')
+    return response
+
 @app.route('/<path:path>')
 def serve_static(path):
     # Check if file exists in frontend/dist
     if os.path.exists(os.path.join('frontend/dist', path)):
+        if path.startswith('data/') and path.endswith('.json'):
+            return send_data_file(path)
         return send_from_directory('frontend/dist', path)
     # Otherwise return index.html for React Router
     return send_from_directory('frontend/dist', 'index.html')
@@ -252,10 +132,7 @@ def parse_result_pdf():
     """Parse uploaded PDF and return structured data"""
     try:
         # Password Check
-        required_password = os.environ.get('UPLOAD_PASSWORD', 'syllabix')
-        provided_password = request.headers.get('X-Upload-Password')
-        
-        if provided_password != required_password:
+        if not check_upload_password():
              return jsonify({'error': 'Invalid Access Password'}), 401
 
         if 'file' not in request.files:
@@ -295,18 +172,12 @@ def parse_result_pdf():
 
         # Check cache via StorageManager
         cached_result = storage.get(file_hash)
+        metrics.PARSE_CACHE.labels('hit' if cached_result else 'miss').inc()
         if cached_result:
             print(f"Cache hit for {file.filename} ({file_hash})")
-            # Update filename and timestamp for existing cache
-            if 'meta' not in cached_result:
-                cached_result['meta'] = {}
-            
-            cached_result['meta']['filename'] = file.filename
-            cached_result['meta']['timestamp'] = time.time()
-            
-            # Re-save to update metadata
-            storage.save(file_hash, cached_result)
-            return jsonify(cached_result)
+            # Served as stored: meta.timestamp is when the ledger was first stored, and
+            # re-uploading an original must not make it look newer than its re-issue
+            return stream_result(cached_result)
         
         # Reset file pointer properly for saving
         file.seek(0)
@@ -314,30 +185,24 @@ def parse_result_pdf():
         # Save file temporarily
         filepath = None
         try:
-            filename = secure_filename(file.filename)
+            # Prefix with the hash so concurrent uploads (gthread workers) never share a temp file
+            filename = f"{file_hash}_{secure_filename(file.filename)}"
             filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
             file.save(filepath)
             # Parse the PDF to get fresh metadata (fixes any old bad cache)
-            result = parse_pdf(filepath)
+            with metrics.track_parse():
+                result = parse_pool.parse(filepath)
+            metrics.PARSE_PAGES.observe(result.get('page_count', 0))
             
             # Check if we have existing data to merge, or just overwrite
             # For now, let's overwrite metadata but maybe keep old stats if we wanted
             # Actually, fresh parse is best.
             
-            exam_info = result.get('exam_info', {})
-            result['meta'] = {
-                'filename': file.filename,
-                'timestamp': time.time(),
-                'hash': file_hash,
-                'program': exam_info.get('program', 'Unknown Program'),
-                'semester': exam_info.get('semester', ''),
-                'scheme': exam_info.get('scheme', ''),
-                'examination': exam_info.get('examination', '')
-            }
+            result['meta'] = result_meta(result, file.filename, file_hash)
             
             # Save via StorageManager (Upsert)
             storage.save(file_hash, result)
-            return jsonify(result)
+            return stream_result(result)
             
         finally:
             # Clean up uploaded file
@@ -348,18 +213,234 @@ def parse_result_pdf():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/parse/batch', methods=['POST'])
+def parse_batch_pdfs():
+    """Parse several PDFs (multipart 'files', optional 'sources' with one label per file)
+    and return one merged result. Cached files are reused; new ones parse concurrently."""
+    try:
+        if not check_upload_password():
+            return jsonify({'error': 'Invalid Access Password'}), 401
+
+        files = request.files.getlist('files')
+        if not files or any(f.filename == '' for f in files):
+            return jsonify({'error': 'No files provided'}), 400
+        if not all(allowed_file(f.filename) for f in files):
+            return jsonify({'error': 'Invalid file type. Only PDF files are allowed'}), 400
+
+        sources = request.form.getlist('sources')
+        if sources and len(sources) != len(files):
+            return jsonify({'error': 'Provide one source per file'}), 400
+        if not sources:
+            sources = [os.path.splitext(f.filename)[0] for f in files]
+
+        parsed = [None] * len(files)
+        todo = []
+        for i, f in enumerate(files):
+            content = f.read()
+            file_hash = hashlib.sha256(content).hexdigest()
+            cached_result = storage.get(file_hash)
+            metrics.PARSE_CACHE.labels('hit' if cached_result else 'miss').inc()
+            if cached_result:
+                parsed[i] = (sources[i], file_hash, cached_result, True)
+            else:
+                filepath = os.path.join(app.config['UPLOAD_FOLDER'], f"{file_hash}_{secure_filename(f.filename)}")
+                with open(filepath, 'wb') as out:
+                    out.write(content)
+                todo.append((i, file_hash, filepath))
+
+        print(f"📚 Batch of {len(files)} PDFs: {len(files) - len(todo)} cached, {len(todo)} to parse")
+
+        def _parse(filepath):
+            with metrics.track_parse():
+                return parse_pool.parse(filepath)
+
+        try:
+            if todo:
+                # The parse pool does the CPU work; threads just wait on it
+                fresh = batch_parse.parse_many([(sources[i], path) for i, _h, path in todo], parse=_parse,
+                                               executor='thread', max_workers=min(len(todo), parse_pool.pool_size()))
+                for (i, file_hash, _path), (_source, _h, result, _cached) in zip(todo, fresh):
+                    metrics.PARSE_PAGES.observe(result.get('page_count', 0))
+                    result['meta'] = result_meta(result, files[i].filename, file_hash)
+                    storage.save(file_hash, result)
+                    parsed[i] = (sources[i], file_hash, result, False)
+        finally:
+            for _i, _h, path in todo:
+                if os.path.exists(path):
+                    os.remove(path)
+
+        return jsonify(batch_parse.merge_results(parsed))
+
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/cache', methods=['GET'])
 def get_cached_results():
     """List available cached results"""
     return jsonify(storage.list())
 
+# Per-result summaries (aggregates.py), reloaded only when one is written or removed
+_summary_cache = {'stamp': None, 'summaries': []}
+
+def current_summaries():
+    stamp = storage.summaries_stamp()
+    if stamp is None or stamp != _summary_cache['stamp']:
+        summaries = aggregates.load(storage)
+        _summary_cache.update(stamp=storage.summaries_stamp(), summaries=summaries)
+    return _summary_cache['summaries']
+
+@app.route('/api/trends', methods=['GET'])
+def get_trends():
+    """Pass %, median CGPA and subject failure rates across sittings, from the per-result
+    summaries kept at save time. Optional ?program= &semester= &college= &subject="""
+    args = request.args
+    series = aggregates.trends(current_summaries(), program=args.get('program'), semester=args.get('semester'),
+                               college=args.get('college'), subject=args.get('subject'))
+    return jsonify({'series': series})
+
+@app.route('/api/leaderboard', methods=['GET'])
+def get_leaderboard():
+    """Colleges ranked across all stored results (or ?program= &semester= &examination=).
+    ?sort=pass_percentage|median_cgpa|toppers, ?min_students= (default 1), ?limit="""
+    args = request.args
+    sort = args.get('sort', 'pass_percentage')
+    if sort not in aggregates.LEADERBOARD_SORTS:
+        return jsonify({'error': f"sort must be one of {', '.join(aggregates.LEADERBOARD_SORTS)}"}), 400
+    try:
+        min_students = int(args.get('min_students', 1))
+        limit = int(args['limit']) if args.get('limit') else None
+    except ValueError:
+        return jsonify({'error': 'min_students and limit must be integers'}), 400
+
+    board = aggregates.leaderboard(current_summaries(), program=args.get('program'), semester=args.get('semester'),
+                                   examination=args.get('examination'), sort=sort, min_students=min_students)
+    return jsonify({'sort': sort, 'count': len(board), 'colleges': board[:limit]})
+
 @app.route('/api/results/<file_hash>', methods=['GET'])
 def get_single_result(file_hash):
-    """Get a specific result by hash"""
+    """Get a specific result by hash. The stored JSON is passed through as is (streamed
+    from the cache file in file mode), never decoded and re-encoded."""
+    raw = storage.open_raw(file_hash)
+    if raw is None:
+        return jsonify({'error': 'Result not found'}), 404
+    return send_file(raw, mimetype='application/json', conditional=False, etag=False)
+
+@app.route('/api/results/<file_hash>/students', methods=['GET'])
+def query_students(file_hash):
+    """Filtered, sorted page of a result's students (see student_query.py for parameters).
+    Indexes are built on the first query of a result and kept in memory."""
+    args = request.args
+    # The table's pass/fail filter values map onto the ledger's
+    results = [{'pass': 'PASS', 'fail': 'FAILED'}.get(r.lower(), r.upper()) for r in args.getlist('result')]
+    try:
+        params = {
+            'college': args.getlist('college'),
+            'gender': [g.upper() for g in args.getlist('gender')],
+            'status': [s.title() for s in args.getlist('status')],
+            'result': results,
+            'failed_in': args.getlist('failed_in'),
+            'cgpa_min': float(args['cgpa_min']) if args.get('cgpa_min') else None,
+            'cgpa_max': float(args['cgpa_max']) if args.get('cgpa_max') else None,
+            'q': args.get('q'),
+            'sort': args.get('sort', '-total_marks'),
+            'page': int(args.get('page', 1)),
+            'page_size': int(args.get('page_size', 50)),
+        }
+        student_query.parse_sort(params['sort'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    index = student_query.index_for(storage, file_hash)
+    if index is None:
+        return jsonify({'error': 'Result not found'}), 404
+    return jsonify(student_query.query(index, **params))
+
+@app.route('/api/results/<file_hash>/export', methods=['GET'])
+def export_result(file_hash):
+    """Download a result as a sheet: ?format=csv|xlsx, optional ?college=<code or name>.
+    CSV streams row by row; XLSX is built in openpyxl's write-only mode.
+    ?format=parquet|arrow gives a typed table instead (?table=students|subject_marks)."""
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in ('csv', 'xlsx', 'parquet', 'arrow'):
+        return jsonify({'error': 'format must be csv, xlsx, parquet or arrow'}), 400
+
     result = storage.get(file_hash)
-    if result:
-        return jsonify(result)
-    return jsonify({'error': 'Result not found'}), 404
+    if not result:
+        return jsonify({'error': 'Result not found'}), 404
+
+    student_filter = None
+    college = request.args.get('college')
+    if college:
+        from parse_results import StudentFilter
+        student_filter = StudentFilter(college=college)
+
+    filename = result.get('meta', {}).get('filename') or file_hash
+    name = secure_filename(os.path.splitext(filename)[0]) or file_hash
+    if college:
+        name = f"{name}_{secure_filename(college)}"
+
+    if fmt in ('parquet', 'arrow'):
+        import columnar_export  # pyarrow is optional and heavy: only loaded here
+        table = request.args.get('table', 'students')
+        if table not in columnar_export.TABLES:
+            return jsonify({'error': 'table must be students or subject_marks'}), 400
+        try:
+            data = columnar_export.to_bytes(result, table, fmt, file_hash, student_filter)
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 501
+        extension = 'parquet' if fmt == 'parquet' else 'arrow'
+        mimetype = 'application/vnd.apache.parquet' if fmt == 'parquet' else 'application/vnd.apache.arrow.file'
+        return Response(data, mimetype=mimetype,
+                        headers={'Content-Disposition': f'attachment; filename="{name}_{table}.{extension}"'})
+
+    if fmt == 'csv':
+        return Response(stream_with_context(generate_sheets.iter_csv(result, student_filter)),
+                        mimetype='text/csv',
+                        headers={'Content-Disposition': f'attachment; filename="{name}.csv"'})
+
+    # XLSX is a zip, so it is spooled to a temp file (closed after the response is sent)
+    spool = tempfile.TemporaryFile()
+    try:
+        generate_sheets.write_xlsx(result, spool, student_filter)
+    except Exception as e:
+        spool.close()
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+    spool.seek(0)
+    return send_file(spool, as_attachment=True, download_name=f"{name}.xlsx",
+                     mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+@app.route('/api/diff/<old_hash>/<new_hash>', methods=['GET'])
+def diff_results(old_hash, new_hash):
+    """Students whose marks, grades, CGPA or result changed between two results of one exam
+    (e.g. a re-issued ledger), with per-college and per-subject deltas"""
+    try:
+        diff = result_diff.diff_stored(storage, old_hash, new_hash)
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+    if diff is None:
+        return jsonify({'error': 'Result not found'}), 404
+    return jsonify(diff)
+
+@app.route('/api/results/<file_hash>/simulate', methods=['POST'])
+def simulate_result(file_hash):
+    """What-if over a stored result: JSON rule set (grace caps per component, student_cap,
+    pass_fraction, thresholds) -> pass/fail and grade deltas for the whole cohort"""
+    rules = request.get_json(silent=True) or {}
+    try:
+        report = grace_simulation.simulate_stored(storage, file_hash, rules)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 501
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+    if report is None:
+        return jsonify({'error': 'Result not found'}), 404
+    return jsonify(report)
 
 @app.route('/api/analyze-student/<seat_no>', methods=['POST'])
 def analyze_student(seat_no):
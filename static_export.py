@@ -0,0 +1,310 @@
+"""
+Static Export helpers
+Shared by sync_db.py (database -> static site) and generate_static_cache.py
+(cache/ -> static site): index entries and atomic writes into frontend/public/data.
+
+Run directly to (re)compress a data directory, e.g. after `npm run build`:
+    python static_export.py frontend/dist/data
+"""
+
+import os
+import sys
+import gzip
+import json
+import shutil
+import hashlib
+import tempfile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PUBLIC_DATA_DIR = os.path.join("frontend", "public", "data")
+INDEX_FILE = os.path.join(PUBLIC_DATA_DIR, "index.json")
+
+def write_atomic(path, data):
+    """Write bytes via a temp file + rename, so the site never serves a half-written file"""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates 0600; the files are served publicly
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def index_entry(h, meta, stats):
+    """One row of index.json (same shape as /api/cache)"""
+    if not meta: meta = {}
+    if not stats: stats = {}
+
+    # Ensure proper types
+    if isinstance(meta, str): meta = json.loads(meta)
+    if isinstance(stats, str): stats = json.loads(stats)
+
+    return {
+        'hash': h,
+        'filename': meta.get('filename', 'Unknown'),
+        'timestamp': meta.get('timestamp', 0),
+        'student_count': stats.get('total_students', 0),
+        'college_count': len(stats.get('college_statistics', {})),
+        'program': meta.get('program'),
+        'semester': meta.get('semester'),
+        'scheme': meta.get('scheme'),
+        'examination': meta.get('examination')
+    }
+
+def load_index(path=INDEX_FILE):
+    """Existing index.json keyed by hash ({} if missing or unreadable)"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return {item['hash']: item for item in json.load(f)}
+    except Exception as e:
+        print(f"⚠️  Could not read existing index ({e}), rebuilding it.")
+        return {}
+
+# index.json is rewritten in place, so it also gets a content-hashed copy
+# (index.<version>.json, cacheable forever) and a small pointer to it that
+# clients revalidate on every load.
+INDEX_POINTER_NAME = "index.latest.json"
+INDEX_VERSIONS_KEPT = 2  # current + previous, for clients holding an old pointer
+
+def _versioned_indexes(directory):
+    names = []
+    for name in os.listdir(directory):
+        parts = name.split('.')
+        if len(parts) == 3 and parts[0] == 'index' and parts[2] == 'json' and parts[1] != 'latest':
+            names.append(name)
+    return names
+
+def write_index(entries, path=INDEX_FILE):
+    """Write index.json newest first, plus its versioned copy and pointer"""
+    index_list = sorted(entries, key=lambda x: x.get('timestamp') or 0, reverse=True)
+    data = json.dumps(index_list, ensure_ascii=False, indent=2).encode('utf-8')
+    write_atomic(path, data)
+
+    directory = os.path.dirname(path) or '.'
+    version = hashlib.sha256(data).hexdigest()[:12]
+    versioned = f"index.{version}.json"
+    write_atomic(os.path.join(directory, versioned), data)
+    write_atomic(os.path.join(directory, INDEX_POINTER_NAME),
+                 _compact({'version': version, 'index': versioned, 'count': len(index_list)}))
+
+    # Prune old versions: newest first, keep INDEX_VERSIONS_KEPT - 1 besides the current one
+    old = sorted((n for n in _versioned_indexes(directory) if n != versioned),
+                 key=lambda n: os.path.getmtime(os.path.join(directory, n)), reverse=True)
+    for name in old[INDEX_VERSIONS_KEPT - 1:]:
+        os.remove(os.path.join(directory, name))
+    return index_list
+
+# --- SHARDED LAYOUT ---
+# data/<hash>/summary.json        exam_info, course_metadata, statistics, meta + layout
+# data/<hash>/students/<n>.json   students sorted by seat_no, CHUNK_SIZE per file
+# data/<hash>/seats.json          [first_seat, last_seat] of each chunk (binary search)
+# The monolithic data/<hash>.json is still written for older clients.
+CHUNK_SIZE = 500
+LAYOUT_VERSION = 1
+
+def _compact(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def sharded_dir(h, out_dir=PUBLIC_DATA_DIR):
+    return os.path.join(out_dir, h)
+
+def has_sharded(h, out_dir=PUBLIC_DATA_DIR):
+    return os.path.exists(os.path.join(sharded_dir(h, out_dir), 'summary.json'))
+
+def write_sharded(h, data, out_dir=PUBLIC_DATA_DIR, chunk_size=CHUNK_SIZE):
+    """Write the layered layout for one result. Returns the paths written."""
+    base = sharded_dir(h, out_dir)
+    students_dir = os.path.join(base, 'students')
+    os.makedirs(students_dir, exist_ok=True)
+
+    students = sorted(data.get('students', []), key=lambda s: s.get('seat_no', ''))
+    chunks = [students[i:i + chunk_size] for i in range(0, len(students), chunk_size)]
+    written = []
+
+    for n, chunk in enumerate(chunks):
+        path = os.path.join(students_dir, f"{n}.json")
+        write_atomic(path, _compact(chunk))
+        written.append(path)
+
+    # Drop chunks left over from a previous export with more students
+    for name in os.listdir(students_dir):
+        stem = name[:-len('.json')]
+        if name.endswith('.json') and stem.isdigit() and int(stem) >= len(chunks):
+            os.remove(os.path.join(students_dir, name))
+
+    seats_path = os.path.join(base, 'seats.json')
+    write_atomic(seats_path, _compact([[c[0].get('seat_no'), c[-1].get('seat_no')] for c in chunks]))
+    written.append(seats_path)
+
+    # Summary last: once it is visible, every chunk it points at exists
+    summary = {key: value for key, value in data.items() if key != 'students'}
+    summary['layout'] = {
+        'version': LAYOUT_VERSION,
+        'student_count': len(students),
+        'chunk_size': chunk_size,
+        'chunk_count': len(chunks),
+    }
+    summary_path = os.path.join(base, 'summary.json')
+    write_atomic(summary_path, _compact(summary))
+    written.append(summary_path)
+    return written
+
+def remove_exported(h, out_dir=PUBLIC_DATA_DIR):
+    """Remove a result's monolithic file and sharded layout (compress_tree drops their
+    .gz/.br variants). Returns True if anything was removed."""
+    removed = False
+    path = os.path.join(out_dir, f"{h}.json")
+    if os.path.exists(path):
+        os.remove(path)
+        removed = True
+    if os.path.isdir(sharded_dir(h, out_dir)):
+        shutil.rmtree(sharded_dir(h, out_dir))
+        removed = True
+    return removed
+
+# --- SEARCH INDEX ---
+# data/search/meta.json          hashes (postings refer to them by position) + shard keys
+# data/search/seats/<ppp>.json   {seat_no: [[hash_idx, chunk, offset], ...]} by 3-digit seat prefix
+# data/search/names/<pp>.json    [[token, name, seat_no, hash_idx, chunk, offset], ...] sorted by
+#                                token, sharded by the token's first 2 letters (every name word)
+SEARCH_DIR_NAME = 'search'
+SEAT_PREFIX_LEN = 3
+NAME_PREFIX_LEN = 2
+
+def _name_shard(token):
+    key = ''.join(ch for ch in token[:NAME_PREFIX_LEN] if ch.isalnum())
+    return key if len(key) == NAME_PREFIX_LEN else None
+
+def build_search_index(out_dir=PUBLIC_DATA_DIR):
+    """Rebuild the cross-result search index from every sharded result in out_dir"""
+    hashes = [h for h in load_index(os.path.join(out_dir, 'index.json')) if has_sharded(h, out_dir)]
+    seat_shards, name_shards = {}, {}
+
+    for hash_idx, h in enumerate(hashes):
+        with open(os.path.join(sharded_dir(h, out_dir), 'summary.json'), 'r', encoding='utf-8') as f:
+            chunk_count = json.load(f)['layout']['chunk_count']
+        for chunk in range(chunk_count):
+            with open(os.path.join(sharded_dir(h, out_dir), 'students', f"{chunk}.json"), 'r', encoding='utf-8') as f:
+                students = json.load(f)
+            for offset, s in enumerate(students):
+                seat_no, name = s.get('seat_no', ''), s.get('name', '')
+                posting = [hash_idx, chunk, offset]
+                if seat_no:
+                    seat_shards.setdefault(seat_no[:SEAT_PREFIX_LEN], {}).setdefault(seat_no, []).append(posting)
+                for token in set(name.lower().split()):
+                    shard = _name_shard(token)
+                    if shard:
+                        name_shards.setdefault(shard, []).append([token, name, seat_no] + posting)
+
+    search_dir = os.path.join(out_dir, SEARCH_DIR_NAME)
+    written = {}
+    for kind, shards in (('seats', seat_shards), ('names', name_shards)):
+        kind_dir = os.path.join(search_dir, kind)
+        os.makedirs(kind_dir, exist_ok=True)
+        for key, payload in shards.items():
+            if kind == 'names':
+                payload.sort(key=lambda e: (e[0], e[2]))
+            write_atomic(os.path.join(kind_dir, f"{key}.json"), _compact(payload))
+        # Shards that no longer have entries
+        for name in os.listdir(kind_dir):
+            if name.endswith('.json') and name[:-len('.json')] not in shards:
+                os.remove(os.path.join(kind_dir, name))
+        written[kind] = len(shards)
+
+    meta = {
+        'version': 1,
+        'hashes': hashes,
+        'seat_prefix_len': SEAT_PREFIX_LEN,
+        'name_prefix_len': NAME_PREFIX_LEN,
+        'seat_shards': sorted(seat_shards),
+        'name_shards': sorted(name_shards),
+    }
+    write_atomic(os.path.join(search_dir, 'meta.json'), _compact(meta))
+    print(f"🔎 Search index: {len(hashes)} results, {written['seats']} seat shards, {written['names']} name shards")
+    return meta
+
+# --- PRECOMPRESSION ---
+# Every .json under the data dir gets .gz (and .br when the brotli package is
+# installed) siblings, which server.py serves by Accept-Encoding. Variants are
+# only rebuilt when older than their source, and dropped when the source is gone.
+COMPRESSIBLE = ('.json',)
+VARIANTS = ('.gz', '.br')
+COMPRESSION_REPORT = "compression_report.json"
+
+def _compress(data, suffix):
+    if suffix == '.gz':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+def compress_tree(out_dir=PUBLIC_DATA_DIR):
+    """Write/refresh compressed variants. Returns a report row per source file."""
+    suffixes = [v for v in VARIANTS if v != '.br' or brotli is not None]
+    if brotli is None:
+        print("⚠️  brotli not installed, writing .gz only (pip install brotli)")
+
+    report = []
+    for root, _dirs, files in os.walk(out_dir):
+        names = set(files)
+        for name in files:
+            path = os.path.join(root, name)
+            base, ext = os.path.splitext(name)
+
+            # Orphaned variant (source removed, or brotli since uninstalled)
+            if ext in VARIANTS:
+                if base not in names or ext not in suffixes:
+                    os.remove(path)
+                continue
+            if ext not in COMPRESSIBLE or name.startswith('.tmp_'):
+                continue
+
+            source_mtime = os.path.getmtime(path)
+            size = os.path.getsize(path)
+            row = {'file': os.path.relpath(path, out_dir), 'bytes': size, 'rebuilt': False}
+            data = None
+            for suffix in suffixes:
+                variant = path + suffix
+                if not (os.path.exists(variant) and os.path.getmtime(variant) >= source_mtime):
+                    if data is None:
+                        with open(path, 'rb') as f:
+                            data = f.read()
+                    write_atomic(variant, _compress(data, suffix))
+                    row['rebuilt'] = True
+                row[suffix.lstrip('.')] = os.path.getsize(variant)
+            row['saved'] = size - min([size] + [row[s.lstrip('.')] for s in suffixes])
+            report.append(row)
+
+    report.sort(key=lambda r: r['saved'], reverse=True)
+    return report
+
+def print_compression_report(report, limit=10):
+    if not report:
+        return
+    total = sum(r['bytes'] for r in report)
+    saved = sum(r['saved'] for r in report)
+    rebuilt = sum(1 for r in report if r['rebuilt'])
+    print(f"🗜️  Compressed {len(report)} files ({rebuilt} rebuilt): "
+          f"{total / 1024:.1f} KiB -> {(total - saved) / 1024:.1f} KiB, saved {saved / 1024:.1f} KiB "
+          f"({saved / max(total, 1):.0%})")
+    for r in report[:limit]:
+        sizes = ', '.join(f"{k} {r[k]}" for k in ('gz', 'br') if k in r)
+        print(f"   {r['file']}: {r['bytes']} B -> {sizes} (saved {r['saved']} B)")
+    if len(report) > limit:
+        print(f"   ... {len(report) - limit} more in {COMPRESSION_REPORT}")
+
+def write_compression_report(report, path=COMPRESSION_REPORT):
+    write_atomic(path, json.dumps(report, indent=2).encode('utf-8'))
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else PUBLIC_DATA_DIR
+    report = compress_tree(target)
+    print_compression_report(report)
+    write_compression_report(report)
@@ -0,0 +1,552 @@
+"""
+Result Storage for University Result Analysis
+Persists parsed results in PostgreSQL (DATABASE_URL) or the local cache/ directory
+"""
+
+import io
+import os
+import json
+import time
+from datetime import datetime
+
+import aggregates
+from metrics import timed_storage, DB_CONNECTION_ERRORS
+
+# --- DATABASE / STORAGE MANAGER ---
+class StorageManager:
+    def __init__(self, app=None):
+        self.app = app
+        self.mode = 'file'
+
+        # Cache directory lives next to the app (or this module when used from a CLI)
+        # unless CACHE_DIR points elsewhere
+        root_path = app.root_path if app is not None else os.path.dirname(os.path.abspath(__file__))
+        self.cache_dir = os.environ.get('CACHE_DIR') or os.path.join(root_path, 'cache')
+
+        # Check for DATABASE_URL env var (Render/Heroku/etc)
+        self.db_url = os.environ.get('DATABASE_URL')
+        if self.db_url:
+            self.mode = 'db'
+            print("✅ Configured for PostgreSQL Database")
+            self._init_db()
+        else:
+            print("ℹ️  No DATABASE_URL found. Using local file storage.")
+
+    def _get_conn(self):
+        try:
+            import psycopg2
+            # Hosted databases need SSL; local ones (load tests) can set DATABASE_SSLMODE=disable
+            return psycopg2.connect(self.db_url, sslmode=os.environ.get('DATABASE_SSLMODE', 'require'))
+        except Exception as e:
+            DB_CONNECTION_ERRORS.inc()
+            print(f"❌ DB Connection Error: {e}")
+            return None
+
+    def _init_db(self):
+        """Create table if not exists"""
+        if self.mode != 'db': return
+
+        conn = self._get_conn()
+        if not conn: return
+
+        try:
+            cur = conn.cursor()
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    hash TEXT PRIMARY KEY,
+                    filename TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    meta JSONB,
+                    data JSONB
+                );
+            """)
+            # Retention columns (added after the initial schema, so migrate in place)
+            cur.execute("""
+                ALTER TABLE results
+                    ADD COLUMN IF NOT EXISTS last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    ADD COLUMN IF NOT EXISTS pinned BOOLEAN DEFAULT FALSE;
+            """)
+            cur.execute("CREATE INDEX IF NOT EXISTS results_last_accessed_idx ON results (last_accessed);")
+            # Change tracking for incremental static sync (sync_db.py)
+            cur.execute("ALTER TABLE results ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;")
+            cur.execute("CREATE INDEX IF NOT EXISTS results_updated_at_idx ON results (updated_at);")
+            # Per-result aggregate summaries (aggregates.py), read by cross-exam queries
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS result_summaries (
+                    hash TEXT PRIMARY KEY,
+                    summary JSONB,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+            """)
+            conn.commit()
+            cur.close()
+            print("✅ DB Schema Initialized")
+        except Exception as e:
+            print(f"❌ Failed to init DB schema: {e}")
+        finally:
+            if conn: conn.close()
+
+    def _cache_path(self, file_hash):
+        return os.path.join(self.cache_dir, f"{file_hash}.json")
+
+    def _summary_path(self, file_hash):
+        # A subdirectory, so list()/usage() never mistake summaries for results
+        return os.path.join(self.cache_dir, 'aggregates', f"{file_hash}.json")
+
+    def _access_path(self, file_hash):
+        # Reads are recorded as the mtime of a marker file: atime is unreliable, and
+        # list() opening every result would update it on relatime/strictatime mounts
+        return os.path.join(self.cache_dir, 'access', file_hash)
+
+    def _pin_path(self, file_hash):
+        # Pins are marker files so they survive rewrites of the result itself
+        return os.path.join(self.cache_dir, f"{file_hash}.pin")
+
+    def save(self, file_hash, result_data):
+        saved = self._save_result(file_hash, result_data)
+        if saved:
+            # Keep the materialized aggregates in step; a failure here never fails the save
+            try:
+                self.save_summary(file_hash, aggregates.summarize(result_data, file_hash))
+            except Exception as e:
+                print(f"⚠️  Summary update failed for {file_hash}: {e}")
+        return saved
+
+    @timed_storage('save')
+    def _save_result(self, file_hash, result_data):
+        if self.mode == 'db':
+            conn = self._get_conn()
+            if not conn: return False
+
+            try:
+                cur = conn.cursor()
+                meta = result_data.get('meta', {})
+                timestamp = datetime.fromtimestamp(meta.get('timestamp', time.time()))
+
+                # Upsert (Insert or Do Nothing if exists)
+                cur.execute("""
+                    INSERT INTO results (hash, filename, created_at, meta, data, last_accessed, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    ON CONFLICT (hash) DO UPDATE
+                    SET meta = EXCLUDED.meta, data = EXCLUDED.data,
+                        last_accessed = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP;
+                """, (
+                    file_hash,
+                    meta.get('filename', 'Unknown'),
+                    timestamp,
+                    json.dumps(meta),
+                    json.dumps(result_data)
+                ))
+                conn.commit()
+                cur.close()
+                return True
+            except Exception as e:
+                print(f"❌ DB Save Error: {e}")
+                return False
+            finally:
+                if conn: conn.close()
+        else:
+            # File Mode
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(self._cache_path(file_hash), 'w', encoding='utf-8') as f:
+                    json.dump(result_data, f, ensure_ascii=False)
+                return True
+            except Exception as e:
+                print(f"❌ File Save Error: {e}")
+                return False
+
+    @timed_storage('get')
+    def get(self, file_hash):
+        if self.mode == 'db':
+            conn = self._get_conn()
+            if not conn: return None
+
+            try:
+                cur = conn.cursor()
+                # Record the access in the same round trip (drives LRU eviction)
+                cur.execute("""
+                    UPDATE results SET last_accessed = CURRENT_TIMESTAMP
+                    WHERE hash = %s
+                    RETURNING data
+                """, (file_hash,))
+                row = cur.fetchone()
+                conn.commit()
+                cur.close()
+                if row:
+                    return row[0] # data column is already dict/json
+                return None
+            except Exception as e:
+                print(f"❌ DB Get Error: {e}")
+                return None
+            finally:
+                if conn: conn.close()
+        else:
+            # File Mode
+            cache_path = self._cache_path(file_hash)
+            if os.path.exists(cache_path):
+                try:
+                    with open(cache_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    self._record_access(file_hash)
+                    return data
+                except Exception as e:
+                    print(f"⚠️  Corrupted cache file {file_hash}: {e}")
+                    try:
+                        os.remove(cache_path)
+                        print(f"🗑️  Deleted corrupted cache file.")
+                    except: pass
+            return None
+
+    @timed_storage('open_raw')
+    def open_raw(self, file_hash):
+        """The stored result as a binary file object of JSON, without decoding it
+        (for passing straight through to a response). None if it does not exist."""
+        if self.mode == 'db':
+            conn = self._get_conn()
+            if not conn: return None
+
+            try:
+                cur = conn.cursor()
+                # Postgres renders the JSONB as text; nothing is parsed on this side
+                cur.execute("""
+                    UPDATE results SET last_accessed = CURRENT_TIMESTAMP
+                    WHERE hash = %s
+                    RETURNING data::text
+                """, (file_hash,))
+                row = cur.fetchone()
+                conn.commit()
+                cur.close()
+                return io.BytesIO(row[0].encode('utf-8')) if row else None
+            except Exception as e:
+                print(f"❌ DB Get Error: {e}")
+                return None
+            finally:
+                if conn: conn.close()
+        else:
+            cache_path = self._cache_path(file_hash)
+            try:
+                f = open(cache_path, 'rb')
+            except OSError:
+                return None
+            self._record_access(file_hash)
+            return f
+
+    # --- AGGREGATE SUMMARIES ---
+    def save_summary(self, file_hash, summary):
+        if self.mode == 'db':
+            conn = self._get_conn()
+            if not conn: return False
+
+            try:
+                cur = conn.cursor()
+                cur.execute("""
+                    INSERT INTO result_summaries (hash, summary, updated_at)
+                    VALUES (%s, %s, CURRENT_TIMESTAMP)
+                    ON CONFLICT (hash) DO UPDATE
+                    SET summary = EXCLUDED.summary, updated_at = CURRENT_TIMESTAMP;
+                """, (file_hash, json.dumps(summary)))
+                conn.commit()
+                cur.close()
+                return True
+            except Exception as e:
+                print(f"❌ DB Summary Save Error: {e}")
+                return False
+            finally:
+                if conn: conn.close()
+        else:
+            path = self._summary_path(file_hash)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write-then-rename: concurrent readers never see a partial summary
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            return True
+
+    @timed_storage('summaries')
+    def summaries(self):
+        """Every stored result summary (see aggregates.summarize)"""
+        if self.mode == 'db':
+            conn = self._get_conn()
+            if not conn: return []
+
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT summary FROM result_summaries")
+                rows = [r[0] for r in cur.fetchall() if r[0]]
+                cur.close()
+                return rows
+            except Exception as e:
+                print(f"❌ DB Summaries Error: {e}")
+                return []
+            finally:
+                if conn: conn.close()
+        else:
+            summary_dir = os.path.dirname(self._summary_path(''))
+            if not os.path.exists(summary_dir):
+                return []
+
+            rows = []
+            for entry in os.scandir(summary_dir):
+                if not entry.name.endswith('.json'): continue
+                try:
+                    with open(entry.path, 'r', encoding='utf-8') as f:
+                        rows.append(json.load(f))
+                except Exception as e:
+                    print(f"⚠️  Skipping unreadable summary {entry.name}: {e}")
+            return rows
+
+    def summaries_stamp(self):
+        """Changes whenever a summary is written or removed (lets callers cache summaries())"""
+        if self.mode == 'db':
+            conn = self._get_conn()
+            if not conn: return None
+
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT COUNT(*), MAX(updated_at) FROM result_summaries")
+                count, updated = cur.fetchone()
+                cur.close()
+                return (count, str(updated))
+            except Exception as e:
+                print(f"❌ DB Summaries Stamp Error: {e}")
+                return None
+            finally:
+                if conn: conn.close()
+        else:
+            # Every write is a rename into the directory, which bumps its mtime
+            try:
+                return os.stat(os.path.dirname(self._summary_path(''))).st_mtime_ns
+            except OSError:
+                return 0
+
+    def _record_access(self, file_hash):
+        """Touch the result's access marker (drives LRU eviction in file mode)"""
+        path = self._access_path(file_hash)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a'):
+                pass
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _last_access(self, file_hash, st):
+        """Last read (access marker) or write (result mtime), whichever is later"""
+        try:
+            return max(os.stat(self._access_path(file_hash)).st_mtime, st.st_mtime)
+        except OSError:
+            return st.st_mtime
+
+    @timed_storage('list')
+    def list(self):
+        results = []
+        if self.mode == 'db':
+            conn = self._get_conn()
+            if not conn: return []
+
+            try:
+                cur = conn.cursor()
+                # Only the statistics the listing shows (not the histograms and rankings)
+                cur.execute("""
+                    SELECT hash, meta,
+                           jsonb_build_object('total_students', data #> '{statistics,total_students}',
+                                              'college_statistics', data #> '{statistics,college_statistics}') as stats
+                    FROM results
+                    ORDER BY created_at DESC
+                """)
+                rows = cur.fetchall()
+                cur.close()
+
+                for r in rows:
+                    h, meta, stats = r
+                    if not meta: meta = {}
+                    if not stats: stats = {}
+
+                    results.append({
+                        'hash': h,
+                        'filename': meta.get('filename', 'Unknown'),
+                        'timestamp': meta.get('timestamp', 0),
+                        'student_count': stats.get('total_students', 0),
+                        'college_count': len(stats.get('college_statistics', {})),
+                        'program': meta.get('program'),
+                        'semester': meta.get('semester'),
+                        'scheme': meta.get('scheme'),
+                        'examination': meta.get('examination')
+                    })
+                return results
+
+            except Exception as e:
+                print(f"❌ DB List Error: {e}")
+                return []
+            finally:
+                if conn: conn.close()
+        else:
+            # File Mode
+            cache_dir = self.cache_dir
+            if not os.path.exists(cache_dir):
+                return []
+
+            for filename in os.listdir(cache_dir):
+                if not filename.endswith('.json'): continue
+                try:
+                    filepath = os.path.join(cache_dir, filename)
+                    with open(filepath, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                        meta = data.get('meta', {})
+                        stats = data.get('statistics', {})
+                        exam = data.get('exam_info', {})
+
+                        if not meta:
+                            meta = {'filename': 'Unknown', 'timestamp': os.path.getmtime(filepath), 'hash': filename.replace('.json', '')}
+
+                        if 'program' not in meta:
+                            meta['program'] = exam.get('program', 'Unknown')
+                            meta['semester'] = exam.get('semester', '')
+
+                        results.append({
+                            'hash': meta.get('hash', filename.replace('.json', '')),
+                            'filename': meta.get('filename', 'Unknown'),
+                            'timestamp': meta.get('timestamp', 0),
+                            'student_count': stats.get('total_students', 0),
+                            'college_count': len(stats.get('college_statistics', {})),
+                            'program': meta.get('program'),
+                            'semester': meta.get('semester'),
+                            'scheme': meta.get('scheme'),
+                            'examination': meta.get('examination')
+                        })
+                except: pass
+
+            results.sort(key=lambda x: x['timestamp'], reverse=True)
+            return results
+
+    # --- RETENTION ---
+    def set_pinned(self, file_hash, pinned=True):
+        """Pin (or unpin) a result so retention never evicts it"""
+        if self.mode == 'db':
+            conn = self._get_conn()
+            if not conn: return False
+
+            try:
+                cur = conn.cursor()
+                cur.execute("UPDATE results SET pinned = %s WHERE hash = %s", (pinned, file_hash))
+                found = cur.rowcount > 0
+                conn.commit()
+                cur.close()
+                return found
+            except Exception as e:
+                print(f"❌ DB Pin Error: {e}")
+                return False
+            finally:
+                if conn: conn.close()
+        else:
+            if not os.path.exists(self._cache_path(file_hash)):
+                return False
+            pin_path = self._pin_path(file_hash)
+            try:
+                if pinned:
+                    open(pin_path, 'a').close()
+                elif os.path.exists(pin_path):
+                    os.remove(pin_path)
+                return True
+            except Exception as e:
+                print(f"❌ File Pin Error: {e}")
+                return False
+
+    @timed_storage('usage')
+    def usage(self):
+        """Per-result footprint for retention: [{hash, bytes, last_accessed, pinned}]
+        Sorted least recently accessed first."""
+        entries = []
+        if self.mode == 'db':
+            conn = self._get_conn()
+            if not conn: return []
+
+            try:
+                cur = conn.cursor()
+                # pg_column_size is the stored (TOAST-compressed) size of each document
+                cur.execute("""
+                    SELECT hash,
+                           COALESCE(pg_column_size(data), 0) + COALESCE(pg_column_size(meta), 0),
+                           EXTRACT(EPOCH FROM COALESCE(last_accessed, created_at)),
+                           COALESCE(pinned, FALSE)
+                    FROM results
+                    ORDER BY COALESCE(last_accessed, created_at) ASC
+                """)
+                for h, size, accessed, pinned in cur.fetchall():
+                    entries.append({
+                        'hash': h,
+                        'bytes': int(size or 0),
+                        'last_accessed': float(accessed or 0),
+                        'pinned': bool(pinned)
+                    })
+                cur.close()
+            except Exception as e:
+                print(f"❌ DB Usage Error: {e}")
+                return []
+            finally:
+                if conn: conn.close()
+        else:
+            if not os.path.exists(self.cache_dir):
+                return []
+
+            for entry in os.scandir(self.cache_dir):
+                if not entry.name.endswith('.json'): continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                file_hash = entry.name[:-len('.json')]
+                entries.append({
+                    'hash': file_hash,
+                    'bytes': st.st_size,
+                    'last_accessed': self._last_access(file_hash, st),
+                    'pinned': os.path.exists(self._pin_path(file_hash))
+                })
+            entries.sort(key=lambda e: e['last_accessed'])
+        return entries
+
+    @timed_storage('delete')
+    def delete(self, hashes):
+        """Delete results by hash. Returns the number of results removed."""
+        hashes = list(hashes)
+        if not hashes:
+            return 0
+
+        if self.mode == 'db':
+            conn = self._get_conn()
+            if not conn: return 0
+
+            try:
+                cur = conn.cursor()
+                cur.execute("DELETE FROM results WHERE hash = ANY(%s) AND NOT COALESCE(pinned, FALSE)", (hashes,))
+                deleted = cur.rowcount
+                cur.execute("""
+                    DELETE FROM result_summaries
+                    WHERE hash = ANY(%s) AND hash NOT IN (SELECT hash FROM results)
+                """, (hashes,))
+                conn.commit()
+                cur.close()
+                return deleted
+            except Exception as e:
+                print(f"❌ DB Delete Error: {e}")
+                return 0
+            finally:
+                if conn: conn.close()
+        else:
+            deleted = 0
+            for file_hash in hashes:
+                if os.path.exists(self._pin_path(file_hash)):
+                    continue
+                try:
+                    os.remove(self._cache_path(file_hash))
+                    deleted += 1
+                except OSError:
+                    continue
+                for path in (self._summary_path(file_hash), self._access_path(file_hash)):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            return deleted
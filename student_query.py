@@ -0,0 +1,190 @@
+"""
+Student Query
+Filter / sort / paginate the students of a stored result on the server, so large
+results never have to be shipped to the browser in full.
+
+A StudentIndex is built per result on its first query and kept in memory (LRU by hash).
+Its secondary indexes are built lazily, on first use, and then reused:
+  - equality postings (college, gender, status, result, failed subject) -> sets of rows
+  - value-sorted rows (cgpa, total_marks, ...) -> ranges by bisection, and sort ranks
+A query intersects the postings (smallest first) and sorts only the matching rows.
+
+Query parameters (see query()):
+    college, gender, status, result, failed_in   (repeatable; college is a code or a name part)
+    cgpa_min, cgpa_max, q (seat number or name part)
+    sort=-total_marks,name    page=1    page_size=50
+"""
+
+import bisect
+import threading
+from collections import OrderedDict
+
+import aggregates
+
+SORT_FIELDS = ('seat_no', 'name', 'college', 'gender', 'status', 'result', 'total_marks', 'cgpa')
+MAX_PAGE_SIZE = 500
+
+class StudentIndex:
+    def __init__(self, result):
+        self.students = result.get('students', [])
+        self._postings = {}   # field -> {value: set(rows)}
+        self._sorted = {}     # field -> (values, rows) in value order
+        self._ranks = {}      # field -> rank per row
+        self._lock = threading.RLock()  # ranks() builds on sorted_rows()
+
+    def _build(self, cache, field, build):
+        if field not in cache:
+            with self._lock:
+                if field not in cache:
+                    cache[field] = build()
+        return cache[field]
+
+    def postings(self, field):
+        """{value: set(rows)} for an equality field, or for 'failed_in' {subject code: set(rows)}"""
+        def build():
+            index = {}
+            for row, s in enumerate(self.students):
+                if field == 'failed_in':
+                    for subj in s['subjects']:
+                        if not subj['passed']:
+                            index.setdefault(subj['code'], set()).add(row)
+                else:
+                    index.setdefault(s.get(field), set()).add(row)
+            return index
+        return self._build(self._postings, field, build)
+
+    def sorted_rows(self, field):
+        """(values, rows) sorted by value (None first)"""
+        def build():
+            order = sorted(range(len(self.students)), key=lambda row: _sort_value(self.students[row].get(field)))
+            return [_sort_value(self.students[row].get(field)) for row in order], order
+        return self._build(self._sorted, field, build)
+
+    def ranks(self, field):
+        """Position of every row in `field` order (equal values share a rank)"""
+        def build():
+            values, order = self.sorted_rows(field)
+            ranks = [0] * len(order)
+            rank = 0
+            for i, row in enumerate(order):
+                if i and values[i] != values[i - 1]:
+                    rank = i
+                ranks[row] = rank
+            return ranks
+        return self._build(self._ranks, field, build)
+
+    def value_range(self, field, low=None, high=None):
+        """Rows with low <= value <= high (None values never match)"""
+        values, order = self.sorted_rows(field)
+        start = bisect.bisect_left(values, (1, low)) if low is not None else bisect.bisect_left(values, (1,))
+        end = bisect.bisect_right(values, (1, high)) if high is not None else len(values)
+        return set(order[start:end])
+
+def _sort_value(value):
+    # Comparable across missing values: (0,) sorts before any (1, value)
+    return (0,) if value is None else (1, value)
+
+def parse_sort(spec):
+    """'-total_marks,name' -> [('total_marks', True), ('name', False)]"""
+    keys = []
+    for part in (spec or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        descending = part.startswith('-')
+        field = part.lstrip('+-')
+        if field not in SORT_FIELDS:
+            raise ValueError(f"sort field must be one of {', '.join(SORT_FIELDS)}")
+        keys.append((field, descending))
+    return keys
+
+def query(index, college=(), gender=(), status=(), result=(), failed_in=(), cgpa_min=None, cgpa_max=None,
+          q=None, sort='-total_marks', page=1, page_size=50):
+    """{'total', 'page', 'page_size', 'students'} for the students matching every filter"""
+    sets = []
+    if college:
+        names = [name for name in index.postings('college') if any(aggregates.college_matches(name, c) for c in college)]
+        sets.append(set().union(*(index.postings('college')[name] for name in names)))
+    for field, wanted in (('gender', gender), ('status', status), ('result', result)):
+        if wanted:
+            postings = index.postings(field)
+            sets.append(set().union(*(postings.get(value, set()) for value in wanted)))
+    for code in failed_in:
+        sets.append(index.postings('failed_in').get(code, set()))
+    if cgpa_min is not None or cgpa_max is not None:
+        sets.append(index.value_range('cgpa', cgpa_min, cgpa_max))
+
+    if sets:
+        sets.sort(key=len)
+        rows = set(sets[0])
+        for other in sets[1:]:
+            rows &= other
+            if not rows:
+                break
+    else:
+        rows = None  # every row
+
+    if q:
+        needle = q.strip().lower()
+        candidates = range(len(index.students)) if rows is None else rows
+        rows = {row for row in candidates
+                if needle in index.students[row]['seat_no'] or needle in index.students[row]['name'].lower()}
+
+    keys = parse_sort(sort) or [('total_marks', True)]
+    if rows is None and len(keys) == 1:
+        # No filter, one key: the prebuilt order is the answer
+        values, order = index.sorted_rows(keys[0][0])
+        if keys[0][1]:
+            order = _descending(values, order)
+    else:
+        ranks = [(index.ranks(field), -1 if descending else 1) for field, descending in keys]
+        order = sorted(range(len(index.students)) if rows is None else rows,
+                       key=lambda row: tuple(sign * r[row] for r, sign in ranks) + (row,))
+
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    page = max(1, int(page))
+    start = (page - 1) * page_size
+    return {
+        'total': len(order),
+        'page': page,
+        'page_size': page_size,
+        'students': [index.students[row] for row in order[start:start + page_size]],
+    }
+
+def _descending(values, order):
+    """Reverse of a value order that keeps ledger order within equal values"""
+    result = []
+    end = len(order)
+    while end > 0:
+        start = end - 1
+        while start > 0 and values[start - 1] == values[end - 1]:
+            start -= 1
+        result.extend(order[start:end])
+        end = start
+    return result
+
+# One index per result hash (results never change under their hash). An index holds the
+# result's student dicts (~4 KB each), so the cache is also bounded by total students;
+# the most recent index is always kept.
+INDEX_CACHE_SIZE = 8
+INDEX_CACHE_STUDENTS = 25000
+_indexes = OrderedDict()
+_index_lock = threading.Lock()
+
+def index_for(storage, file_hash):
+    """The StudentIndex of a stored result (built on first use). None if it does not exist."""
+    with _index_lock:
+        index = _indexes.get(file_hash)
+        if index is not None:
+            _indexes.move_to_end(file_hash)
+            return index
+    result = storage.get(file_hash)
+    if not result:
+        return None
+    index = StudentIndex(result)
+    with _index_lock:
+        _indexes[file_hash] = index
+        while len(_indexes) > 1 and (len(_indexes) > INDEX_CACHE_SIZE or
+                                     sum(len(i.students) for i in _indexes.values()) > INDEX_CACHE_STUDENTS):
+            _indexes.popitem(last=False)
+    return index
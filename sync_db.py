@@ -1,68 +1,154 @@
 import os
+import sys
 import json
+import hashlib
 import psycopg2
-from datetime import datetime
+from datetime import datetime, timezone
+
+from static_export import (PUBLIC_DATA_DIR, INDEX_FILE, write_atomic, index_entry, load_index, write_index,
+                           write_sharded, has_sharded, remove_exported, build_search_index, compress_tree,
+                           print_compression_report, write_compression_report)
 
 # Path to output
-OUTPUT_FILE = os.path.join("frontend", "public", "data", "index.json")
+OUTPUT_DIR = PUBLIC_DATA_DIR
+OUTPUT_FILE = INDEX_FILE
+
+# Sync state (high-water mark, the hashes changed exactly at it, digests of exported files),
+# committed with the data
+STATE_FILE = "sync_state.json"
+
+# Rows per round trip from the server-side cursor (each row carries a full result)
+FETCH_SIZE = 20
 
-def sync_db_to_static():
+def load_state():
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'high_water_mark': None, 'boundary': [], 'digests': {}}
+
+def save_state(state):
+    write_atomic(STATE_FILE, json.dumps(state, indent=2, sort_keys=True).encode('utf-8'))
+
+def _change_column(conn):
+    """updated_at is maintained by the server since change tracking was added;
+    fall back to created_at on databases that predate it"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'results' AND column_name = 'updated_at'
+        """)
+        return "COALESCE(updated_at, created_at)" if cur.fetchone() else "created_at"
+
+def sync_db_to_static(full=False):
     db_url = os.environ.get('DATABASE_URL')
     if not db_url:
         print("❌ No DATABASE_URL found. Skipping sync.")
         return
 
+    state = load_state()
+    index = load_index(OUTPUT_FILE)
+    # Everything exported before, remembered before --full starts over, so results
+    # deleted since then are still removed below
+    previously_exported = set(index) | set(state['digests'])
+    if full:
+        state = {'high_water_mark': None, 'boundary': [], 'digests': {}}
+        index = {}
+    conn = None
+
     try:
         print("🔌 Connecting to Database...")
-        conn = psycopg2.connect(db_url, sslmode='require')
-        cur = conn.cursor()
-        
-        # Fetch latest results
-        print("📥 Fetching results...")
-        cur.execute("""
-            SELECT hash, meta, data->'statistics' 
-            FROM results 
-            ORDER BY created_at DESC
-        """)
-        rows = cur.fetchall()
+        conn = psycopg2.connect(db_url, sslmode=os.environ.get('DATABASE_SSLMODE', 'require'))
+        changed_at = _change_column(conn)
+
+        # Stream rows changed since the last run through a server-side (named) cursor.
+        # data::text skips JSONB -> dict -> JSON re-encoding for the per-result files.
+        # Only the statistics index.json shows are decoded (not the histograms and rankings).
+        # Rows stamped exactly at the high-water mark are fetched only if they were not
+        # seen last time (one committed later in the same instant is not lost).
+        high_water_mark = state['high_water_mark']
+        boundary = set(state.get('boundary', []))
+        print(f"📥 Fetching results changed since {high_water_mark or 'the beginning'}...")
+        cur = conn.cursor(name='sync_results')
+        cur.itersize = FETCH_SIZE
+        cur.execute(f"""
+            SELECT hash, meta,
+                   jsonb_build_object('total_students', data #> '{{statistics,total_students}}',
+                                      'college_statistics', data #> '{{statistics,college_statistics}}'),
+                   data::text, {changed_at}
+            FROM results
+            WHERE %(hwm)s IS NULL OR {changed_at} > %(hwm)s
+               OR ({changed_at} = %(hwm)s AND NOT hash = ANY(%(boundary)s))
+            ORDER BY {changed_at} ASC
+        """, {'hwm': high_water_mark, 'boundary': sorted(boundary)})
+
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        seen = exported = skipped = 0
+
+        for h, meta, stats, data_text, changed in cur:
+            seen += 1
+            index[h] = index_entry(h, meta, stats)
+            # Rows arrive oldest first: the mark is the newest change time actually seen
+            if changed is not None:
+                stamp = changed.isoformat()
+                if stamp != high_water_mark:
+                    high_water_mark, boundary = stamp, set()
+                boundary.add(h)
+
+            # Skip files whose content is unchanged (e.g. a re-save of the same result)
+            data = data_text.encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+            result_path = os.path.join(OUTPUT_DIR, f"{h}.json")
+            if (state['digests'].get(h) == digest and os.path.exists(result_path)
+                    and has_sharded(h, OUTPUT_DIR)):
+                skipped += 1
+                continue
+
+            write_atomic(result_path, data)
+            write_sharded(h, json.loads(data_text), OUTPUT_DIR)
+            state['digests'][h] = digest
+            exported += 1
+
         cur.close()
+
+        # Reconcile with the table: results evicted or deleted since the last run
+        # only show up as hashes that are no longer there
+        with conn.cursor() as cur:
+            cur.execute("SELECT hash FROM results")
+            current = {row[0] for row in cur.fetchall()}
         conn.close()
 
-        index_list = []
-        for r in rows:
-            h, meta, stats = r
-            if not meta: meta = {}
-            if not stats: stats = {}
-            
-            # Ensure proper types
-            if isinstance(meta, str): meta = json.loads(meta)
-            if isinstance(stats, str): stats = json.loads(stats)
-
-            index_list.append({
-                'hash': h,
-                'filename': meta.get('filename', 'Unknown'),
-                'timestamp': meta.get('timestamp', 0),
-                'student_count': stats.get('total_students', 0),
-                'college_count': len(stats.get('college_statistics', {})),
-                'program': meta.get('program'),
-                'semester': meta.get('semester'),
-                'scheme': meta.get('scheme'),
-                'examination': meta.get('examination')
-            })
+        removed = 0
+        for h in (previously_exported | set(index) | set(state['digests'])) - current:
+            index.pop(h, None)
+            state['digests'].pop(h, None)
+            remove_exported(h, OUTPUT_DIR)
+            removed += 1
 
         # Write to index.json
-        os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            json.dump(index_list, f, ensure_ascii=False, indent=2)
-        
-        print(f"✅ Successfully synced {len(index_list)} results to {OUTPUT_FILE}")
+        index_list = write_index(index.values(), OUTPUT_FILE)
+
+        if exported or removed or not os.path.exists(os.path.join(OUTPUT_DIR, 'search', 'meta.json')):
+            build_search_index(OUTPUT_DIR)
+
+        report = compress_tree(OUTPUT_DIR)
+        print_compression_report(report)
+        write_compression_report(report)
+
+        state['high_water_mark'] = high_water_mark
+        state['boundary'] = sorted(boundary)
+        state['synced_at'] = datetime.now(timezone.utc).isoformat()
+        save_state(state)
+
+        print(f"✅ Synced {seen} changed rows: {exported} result files written, {skipped} unchanged, "
+              f"{removed} removed")
+        print(f"✅ Index has {len(index_list)} results in {OUTPUT_FILE}")
 
     except psycopg2.errors.UndefinedTable:
         print("⚠️  Table 'results' does not exist yet. Configuring empty cache.")
         # If table doesn't exist, we can't fetch. Just save empty list or exit gracefully.
         # Ideally we should wait for server to init it, or init it here.
         # But for sync script, let's just skip.
-        conn.rollback()
+        if conn: conn.rollback()
         return
 
     except Exception as e:
@@ -70,4 +156,4 @@ def sync_db_to_static():
         exit(1)
 
 if __name__ == "__main__":
-    sync_db_to_static()
+    sync_db_to_static(full='--full' in sys.argv[1:])
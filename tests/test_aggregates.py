@@ -0,0 +1,62 @@
+"""Aggregates: college matching, re-issued ledgers counted once in trends and the leaderboard"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregates import college_code, college_matches, leaderboard, summarize, trends
+
+@pytest.mark.parametrize('college, wanted, expected', [
+    ("1331: MAEER'S Maharashtra Institute of Technology Thane", '1331', True),
+    ("MU-1331: MAEER'S Maharashtra Institute of Technology Thane", '1331', True),
+    ('MU-0978: Vidya Prasarak Mandals Thanes Maharshi Parshuram College of Engineering', '0978', True),
+    ('MU-0978: Vidya Prasarak Mandals Thanes Maharshi Parshuram College of Engineering', '978', False),
+    ('MU-10978: Somewhere', '0978', False),
+    ('MU-0978: Vidya Prasarak Mandals', 'vidya', True),
+    ('MU-0978: Vidya Prasarak Mandals', 'MU-0978', True),
+    ('Unknown', '1331', False),
+])
+def test_college_matches(college, wanted, expected):
+    assert college_matches(college, wanted) is expected
+
+def test_college_code():
+    assert college_code('MU-0978: Vidya') == '0978'
+    assert college_code('1331: MAEER') == '1331'
+    assert college_code('Unknown') is None
+
+def _result(students, timestamp, examination='DECEMBER 2024'):
+    return {'meta': {'timestamp': timestamp, 'program': 'BE', 'semester': 'I', 'scheme': 'NEP',
+                     'examination': examination},
+            'course_metadata': {'10411': {'name': 'Maths'}},
+            'students': students}
+
+def _student(college, result='PASS', cgpa=7.0, total=60):
+    return {'college': college, 'result': result, 'cgpa': cgpa,
+            'subjects': [{'code': '10411', 'total': total, 'passed': result == 'PASS'}]}
+
+def test_reissued_ledger_replaces_the_original():
+    original = summarize(_result([_student('MU-1331: X', 'FAIL', 0)] * 4, timestamp=1), 'original')
+    reissue = summarize(_result([_student('MU-1331: X')] * 4, timestamp=2), 'reissue')
+
+    [point] = trends([original, reissue], college='1331')
+    assert point['hashes'] == ['reissue']
+    assert (point['total_students'], point['passed_students']) == (4, 4)
+
+    [entry] = leaderboard([reissue, original])
+    assert (entry['results'], entry['total_students'], entry['pass_percentage']) == (1, 4, 100)
+
+def test_ledgers_of_different_colleges_or_sittings_are_combined():
+    first = summarize(_result([_student('1331: X')] * 2, timestamp=1), 'a')
+    other_college = summarize(_result([_student('0978: Y', 'FAIL', 0)] * 2, timestamp=2), 'b')
+    next_sitting = summarize(_result([_student('1331: X')] * 3, timestamp=3, examination='MAY 2025'), 'c')
+
+    series = trends([next_sitting, first, other_college])
+    assert [(p['examination'], p['total_students'], p['passed_students']) for p in series] == \
+        [('DECEMBER 2024', 4, 2), ('MAY 2025', 3, 3)]
+
+    board = {e['college']: e for e in leaderboard([first, other_college, next_sitting])}
+    assert board['1331: X']['total_students'] == 5
+    assert board['1331: X']['rank'] == 1 and board['0978: Y']['rank'] == 2
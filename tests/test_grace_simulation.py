@@ -0,0 +1,94 @@
+"""What-if simulation: an empty rule set is the recorded result, rules change only what they touch"""
+
+import glob
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('numpy')
+
+import grace_simulation
+from grace_simulation import Cohort, simulate, validate_rules
+
+SAMPLE_RESULTS = [path for path in glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                          'frontend', 'public', 'data', '*.json'))
+                  if not os.path.basename(path).startswith('index')]
+
+@pytest.mark.parametrize('path', SAMPLE_RESULTS, ids=lambda path: os.path.basename(path)[:8])
+def test_empty_rules_reproduce_recorded_result(path):
+    with open(path, encoding='utf-8') as f:
+        result = json.load(f)
+    report = simulate(Cohort(result), {})
+
+    grades = {}
+    for s in result['students']:
+        for subj in s['subjects']:
+            if subj['grade'] in grace_simulation.GRADES:
+                grades[subj['grade']] = grades.get(subj['grade'], 0) + 1
+    assert report['after']['passed'] == report['before']['passed'] == result['statistics']['passed_students']
+    assert report['after']['grade_counts'] == report['before']['grade_counts'] == grades
+    assert report['after']['median_cgpa'] == report['before']['median_cgpa']
+    assert report['newly_passed'] == report['newly_failed'] == 0
+
+def _subject(code, internal, external, passed, grade, points):
+    total = None if internal is None else internal + external
+    return {'code': code, 'name': code, 'credits': 2.0, 'internal': internal, 'external': external,
+            'term_work': None, 'oral': None, 'internal_grace': 0, 'external_grace': 0, 'term_work_grace': 0,
+            'oral_grace': 0, 'total': total, 'grade': grade, 'grade_points': points, 'passed': passed}
+
+def _ledger():
+    """Two subjects with known passing marks (external 24 of 60, total 40 of 100) and a lab
+    with a grade but no printed marks"""
+    theory = {'name': 'Theory', 'credits': 2.0, 'max_marks': 100.0, 'min_marks': 40.0, 'has_i1': True,
+              'has_e1': True, 'has_t1': False, 'has_o1': False, 'i1_min': 16.0, 'i1_max': 40.0,
+              'e1_min': 24.0, 'e1_max': 60.0}
+    lab = {'name': 'Lab', 'credits': 2.0, 'max_marks': 50.0, 'has_i1': True, 'has_e1': False,
+           'has_t1': False, 'has_o1': False}
+    students = [
+        # Passed everything
+        {'seat_no': '1', 'name': 'A', 'college': '1331: X', 'result': 'PASS', 'cgpa': 7.0, 'total_marks': 140,
+         'subjects': [_subject('T1', 30, 40, True, 'B+', 7), _subject('T2', 30, 40, True, 'B+', 7),
+                      _subject('L1', None, None, True, 'B+', 7)]},
+        # External 22 in T1: 2 short
+        {'seat_no': '2', 'name': 'B', 'college': '1331: X', 'result': 'FAIL', 'cgpa': 0, 'total_marks': 122,
+         'subjects': [_subject('T1', 30, 22, False, 'F', 0), _subject('T2', 30, 40, True, 'B+', 7),
+                      _subject('L1', None, None, True, 'B+', 7)]},
+    ]
+    return {'course_metadata': {'T1': theory, 'T2': dict(theory), 'L1': lab}, 'students': students}
+
+def test_grace_overturns_only_shortfalls_within_the_cap():
+    cohort = Cohort(_ledger())
+
+    report = simulate(cohort, {'grace': {'external': 2}})
+    assert report['newly_passed_seats'] == ['2']
+    assert report['grace'] == {'students': 1, 'marks': {'internal': 0, 'external': 2, 'term_work': 0, 'oral': 0}}
+    assert report['subjects']['T1']['pass_delta'] == 1
+
+    assert simulate(cohort, {'grace': {'external': 1}})['newly_passed'] == 0
+    assert simulate(cohort, {'grace': {'external': 2}, 'student_cap': 1})['newly_passed'] == 0
+
+def test_threshold_fails_only_its_subject_and_keeps_markless_subjects():
+    cohort = Cohort(_ledger())
+    report = simulate(cohort, {'thresholds': {'T2': {'total': 75}}, 'pass_fraction': 0.9})
+
+    assert report['newly_failed'] == 1
+    # L1 has no printed marks: its recorded pass stands under any rule
+    assert report['subjects']['L1']['pass_delta'] == 0
+
+@pytest.mark.parametrize('rules', [
+    {'grace': []},
+    {'grace': {'external': -1}},
+    {'grace': {'practical': 1}},
+    {'thresholds': {'10411': 5}},
+    {'pass_fraction': 'a'},
+    {'pass_fraction': 0},
+    {'student_cap': 'x'},
+    {'bonus': 1},
+])
+def test_malformed_rules_raise_value_error(rules):
+    with pytest.raises(ValueError):
+        validate_rules(rules)
@@ -0,0 +1,44 @@
+"""diff_results: students are joined by seat number, then by ERN, and never matched twice"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_diff import diff_results, match_students
+
+def _student(seat_no, ern, result='PASS', total=60):
+    return {'seat_no': seat_no, 'ern': ern, 'name': f'S{seat_no}', 'college': '1331: X', 'result': result,
+            'cgpa': 7.0 if result == 'PASS' else 0, 'total_marks': total,
+            'subjects': [{'code': '10411', 'total': total, 'grade': 'B', 'passed': result == 'PASS'}]}
+
+def test_seat_number_change_is_matched_by_ern():
+    diff = diff_results({'students': [_student('1', 'X')]}, {'students': [_student('9', 'X')]})
+    assert diff['summary']['matched'] == 1
+    assert diff['summary']['added'] == diff['summary']['removed'] == 0
+    assert diff['students'][0]['fields'] == {'seat_no': ['1', '9']}
+
+def test_student_claimed_by_seat_number_is_not_matched_again_by_ern():
+    # Old seat 1 (ERN X) and seat 2 (ERN Y); the re-issue has seat 2 carrying ERN X
+    old = {'students': [_student('1', 'X'), _student('2', 'Y')]}
+    new = {'students': [_student('2', 'X', result='FAIL', total=20)]}
+    diff = diff_results(old, new)
+
+    assert diff['summary']['matched'] == 1
+    assert diff['summary']['removed'] == 1
+    assert diff['summary']['newly_failed'] == 1
+    assert [s['seat_no'] for s in diff['students']] == ['2']
+    assert diff['colleges']['1331: X']['students'] == 1
+
+def test_seat_numbers_win_over_ern_regardless_of_order():
+    old_students = [_student('1', 'X'), _student('2', 'Y')]
+    new_students = [_student('2', 'X'), _student('3', 'Y')]
+    matches = match_students(old_students, new_students)
+    # Seat 2 joins seat 2, so old seat 1 (ERN X) and new seat 3 stay unmatched
+    assert matches == {id(old_students[1]): new_students[0]}
+
+def test_unchanged_results_have_no_changes():
+    students = [_student(str(i), f'E{i}') for i in range(5)]
+    diff = diff_results({'students': students}, {'students': [dict(s) for s in students]})
+    assert diff['summary'] == {'matched': 5, 'changed': 0, 'added': 0, 'removed': 0,
+                               'newly_passed': 0, 'newly_failed': 0}
@@ -0,0 +1,38 @@
+"""Predicate pushdown (StudentFilter) must never drop students an unfiltered parse finds"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import loadtest
+from parse_results import StudentFilter, parse_pdf
+
+@pytest.fixture(params=[False, True], ids=['one-object-headers', 'split-headers'])
+def ledger(request, tmp_path):
+    path = tmp_path / 'ledger.pdf'
+    path.write_bytes(loadtest.make_synthetic_pdf(60, seed=7, split_headers=request.param))
+    return str(path)
+
+def test_college_filter_matches_full_parse(ledger):
+    full = parse_pdf(ledger)
+    expected = [s['seat_no'] for s in full['students'] if s['college'].startswith('1331:')]
+    assert expected
+
+    filtered = parse_pdf(ledger, StudentFilter(college='1331'))
+    assert [s['seat_no'] for s in filtered['students']] == expected
+
+def test_page_skipped_only_when_no_header_can_match(ledger):
+    filtered = parse_pdf(ledger, StudentFilter(college='9999'))
+    assert filtered['students'] == []
+
+@pytest.mark.parametrize('college, wanted, expected', [
+    ('MU-0978: Vidya Prasarak Mandals Thanes Maharshi Parshuram College of Engineering', '0978', True),
+    ('MU-0978: Vidya Prasarak Mandals Thanes Maharshi Parshuram College of Engineering', ['1331', '0978'], True),
+    ("1331: MAEER'S Maharashtra Institute of Technology Thane", '0978', False),
+    ('MU-0978: Vidya Prasarak Mandals Thanes Maharshi Parshuram College of Engineering', 'parshuram', True),
+])
+def test_college_code_with_university_prefix(college, wanted, expected):
+    assert StudentFilter(college=wanted).matches_header('1000001', 'Regular', college) is expected
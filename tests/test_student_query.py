@@ -0,0 +1,98 @@
+"""Server-side student query: filters, sort order (ties in ledger order) and pagination"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from student_query import StudentIndex, parse_sort, query
+
+COLLEGES = ['MU-0978: Vidya Prasarak Mandals', "1331: MAEER'S MIT Thane", '1286: Shah And Anchor']
+
+def _students(n=200, seed=3):
+    rng = random.Random(seed)
+    students = []
+    for i in range(n):
+        failed = rng.sample(['10411', '10412', '10413'], rng.choice([0, 0, 0, 1, 2]))
+        students.append({
+            'seat_no': str(1000000 + i), 'name': f"{rng.choice(['PATIL', 'SHAH', 'IYER'])} {rng.choice(['ASHA', 'RAVI', 'NEHA'])}",
+            'college': rng.choice(COLLEGES), 'gender': rng.choice(['MALE', 'FEMALE']), 'status': 'Regular',
+            'result': 'FAIL' if failed else 'PASS', 'total_marks': rng.randint(200, 260),
+            'cgpa': 0 if failed else rng.choice([6.5, 7.0, 7.25, 8.0, None]),
+            'subjects': [{'code': code, 'passed': code not in failed} for code in ('10411', '10412', '10413')],
+        })
+    return students
+
+@pytest.fixture
+def students():
+    return _students()
+
+def _seats(page):
+    return [s['seat_no'] for s in page['students']]
+
+def _all(index, **filters):
+    return query(index, page_size=500, **filters)
+
+def test_filters_match_a_plain_scan(students):
+    index = StudentIndex({'students': students})
+    page = _all(index, college=['0978'], gender=['FEMALE'], failed_in=['10411'])
+    expected = [s for s in students if s['college'].startswith('MU-0978') and s['gender'] == 'FEMALE'
+                and any(subj['code'] == '10411' and not subj['passed'] for subj in s['subjects'])]
+    assert expected
+    assert sorted(_seats(page)) == sorted(s['seat_no'] for s in expected)
+
+    page = _all(index, college=['1331', 'shah and'], result=['PASS'], cgpa_min=7, cgpa_max=7.25)
+    expected = [s for s in students if s['college'][:4] in ('1331', '1286') and s['result'] == 'PASS'
+                and s['cgpa'] is not None and 7 <= s['cgpa'] <= 7.25]
+    assert expected
+    assert sorted(_seats(page)) == sorted(s['seat_no'] for s in expected)
+
+def test_text_search_on_seat_number_and_name(students):
+    index = StudentIndex({'students': students})
+    assert _seats(_all(index, q='1000042')) == ['1000042']
+    page = _all(index, q=' neha', college=['1286'])
+    assert page['total'] == sum(1 for s in students if 'NEHA' in s['name'] and s['college'].startswith('1286'))
+
+def test_no_match_is_an_empty_page(students):
+    index = StudentIndex({'students': students})
+    assert _all(index, college=['9999'])['students'] == []
+    assert _all(index, failed_in=['99999'], gender=['MALE'])['total'] == 0
+
+def test_sort_keeps_ledger_order_within_ties(students):
+    index = StudentIndex({'students': students})
+    rows = {s['seat_no']: i for i, s in enumerate(students)}
+
+    page = _all(index, sort='-total_marks')
+    assert _seats(page) == [s['seat_no'] for s in sorted(students, key=lambda s: (-s['total_marks'], rows[s['seat_no']]))]
+    # The one-key fast path and the general (filtered) path agree
+    assert _seats(_all(index, sort='-total_marks', status=['Regular'])) == _seats(page)
+
+    page = _all(index, sort='college,-total_marks,name')
+    expected = sorted(students, key=lambda s: (s['college'], -s['total_marks'], s['name'], rows[s['seat_no']]))
+    assert _seats(page) == [s['seat_no'] for s in expected]
+
+def test_missing_values_sort_first(students):
+    index = StudentIndex({'students': students})
+    ascending = _all(index, sort='cgpa')['students']
+    missing = sum(1 for s in students if s['cgpa'] is None)
+    assert missing and all(s['cgpa'] is None for s in ascending[:missing])
+    assert all(s['cgpa'] is None for s in _all(index, sort='-cgpa')['students'][-missing:])
+
+def test_pages_cover_the_result_once(students):
+    index = StudentIndex({'students': students})
+    everything = _seats(_all(index, sort='name'))
+    pages = [query(index, sort='name', page=p, page_size=30) for p in range(1, 9)]
+    assert [s for page in pages for s in _seats(page)] == everything
+    assert all(page['total'] == len(students) for page in pages)
+    assert pages[-1]['students'] == []
+
+    clamped = query(index, page=0, page_size=10**6)
+    assert (clamped['page'], clamped['page_size']) == (1, 500)
+
+def test_unknown_sort_field_is_rejected():
+    assert parse_sort('-total_marks, name') == [('total_marks', True), ('name', False)]
+    with pytest.raises(ValueError):
+        parse_sort('password')